@@ -0,0 +1,87 @@
+"""
+Cost of firing the hooks of one HttpCall, with no hooks registered and with one, compared with the old dispatch (which entered a
+dag.ctx, copied each item's hook settings, and inspected every hook action's signature on every call)
+
+	python benchmarks/hook_dispatch.py
+"""
+
+import inspect, timeit
+
+import dag
+from dag.util import hooks
+
+
+TOTAL = 10_000
+
+# The hooks HttpCall.do_action fires for one successful GET
+HTTP_HOOKS = ["process_url", "pre_http_call", "pre_http_get", "raw_http_response", "raw_http_response_get", "raw_http_response_200",
+			"http_call_success", "http_call_success_get", "http_response_object", "http_response_object_get"]
+
+
+class Settings(dag.DotDict):
+	pass
+
+
+def old_do_hook(settings, hookname, *args):
+	"""The old HooksContainer.do_hook loop, for one item"""
+	with dag.ctx(f"do_hook_{hookname}"):
+		value = None
+
+		for hookuuid, hookaction in settings.getnab(f"hook_{hookname}", {}).items():
+			actionargs = inspect.getfullargspec(hookaction).args
+			total_fnargs = len(actionargs)
+
+			if len(args) <= total_fnargs:
+				if not inspect.ismethod(hookaction) and "self" in actionargs:
+					args = (None,) + args
+
+			value = hookaction(*args[:total_fnargs])
+
+		return value
+
+
+def new_do_hook(settings, hookname, *args):
+	"""HooksContainer.do_hook's loop, for one item"""
+	if hookname not in hooks.listener_counts:
+		return None
+
+	with dag.ctx(f"do_hook_{hookname}"):
+		value = None
+
+		for hookuuid, hookaction in [*(settings.get(f"hook_{hookname}") or {}).items()]:
+			total_fnargs, takes_self = hooks.get_hook_signature(hookaction)
+
+			if len(args) <= total_fnargs and takes_self:
+				args = (None,) + args
+
+			value = hookaction(*args[:total_fnargs])
+
+		return value
+
+
+def fire_all(do_hook, settings):
+	for hookname in HTTP_HOOKS:
+		do_hook(settings, hookname, "url", "response")
+
+
+def bench(do_hook, settings, repeat = 5) -> float:
+	return min(timeit.repeat(lambda: [fire_all(do_hook, settings) for i in range(TOTAL)], number = 1, repeat = repeat))
+
+
+
+def main():
+	settings = Settings()
+
+	for label in ["no hooks registered", "one hook registered"]:
+		for name, do_hook in [("before", old_do_hook), ("after", new_do_hook)]:
+			elapsed = bench(do_hook, settings)
+			print(f"{label:<20} {name:<7} {elapsed * 1000:8.1f} ms / {TOTAL} http calls    {elapsed / TOTAL * 1e6:6.2f} us per call")
+
+		action = lambda response: response
+		settings.setdefault("hook_http_call_success", {})[hooks.generate_uuid()] = action
+		hooks.add_listener("http_call_success", action)
+
+
+
+if __name__ == "__main__":
+	main()
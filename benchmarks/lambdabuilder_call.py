@@ -0,0 +1,59 @@
+"""
+Per-call cost of an r_-style LambdaBuilder (r_.team.name.upper()), replaying its records versus running its compiled function,
+compared with the equivalent handwritten lambda
+
+	python benchmarks/lambdabuilder_call.py
+"""
+
+import timeit
+
+import dag
+from dag.util.attribute_processors import AttributeAccessRecord
+from dag.util.lambdabuilders import LambdaBuilder
+
+
+TOTAL = 100_000
+
+
+class Team:
+	name = "mets"
+
+
+class Game:
+	team = Team()
+
+
+def build_lambdabuilder() -> LambdaBuilder:
+	lb = LambdaBuilder()
+	lb._stored_attrs = [AttributeAccessRecord(name, lb) for name in ["team", "name", "upper"]]
+	lb._stored_attrs[-1].is_called = True
+	return lb
+
+
+def replay(lb: LambdaBuilder, root):
+	"""The old LambdaBuilder._do_call"""
+	with dag.ctx(active_lambdabuilder_root = root):
+		item = root
+
+		for record in lb._stored_attrs:
+			item = record.get_item(item)
+
+		return item
+
+
+def bench(fn, root, repeat = 5) -> float:
+	return min(timeit.repeat(lambda: fn(root), number = TOTAL, repeat = repeat)) / TOTAL
+
+
+
+def main():
+	lb = build_lambdabuilder()
+	game = Game()
+
+	for name, fn in [("replayed records", lambda root: replay(lb, root)), ("compiled", lb._do_call), ("handwritten lambda", lambda root: root.team.name.upper())]:
+		print(f"{name:<20} {bench(fn, game) * 1e6:6.2f} us per call")
+
+
+
+if __name__ == "__main__":
+	main()
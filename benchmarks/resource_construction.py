@@ -0,0 +1,67 @@
+"""
+Construction cost of 10k Resources, compared with the old approach of installing a ProxyDescriptor on the Resource class for every key of every resource.
+The old approach is the previous Resource.__init__, unchanged, so the only difference between the two is how keys get their descriptors
+
+	python benchmarks/resource_construction.py
+"""
+
+import sys, timeit
+
+import dag
+from dag.dagcollections.resource import Resource, ResourceInfo
+from dag.lib.proxy_descriptor import ProxyDescriptor
+from dag.util import dagdebug
+
+
+sys.breakpointhook = dagdebug.set_trace # As the CLI does, since Resource.__init__ calls breakpoint(collection)
+
+TOTAL = 10_000
+KEYS = 25
+
+
+class ClassMutatingResource(Resource):
+	"""The old Resource.__init__: Each key's descriptor is set on the (shared) class"""
+
+	def __init__(self, response, collection = None):
+		breakpoint(collection)
+		if not isinstance(response, dag.Response):
+			response = dag.Response(response)
+
+		if dag.is_mapping(response):
+			for name in response._data.keys():
+				setattr(self.__class__, name, ProxyDescriptor("_response", name))
+
+		self._response = response or dag.Response({})
+
+		if isinstance(response, Resource):
+			collection = self.response._dag.collection
+			self.response = response._response	
+
+		self._dag = ResourceInfo(self, collection)
+
+
+class KeyedResource(Resource):
+	"""The current Resource.__init__ (A subclass only so that it doesn't share ClassMutatingResource's descriptors)"""
+
+
+
+def bench(resourcecls, items, repeat = 5) -> tuple[float, float]:
+	build = min(timeit.repeat(lambda: [resourcecls(item) for item in items], number = 1, repeat = repeat))
+
+	resources = [resourcecls(item) for item in items]
+	access = min(timeit.repeat(lambda: [r.key3 for r in resources], number = 1, repeat = repeat))
+
+	return build, access
+
+
+def main():
+	items = [{f"key{k}": i * k for k in range(KEYS)} for i in range(TOTAL)]
+
+	for name, resourcecls in [("before (class mutation)", ClassMutatingResource), ("after (keyed subclasses)", KeyedResource)]:
+		build, access = bench(resourcecls, items)
+		print(f"{name:<26} build: {build * 1000:8.1f} ms / {TOTAL} resources    attribute access: {access * 1000:6.2f} ms / {TOTAL}")
+
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,49 @@
+"""
+Cost of rendering a collection with DagStyleFormatter: Three styled columns, titles, and a cstyle pattern, as a typical
+collection's display() sets up. The formatter is built outside the timing, since rendering changes its rows
+
+	python benchmarks/styleformatter_render.py
+"""
+
+import os, timeit
+
+os.environ.setdefault("COLUMNS", "120") # Column widths depend on the terminal's
+
+from dag.util.styleformatter import DagStyleFormatter
+
+
+SIZES = [1_000, 10_000, 100_000]
+TEAMS = ["Seattle Kraken", "Boston Bruins", "Vancouver Canucks", "⚽ Sounders FC"]
+
+
+def build_formatter(total: int) -> DagStyleFormatter:
+	formatter = DagStyleFormatter()
+	formatter.col(0, "bold", title = "Name").col(1, "red", title = "Team", max_width = 20).col(2, title = "Points", just = str.rjust)
+	formatter.cstyle(r"Seattle\w*", "green", rowstyle = "underline")
+
+	for i in range(total):
+		formatter.add_row(f"Player {i}", TEAMS[i % len(TEAMS)], str(i * 7 % 113))
+
+	return formatter
+
+
+def bench(total: int, repeat: int = 5) -> float:
+	times = []
+
+	for i in range(repeat):
+		formatter = build_formatter(total)
+		times.append(timeit.timeit(formatter.print_response, number = 1))
+
+	return min(times)
+
+
+
+def main():
+	for total in SIZES:
+		elapsed = bench(total, repeat = 5 if total < 100_000 else 1)
+		print(f"{total:>7} rows {elapsed * 1000:10.1f} ms    {elapsed / total * 1e6:6.2f} us per row")
+
+
+
+if __name__ == "__main__":
+	main()
@@ -1,4 +1,4 @@
-import inspect, typing, logging, sys, time, contextlib
+import inspect, typing, logging, sys, time, contextlib, importlib
 from dotenv import load_dotenv
 from dataclasses import dataclass
 from collections.abc import Sequence
@@ -15,6 +15,58 @@ def dtprofiler(name, *args, **kwargs):
 
 
 
+# Attributes whose submodules are only imported the first time they're accessed (e.g.: dag.img imports PIL)
+# name -> (submodule, attribute of the submodule, or "" for the submodule itself)
+lazy_attrs = {
+	"images": (".io.images", ""),
+	"img": (".io.images", "DagImg"),
+	"Img": (".io.images", "DagImg"),
+	"ftp": (".lib.ftp", ""),
+	"asttools": (".lib.asttools", ""),
+	"tracetools": (".lib.tracetools", ""),
+	"auth": (".util.dagauth", ""),
+	"Browser": (".util.dagbrowser", "DagBrowser"),
+	"copy_text": (".util.textcopy", "copy_text"),
+	"Searcher": (".util.searchers", "Searcher"),
+}
+
+
+def import_lazy_attr(name):
+	modulename, attr = lazy_attrs[name]
+
+	with dtprofiler(f"Lazy dag import ({modulename})"):
+		module = importlib.import_module(modulename, __name__)
+
+	value = getattr(module, attr) if attr else module
+	globals()[name] = value # So that later lookups don't go through __getattr__
+	return value
+
+
+def __getattr__(attr):
+	match attr:
+		case "cmd":
+			cfi = callframeinfo(inspect.currentframe())
+			cmdbuilder = defaultapp.cmd
+			cmdbuilder.callframeinfo = cfi
+			return cmdbuilder
+		case "collection":
+			cfi = callframeinfo(inspect.currentframe())
+			collectionbuilder =  defaultapp.collection
+			collectionbuilder.callframeinfo = cfi
+			return collectionbuilder
+		case "arg2":
+			return ArgBuilder()
+		case _ if attr in lazy_attrs:
+			return import_lazy_attr(attr)
+
+	raise AttributeError(f"Attribute {attr} not found in dag.__init__")
+
+
+def __dir__():
+	return [*globals(), *lazy_attrs]
+
+
+
 with dtprofiler("Total Dag import"):
 	def exit(code = 0):
 		return sys.exit(code)
@@ -64,7 +116,6 @@ with dtprofiler("Total Dag import"):
 		from .lib import filetools
 		from .lib import strtools
 		from .lib.strtools import evaluate_name
-		from .lib import ftp
 		from .lib import dot
 		from .lib.ostools import EnvGetter
 		env = EnvGetter()
@@ -95,8 +146,6 @@ with dtprofiler("Total Dag import"):
 		from .lib.profilers import callcounter
 		from .lib import dummies
 		from .lib import ctxmanagers
-		from .lib import asttools
-		from .lib import tracetools
 		from .lib.dagpath import DagPath as Path
 
 	with dtprofiler("Total Dag import (ctx)"):
@@ -132,7 +181,6 @@ with dtprofiler("Total Dag import"):
 		from .util import dagdebug as debug
 		bbtrigger = debug.set_trigger
 		bb = debug.DebugTriggerer()
-		from .util import dagauth as auth
 		from .util import launcher
 		from .util.ctags import rawformat
 		from .util.drill import drill
@@ -145,11 +193,9 @@ with dtprofiler("Total Dag import"):
 		from .util.nabbers import args
 		from .util.nabbers import nab_if_nabber
 		from .util.nabbers import resources
-		from .util.dagbrowser import DagBrowser as Browser
 		from .util.launcher import Launcher
 		launch = Launcher()
 		from .util.launcher import get_browser
-		from .util.textcopy import copy_text
 		from .util import editors
 		from .util.editors import get_editor
 		from .util.typingtools import get_annotations
@@ -161,7 +207,6 @@ with dtprofiler("Total Dag import"):
 		from .util import argspectools
 		from .util.lambdabuilders import LambdaBuilder
 		from .util import rslashes
-		from .util.searchers import Searcher
 		from .util.daguuid import DagUUID
 		from .util.daguuid import uuid4
 
@@ -197,11 +242,6 @@ with dtprofiler("Total Dag import"):
 			from .io import cli as cli
 			prompt = cli.prompt
 
-		with dtprofiler("import_dag (io.images)"):
-			from .io import images as images
-			from .io.images import DagImg as img
-			Img = img
-
 		with dtprofiler("import_dag (response parsers)"):
 			from .responses import CsvParser
 			from .responses import HtmlParser
@@ -238,24 +278,6 @@ with dtprofiler("Total Dag import"):
 			__all__ = [ _basename(f)[:-3] for f in _glob.glob(_join(_dirname(__file__), "*.py")) if _isfile(f) and not f.endswith('__init__.py')]
 			"""
 
-		with dtprofiler("import_dag7"):
-			def __getattr__(attr):
-				match attr:
-					case "cmd":
-						cfi = callframeinfo(inspect.currentframe())
-						cmdbuilder = defaultapp.cmd
-						cmdbuilder.callframeinfo = cfi
-						return cmdbuilder
-					case "collection":
-						cfi = callframeinfo(inspect.currentframe())
-						collectionbuilder =  defaultapp.collection
-						collectionbuilder.callframeinfo = cfi
-						return collectionbuilder
-					case "arg2":
-						return ArgBuilder()
-
-				raise AttributeError(f"Attribute {attr} not found in dag.__init__")
-
 		with dtprofiler("import_dag8"):
 			from .applications import AppBuilder as AppBuilder
 			from .applications import DagApp
@@ -1,4 +1,4 @@
-import json, importlib, inspect, os, pathlib, sys, copy
+import json, importlib, inspect, os, pathlib, sys, copy, hashlib, re
 
 import dag
 from dag import applications, dagcmds
@@ -12,30 +12,107 @@ COLOR = "color"
 IS_REGEXCMD = "is_regexcmd"
 REGEXCMD_PRIORITY = "regexcmd_priority"
 
+# The appinfo file is {VERSION: ..., FINGERPRINT: ..., APPS: {cmdname: cmdinfo}}. Older files are a bare {cmdname: cmdinfo}
+APPINFO_VERSION = 2
+VERSION = "__version__"
+FINGERPRINT = "__fingerprint__"
+APPS = "apps"
+
+
+def read_pathinfo() -> list[str]:
+	"""
+	The files and directories on the dag path. Read with open() rather than dag.file, which would touch the pathinfo file and
+	change the app index's fingerprint (See AppManager.get_fingerprint)
+	"""
+
+	try:
+		with open(dag.PATHINFO_PATH, encoding = "utf-8") as file:
+			return [line.strip() for line in file.read().splitlines() if line.strip()]
+	except FileNotFoundError:
+		return []
+
+
 
 class AppManager:
 	def __init__(self):
 		self.appinfo = {}
+		self.fingerprint = None
+		self.regexcmds = []
 		self.load_appinfo()
 		self.initialize_session()
 
 
 	def initialize_session(self) -> None:
+		fingerprint = self.get_fingerprint()
+
+		# No app file has been added, removed, or edited since the last session, so the stored index is still good
+		if fingerprint == self.fingerprint:
+			return
+
+		# Set before rescanning, so that the appinfo written while registering files already has it
+		self.fingerprint = fingerprint
+
 		with dag.ctx(active_appmanager = self):
 			self.remove_deleted_pathfiles()
 			self.reregister_updated_pathfiles()
 			self.check_pathinfo_for_new_files()
 
+		self.write_appinfo(self.appinfo)
+
+
+	def get_watched_directories(self, pathinfo: list[str]) -> set[pathlib.Path]:
+		"""The directories holding registered app files, and the files and directories on the dag path (See check_pathinfo_for_new_files)"""
+		directories = {pathlib.Path(info[FILEPATH]).parent for info in self.appinfo.values()}
+
+		for line in pathinfo:
+			path = pathlib.Path(line)
+			directories.add(path if path.is_dir() else path.parent)
+
+		return directories
+
+
+	def get_fingerprint(self) -> str:
+		"""
+		A hash of the pathinfo file's contents, and of the names, mtimes and sizes of the .py files in the watched directories.
+		It changes whenever an app file is added, removed, or edited in place, and costs one directory listing per watched directory
+		(On Windows, listings include each file's stat. Elsewhere, DirEntry.stat() is a stat per .py file)
+
+		Nothing is opened with dag.file here, since that touches files and would change the fingerprint it's building
+		"""
+
+		pathinfo = read_pathinfo()
+		stamps = [*pathinfo]
+
+		for directory in sorted(self.get_watched_directories(pathinfo)):
+			try:
+				entries = sorted(os.scandir(directory), key = lambda entry: entry.name)
+			except OSError:
+				stamps.append(f"{directory}:-")
+				continue
+
+			for entry in entries:
+				if entry.name.endswith(".py"):
+					stat = entry.stat()
+					stamps.append(f"{entry.path}:{stat.st_mtime_ns}:{stat.st_size}")
+
+		return hashlib.blake2b("\n".join(stamps).encode(), digest_size = 16).hexdigest()
+
 
 	def load_appinfo(self):
 		appinfo = {}
 
 		rawappinfo = dag.file.read.RAW(APPINFO_PATH) # RAW bc otherwise might return with DagResponse.JSON during "completeline nhl"
-		if not rawappinfo:
-			self.appinfo = {}
+		if rawappinfo:
+			appinfo = json.loads(rawappinfo) # RAW bc otherwise might return with DagResponse.JSON during "completeline nhl"
+
+		if appinfo.get(VERSION) == APPINFO_VERSION:
+			self.appinfo = appinfo[APPS]
+			self.fingerprint = appinfo[FINGERPRINT]
 		else:
-			self.appinfo = json.loads(rawappinfo) # RAW bc otherwise might return with DagResponse.JSON during "completeline nhl"
+			self.appinfo = {k: v for k, v in appinfo.items() if k not in (VERSION, FINGERPRINT, APPS)} # Older format: Revalidated by the next initialize_session
+			self.fingerprint = None
 
+		self.build_regexcmd_index()
 		return self.appinfo
 
 
@@ -75,22 +152,53 @@ class AppManager:
 		return {k:v for k,v in self.appinfo.items() if v.get(IS_REGEXCMD)}
 
 
+	def build_regexcmd_index(self) -> None:
+		"""Compiles the regexcmds once, in priority order"""
+		self.regexcmds = []
+
+		for regexcmdname, regexcmdinfo in sorted(self.get_regexcmds_info().items(), key = lambda item: item[1][REGEXCMD_PRIORITY] or 0):
+			pattern, flags = dag.rslashes.get_regex_content(regexcmdname)
+
+			try:
+				self.regexcmds.append((re.compile(pattern, dag.rslashes.parse_flagchars(flags)), regexcmdname))
+			except re.error:
+				continue
+
+
+	def get_cmdinfo(self, cmdname) -> dict | None:
+		if cmdinfo := self.appinfo.get(cmdname):
+			return cmdinfo
+
+		for regex, regexcmdname in self.regexcmds:
+			if regex.fullmatch(cmdname):
+				return self.appinfo[regexcmdname]
+
+		return None
+
 
 	def load_cmd_module(self, cmdname):
-		cmdinfo = self.appinfo.get(cmdname)
+		cmdinfo = self.get_cmdinfo(cmdname)
 
 		if not cmdinfo:
-			if regexcmds_info := self.get_regexcmds_info():
-				sorted_regexcmds_info = dict(sorted(regexcmds_info.items(), key=lambda item: item[1][REGEXCMD_PRIORITY]))
+			raise ValueError(f"Cmd {cmdname} not found")
 
-				for regexcmdname, regexcmdinfo in sorted_regexcmds_info.items():
-					if dag.rslashes.fullmatch_rslash(cmdname, regexcmdname):
-						self.load_module(regexcmdinfo[FILEPATH])
-						return
+		filepath = pathlib.Path(cmdinfo[FILEPATH])
 
-			raise ValueError(f"Cmd {cmdname} not found")
+		# The fingerprint is only checked at startup, so check the one file being loaded for edits made since
+		try:
+			is_modified = os.path.getmtime(filepath) > cmdinfo[LASTMODIFIED]
+		except OSError:
+			is_modified = False
+
+		if is_modified:
+			# Registering runs the module, which attaches its cmds
+			with dag.ctx(active_appmanager = self):
+				self.unregister_filepath(filepath)
+				self.register(filepath, updating = True, add_to_sys = True)
+
+			return
 
-		self.load_module(cmdinfo[FILEPATH])
+		self.load_module(filepath)
 
 
 	def process_identifier(self, identifier, updating: bool = False, silent = False):
@@ -118,8 +226,8 @@ class AppManager:
 				}
 
 
-	def process_file(self, filepath: pathlib.Path, updating: bool = False) -> None:
-		module = self.load_module(filepath, add_to_sys = False)
+	def process_file(self, filepath: pathlib.Path, updating: bool = False, add_to_sys: bool = False) -> None:
+		module = self.load_module(filepath, add_to_sys = add_to_sys)
 
 		if not module:
 			dag.ctags.echo(f"module <c bu>{filepath}</c bu> not valid")
@@ -130,14 +238,14 @@ class AppManager:
 		#		self.process_identifier(item, updating)
 
 
-	def register(self, filepath, updating = False):
+	def register(self, filepath, updating = False, add_to_sys = False):
 		if filepath.is_dir():
 			for file in filepath.iterdir():
 				if file.name.startswith("__"):
 					continue
-				self.process_file(file, updating = updating)
+				self.process_file(file, updating = updating, add_to_sys = add_to_sys)
 		else:
-			self.process_file(filepath, updating = updating)
+			self.process_file(filepath, updating = updating, add_to_sys = add_to_sys)
 
 		self.write_appinfo(self.appinfo)
 
@@ -147,9 +255,10 @@ class AppManager:
 	def write_appinfo(self, appinfo):
 		with dag.dtprofiler("write_appinfo"):
 			with dag.file.open(APPINFO_PATH, "w") as file:
-				file.write(json.dumps(appinfo))
+				file.write(json.dumps({VERSION: APPINFO_VERSION, FINGERPRINT: self.fingerprint, APPS: appinfo}))
 
 		self.appinfo = appinfo
+		self.build_regexcmd_index()
 
 
 	def unregister_filepath(self, filepath):
@@ -233,18 +342,16 @@ class AppManager:
 
 		files = self.get_pathfiles()
 
-		# IF Pathinfo exists: Read the pathinfo and process the files/directories
-		if dag.file.exists(dag.PATHINFO_PATH):
-			# FOR each entry in pathinfo: Process the item
-			for line in dag.file.readlines.RAW(dag.PATHINFO_PATH):
-				path = dag.Path(line)
-				# IF the path is a directory: Process all files with in the directory
-				if path.is_dir():
-					for file in path.iterdir():
-						if not file.suffix == ".py" or file.stem == "__init__":
-							continue
-
-						maybe_register_file(file)
-				# ELSE, path is not a directory: Process the individual file
-				elif path.exists():
-					maybe_register_file(path)
\ No newline at end of file
+		# FOR each entry in pathinfo: Process the item
+		for line in read_pathinfo():
+			path = dag.Path(line)
+			# IF the path is a directory: Process all files with in the directory
+			if path.is_dir():
+				for file in path.iterdir():
+					if not file.suffix == ".py" or file.stem == "__init__":
+						continue
+
+					maybe_register_file(file)
+			# ELSE, path is not a directory: Process the individual file
+			elif path.exists():
+				maybe_register_file(path)
\ No newline at end of file
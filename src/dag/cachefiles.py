@@ -1,8 +1,60 @@
 import dag, pathlib
 
+from dag.lib.lrucache import LRUCache
 from dag.util import mixins, persistencefile
 
+DBCACHE_FILENAME = "dagcache.db"
+
 class DagCmdExCtxPersistenceFile(persistencefile.PersistenceFile):
+	# Decompressed payloads, kept so that cachefiles read repeatedly in one session aren't read from disk and decompressed each time
+	# Payloads are decoded on every read, so that callers mutating a cached response (e.g. sorting a collection) don't change later reads
+	# Set lazily because subclasses (e.g. tempcache) don't always call __init__
+	_memory = None
+
+	@property
+	def memory(self) -> LRUCache:
+		if self._memory is None:
+			self._memory = LRUCache(dag.settings.cache_memory_entries, dag.settings.cache_memory_bytes or None)
+
+		return self._memory
+
+
+	def exists(self, folder, filename):
+		return self.get_key(folder, filename) in self.memory or super().exists(folder, filename)
+
+
+	def read(self, folder, filename):
+		key = self.get_key(folder, filename)
+		decompressed = self.memory.get(key)
+
+		if decompressed is None:
+			from dag.util import cachecodecs # lazy import here because importing cachecodecs (pickle, gzip) slows down dag load
+			decompressed = cachecodecs.decompress(self.read_bytes(folder, filename))
+			self.memory.put(key, decompressed, len(decompressed[2]))
+
+		codec, version, payload = decompressed
+		return codec.decode(payload, version)
+
+
+	def write(self, text, folder, filename, meta = None):
+		self.memory.pop(self.get_key(folder, filename))
+		return super().write(text, folder, filename, meta)
+
+
+	def delete(self, folder, filename = None):
+		if filename is None:
+			folder = str(folder).strip("/")
+			self.memory.invalidate(lambda key: key[0] == folder or key[0].startswith(folder + "/"))
+		else:
+			self.memory.pop(self.get_key(folder, filename))
+
+		return super().delete(folder, filename)
+
+
+	def forget_from_dagcmd_exctx(self, exctx) -> None:
+		"""Drops the in-memory copy of a dagcmd's cachefile, so that the next read comes from disk"""
+		self.memory.pop(self.get_key(*self.get_folder_filename_from_dagcmd_exctx(exctx)))
+
 
 	def generate_filename_from_dagcmd_parsed(self, dagcmd, parsed):
 		filename = ""
@@ -58,42 +110,36 @@ class DagCmdExCtxPersistenceFile(persistencefile.PersistenceFile):
 
 	def exists_from_dagcmd_exctx(self, exctx):
 		folder, filename = self.get_folder_filename_from_dagcmd_exctx(exctx)
-		return super().exists(folder, filename)
+		return self.exists(folder, filename)
 
 
-	def read_from_dagcmd_exctx(self, exctx):
+	def is_fresh_from_dagcmd_exctx(self, exctx, ttl = None):
 		folder, filename = self.get_folder_filename_from_dagcmd_exctx(exctx)
-		return super().read(folder, filename)
+		return self.is_fresh(folder, filename, ttl)
 
 
-	def write_from_dagcmd_exctx(self, response, exctx):
+	def read_from_dagcmd_exctx(self, exctx):
 		folder, filename = self.get_folder_filename_from_dagcmd_exctx(exctx)
-		return super().write(response, folder, filename)
-
-
-cachefiles = DagCmdExCtxPersistenceFile(dag.directories.CACHE)
-
+		return self.read(folder, filename)
 
 
+	def write_from_dagcmd_exctx(self, response, exctx):
+		folder, filename = self.get_folder_filename_from_dagcmd_exctx(exctx)
+		return self.write(response, folder, filename)
 
-class DBCache:
-	def __init__(self, rootdir = dag.directories.CACHE):
-		self.rootdir = pathlib.Path(rootdir)
 
-	def get_db_and_query_from_exctx(self, exctx):
-		pass
+class DBCache(DagCmdExCtxPersistenceFile, persistencefile.SqlitePersistenceFile):
+	"""Cachefiles stored as rows of a single SQLite database, keyed by dagcmd path plus the dagcmd's cacheable parsed args"""
 
-	def entry_exists_from_exctx(self, exctx):
-		pass
+	def __init__(self, dbpath = dag.directories.CACHE / DBCACHE_FILENAME, max_bytes = None):
+		super().__init__(dbpath, max_bytes)
 
-	def read_response_from_exctx(self, exctx):
-		pass
 
-	def write_response_from_exctx(self, response, exctx):
-		pass
 
+filecache = DagCmdExCtxPersistenceFile(dag.directories.CACHE, max_bytes = lambda: dag.settings.cache_max_bytes)
+dbcache = DBCache(max_bytes = lambda: dag.settings.cache_max_bytes)
 
-dbcache = DBCache()
+cachefiles = dbcache if dag.settings.cache_backend == "sqlite" else filecache
 
 
 
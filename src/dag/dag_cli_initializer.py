@@ -19,26 +19,25 @@ if __name__ == "__main__":
 	initial_cwd = os.getcwd()
 
 	try:
+		import dag
+		from dag.dagcli.reloader import ModuleReloader
+
+		# Only the dag modules/app files changed since the instance started (and their importers) are re-imported on reload
+		reloader = ModuleReloader(dag.CODE_PATH)
+		del dag
+
 		while True:
 			from dag.dagcli import instances
 
 			instance = instances.DagCLIInstance(passed_args)
+			reloader.snapshot()
 			instance.run()
 			passed_args = instance.reload_args.split() if instance.reload_args else []
 
-			import dag
-			codepath = dag.CODE_PATH
-			del dag
 			del instance
-			
-			for k, v in list(sys.modules.items()):
-				if k == "__main__":
-					continue
-
-				if (hasattr(v, "__file__") and v.__file__ and v.__file__.startswith(str(codepath))):
-					sys.modules.pop(k)
-
 			del instances
+
+			reloader.reload()
 	finally:
 		if initial_cwd != os.getcwd() and cwdfile:
 			with open(cwdfile, "w") as file:
@@ -0,0 +1,136 @@
+"""
+Runs a dag command line through the warm dag daemon (See dag/dagcli/daemon.py), starting the daemon if it isn't running
+
+	python dag_daemon_client.py CWDFILE nhl games
+
+Only the standard library is imported here, so that the client starts in a few milliseconds.
+Falls back to running dag_cli_initializer.py as usual if the daemon can't be reached
+"""
+
+import json, os, shutil, socket, subprocess, sys, time
+
+
+PROTOCOL_VERSION = 1
+START_TIMEOUT = 30 # Seconds to wait for a newly started daemon to listen
+RETRIES = 2 # A stale daemon exits instead of running the request, so the request is re-sent to a new one
+
+
+
+def get_socket_path() -> str:
+	if socketpath := os.environ.get("DAG_DAEMON_SOCKET"):
+		return socketpath
+
+	statedir = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+	return os.path.join(statedir, "dag", "daemon.sock")
+
+
+def send_message(sock: socket.socket, message: dict) -> None:
+	"""Messages are one JSON object per line"""
+	sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def read_messages(sockfile):
+	for line in sockfile:
+		if line.strip():
+			yield json.loads(line)
+
+
+def build_request(argv: list[str]) -> dict:
+	termsize = shutil.get_terminal_size()
+
+	return {
+		"version": PROTOCOL_VERSION,
+		"argv": argv,
+		"cwd": os.getcwd(),
+		"env": dict(os.environ),
+		"columns": termsize.columns,
+		"lines": termsize.lines,
+	}
+
+
+
+
+def connect(socketpath: str) -> socket.socket | None:
+	sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+	try:
+		sock.connect(socketpath)
+		return sock
+	except OSError:
+		sock.close()
+		return None
+
+
+def start_daemon(socketpath: str) -> socket.socket | None:
+	os.makedirs(os.path.dirname(socketpath), exist_ok = True)
+	subprocess.Popen([sys.executable, "-m", "dag.dagcli.daemon", socketpath], stdin = subprocess.DEVNULL, stdout = subprocess.DEVNULL,
+					stderr = subprocess.DEVNULL, start_new_session = True)
+
+	deadline = time.monotonic() + START_TIMEOUT
+
+	while time.monotonic() < deadline:
+		if sock := connect(socketpath):
+			return sock
+
+		time.sleep(0.02)
+
+	return None
+
+
+def run_request(sock: socket.socket, request: dict) -> dict | None:
+	"""Writes the daemon's output as it arrives. Returns the daemon's final message, or None if the connection dropped first"""
+	with sock, sock.makefile("r", encoding = "utf-8") as sockfile:
+		send_message(sock, request)
+
+		for message in read_messages(sockfile):
+			if "out" in message:
+				sys.stdout.write(message["out"])
+				sys.stdout.flush()
+			else:
+				return message
+
+	return None
+
+
+def write_cwdfile(cwdfile: str | None, cwd: str | None) -> None:
+	"""The dag script cd's into whatever directory the command ended in (See dag_cli_initializer.py)"""
+	if cwdfile and cwd and cwd != os.getcwd():
+		with open(cwdfile, "w") as file:
+			file.write(cwd)
+
+
+
+
+def run_cold(cwdfile: str | None, argv: list[str]) -> int:
+	initializer = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dag_cli_initializer.py")
+	return subprocess.call([sys.executable, initializer, cwdfile or "", *argv])
+
+
+def main(cwdfile: str | None, argv: list[str]) -> int:
+	socketpath = get_socket_path()
+	request = build_request(argv)
+
+	for attempt in range(RETRIES):
+		sock = connect(socketpath) or start_daemon(socketpath)
+
+		if sock is None:
+			break
+
+		response = run_request(sock, request)
+
+		if response is None:
+			sys.stderr.write("dag daemon: connection lost\n")
+			return 1
+
+		if response.get("stale"):
+			continue
+
+		write_cwdfile(cwdfile, response.get("cwd"))
+		return response.get("exit", 0)
+
+	return run_cold(cwdfile, argv)
+
+
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1] if sys.argv[1:2] else None, sys.argv[2:]))
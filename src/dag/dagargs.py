@@ -1,4 +1,4 @@
-import os, re, math, re, inspect, types, copy, string
+import os, re, math, re, inspect, types, copy, string, sys
 from functools import cached_property
 from collections import UserList
 from collections.abc import Sequence
@@ -930,7 +930,7 @@ class DirectoryDagArg(PathDagArg):
 
 
 class ImageDagArg(PathDagArg):
-	def process_raw_argval(self, value: str, incmd) -> dag.Img:
+	def process_raw_argval(self, value: str, incmd) -> "dag.Img":
 		return dag.img.from_path(value)
 
 	def complete(self, incmd, parsed, inputarg) -> list[str]:
@@ -1251,7 +1251,6 @@ class TempListDagArg(DagArg):
 
 
 registered_settings = dag.ItemRegistry()
-registered_arg_annotations = dag.ItemRegistry()
 
 
 class RegisteredArgAnnotation:
@@ -1263,23 +1262,59 @@ class RegisteredArgAnnotation:
 		return f"<{object.__repr__(self)}, {self.settings=} {self.defaultvaluesettings=}>"
 
 
+class RegisteredArgAnnotations(dag.ItemRegistry):
+	"""
+	RegisteredArgAnnotations keyed by annotation type. Types that dag imports lazily (See dag.lazy_attrs) are registered by name,
+	and keyed by type once their module has been imported (which it has been, if something is annotated with them)
+	"""
+
+	def __init__(self):
+		super().__init__()
+		self.lazy = {}
+
+
+	def get_registered(self, annotation: type | str) -> RegisteredArgAnnotation:
+		registry = self.lazy if isinstance(annotation, str) else self.data
+		return registry.setdefault(annotation, RegisteredArgAnnotation())
+
+
+	def resolve_lazy(self) -> None:
+		for name in [*self.lazy]:
+			if "dag" + dag.lazy_attrs[name][0] in sys.modules: # lazy_attrs' module names are relative to dag
+				self.data[getattr(dag, name)] = self.lazy.pop(name)
+
+
+	def __contains__(self, annotation) -> bool:
+		if self.lazy and annotation not in self.data:
+			self.resolve_lazy()
+
+		return annotation in self.data
+
+
+	def __missing__(self, annotation):
+		if annotation in self:
+			return self.data[annotation]
+
+		raise KeyError(annotation)
+
+
+
+registered_arg_annotations = RegisteredArgAnnotations()
+
 
 def register_arg(name, _registered_arg_annotation = dag.UnfilledArg, _registered_arg_annotation_default = dag.UnfilledArg, **settings):
 	registered_settings.register(name, settings)
 
-	# If a registered arg annotation has been given: Process and record it
+	# If a registered arg annotation has been given: Process and record it. A str is the name of a lazily imported dag attribute
 	if _registered_arg_annotation is not dag.UnfilledArg:
-		# If annotation has not been registered already, set it up: 
-		if _registered_arg_annotation not in registered_arg_annotations:
-			regarganno = RegisteredArgAnnotation()
-			registered_arg_annotations[_registered_arg_annotation] = regarganno
+		regarganno = registered_arg_annotations.get_registered(_registered_arg_annotation)
 
 		# If a registered default has been given: Store it as a default value setting
 		if _registered_arg_annotation_default is not dag.UnfilledArg:
-			registered_arg_annotations[_registered_arg_annotation].defaultvaluesettings[_registered_arg_annotation_default] = settings
+			regarganno.defaultvaluesettings[_registered_arg_annotation_default] = settings
 		# Else, no default value was given: Treat these settings as the main settings for the annotation type
 		else:
-			registered_arg_annotations[_registered_arg_annotation].settings = settings
+			regarganno.settings = settings
 
 
 
@@ -1311,6 +1346,6 @@ register_arg("Flag", flag = True, nargs = 0, negatable = True, _registered_arg_a
 register_arg("FalseFlag", _registered_arg_annotation = bool, _registered_arg_annotation_default = True, **(registered_settings["Flag"] | {"flag": False}))
 register_arg("Identifier", _arg_type = IdentifierDagArg)
 register_arg("InputObject", _arg_type = InputObjectDagArg)
-register_arg("Searcher", _arg_type = SearcherDagArg, _registered_arg_annotation = dag.Searcher)
-register_arg("Img", _arg_type = ImageDagArg, _registered_arg_annotation = dag.Img)
+register_arg("Searcher", _arg_type = SearcherDagArg, _registered_arg_annotation = "Searcher")	# By name, so that dag.util.searchers isn't imported until used
+register_arg("Img", _arg_type = ImageDagArg, _registered_arg_annotation = "Img")			# By name, so that dag.io.images (PIL) isn't imported until used
 register_arg("Image", _arg_type = ImageDagArg)
\ No newline at end of file
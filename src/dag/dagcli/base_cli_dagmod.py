@@ -1,10 +1,11 @@
-import sys, importlib, platform, inspect, ast, traceback, time, toml, os
+import sys, importlib, platform, inspect, ast, traceback, time, toml, os, itertools
 from typing import Iterator
 
 import dag
 from dag.util import dagdebug
 from dag.dagcli import alists, completers
 from dag.parser import arguments, inputobjects
+from dag.parser.pipestreams import PipeStream
 
 @dag.cmd(value = dag.nab.generate_password(dag.args.length))
 def password_generate(length: int = 24):
@@ -12,7 +13,7 @@ def password_generate(length: int = 24):
 
 
 @dag.arg.GreedyWords("text")
-@dag.cmd(aka = ">")
+@dag.cmd(aka = ">", sequential = True)
 def copy(text = "", *, echo: bool = False) -> str | None:
 	text = text or dag.instance.controller.last_ic_response.response_no_multicol
 	response = dag.copy_text(dag.format(text), echo)
@@ -34,7 +35,7 @@ def memuse():
 
 
 
-@dag.cmd("debugmode")
+@dag.cmd("debugmode", sequential = True)
 def debugmode():
 	newval = not dagdebug.DEBUG_MODE
 	dagdebug.DEBUG_MODE = newval
@@ -68,25 +69,29 @@ def size(input):
 @dag.cmd
 def clearcache(incmd):
 	from dag.cachefiles import cachefiles
-	folder, filename = cachefiles.get_folder_filename_from_dagcmd_exctx(incmd)
-	
-	cachedir = dag.directories.CACHE
+	filename = None
 
 	if incmd.is_default_cmd and not incmd.args:
-		cachedir /= cachefiles.get_base_folder_from_dagcmd_exctx(incmd)
+		folder = cachefiles.get_base_folder_from_dagcmd_exctx(incmd)
 	else:
-		cachedir /= cachefiles.get_folder_from_dagcmd_exctx(incmd)
+		folder = cachefiles.get_folder_from_dagcmd_exctx(incmd)
 
 	if incmd.args:
-		cachedir /= cachefiles.get_filename_from_dagcmd_exctx(incmd)
+		filename = cachefiles.get_filename_from_dagcmd_exctx(incmd)
+
+	cachename = "/".join(filter(None, [folder, filename]))
 
-	if not cachedir.exists():
-		return f"File not found: <c #F00 bu>{cachedir}</c #F00 bu>"
+	if not cachefiles.delete(folder, filename):
+		return f"Cache not found: <c #F00 bu>{cachename}</c #F00 bu>"
 
-	status = dag.file.delete(cachedir)
+	return f"Cache deleted: <c #F00 bu>{cachename}</c #F00 bu>"
 
-	if status:
-		return f"File deleted: <c #F00 bu>{cachedir}</c #F00 bu>"
+
+@dag.cmd
+def vacuumcache():
+	from dag.cachefiles import dbcache
+	dbcache.vacuum()
+	return f"Vacuumed <c bu>{dbcache.dbpath}</c bu>"
 
 
 
@@ -301,7 +306,7 @@ def tinydb():
 	
 
 @dag.arg.GreedyWords("args")
-@dag.cmd("r/==.+/", raw = True)
+@dag.cmd("r/==.+/", raw = True, sequential = True)
 def set_session_settings(setting, args = ""):
 	setting = setting.lstrip("=")
 	settingsdagcmd = dag.get_dagcmd("settings").dagcmds['set']
@@ -623,10 +628,30 @@ def _next(generator: Iterator) -> Iterator:
 	return next(generator)
 
 
+@dag.cmd
+def head(items, total: int = 10) -> list:
+	"""The first total items. When piped a stream (e.g.: "iter [1,2,3] | head 2"), the piping command stops once they're taken"""
+	if isinstance(items, PipeStream):
+		return items.take(total)
+
+	return [*itertools.islice(items, total)]
+
+
 @dag.cmd("get")
 def _get(url):
 	return dag.get(url)
 
+
+@dag.cmd
+def httpstats():
+	return dag.instance.httppools.stats
+
+
+@dag.cmd
+def cachestats():
+	from dag.cachefiles import cachefiles
+	return cachefiles.memory.stats
+
 @dag.cmd
 def html(content):return dag.HTML.parse(content)
 
@@ -1,8 +1,9 @@
-import re, contextlib
+import contextlib
 from typing import Mapping
 
 import dag
 from dag.parser import arguments, inputscripts, dagargparser, incmds
+from dag.lib.lrucache import LRUCache
 
 
 LHMAP = {
@@ -32,67 +33,9 @@ LHMAP = {
 
 
 
-def create_character_separated_regex(text):
-	return ".*" + ".*".join(list(text)) + ".*"
-
-
-def dag_complete_beginning(completion_list: list[str], text: str) -> list[str]:
-	return sorted([item for item in completion_list if item.startswith(text)])
-
-
-def dag_complete_contains(completion_list: list[str], text: str) -> list[str]:
-	return sorted([item for item in completion_list if text in item])
-
-
-
-def dag_complete_regex_contains(completion_list: list[str], text: str) -> list[str]:
-	if "*" in text:
-		return completion_list
-
-	regexstr = create_character_separated_regex(text)
-	return sorted([item for item in completion_list if re.search(regexstr, item)])
-
-
-def generate_searchstr_from_word(word: str) -> str:
-	searchstr = ".*"
-
-	for ch in word:
-		searchstr += "[" + "|".join(ch + LHMAP.get(ch, "")) + "].*"
-
-	return searchstr
-
-
-
-def dag_complete_lefthand_fuzzy(completion_list: list[str], text: str) -> list[str]:
-	# Currently capping text length at 10 because time to do this blows up exponentially with length
-
-	# Search string. Will turn into something like ".*[f|j].*[a|;].*[v|n|m].*" for regex searching
-	searchstr = generate_searchstr_from_word(text)
-	return sorted([c for c in completion_list if re.search(searchstr, c)], key = len)
-
-
-
-def fuzzier_complete_lefthand_fuzzy(completion_list: list[str], text: str) -> list[str]:
-	searchstr = generate_searchstr_from_word(text)
-	splitsearchstr = searchstr.split(".*")
-
-	items = []
-
-	for i in range(1, len(splitsearchstr)-1): # Range from 1..#splitsearchstr-1 bc not removing first or last ".*" for any searches
-		isplitsearchstr = splitsearchstr[:i] + splitsearchstr[i+1:]
-		isearchstr = ".*".join(isplitsearchstr)
-
-		items += [c for c in completion_list if re.search(isearchstr, c)]
-
-	dag.bb.completetest()
-
-	return sorted(set(items), key=len)
-
-
-
 def get_completion_incmd(line: str):
 	with dag.ctx("completer_active", "skip_validate_inputarg", "skip_type_parser", "parse_while_valid", "skip_breakpoint", "complain_breakpoint_skip"):
-		incmd = inputscripts.generate_from_text(line).get_last_incmd()
+		incmd = inputscripts.get_last_incmd_from_text(line)
 
 		if not incmd.raw_parsed and incmd.tokens:
 			incmd.tokens = incmd.tokens[:-1]
@@ -130,39 +73,25 @@ def complete_completion_incmd(incmd, word: str) -> list[str]:
 		return pincmd.complete(word)
 
 
-def dag_complete(word, candidates):
-	completion_list = [dag.strtools.escape_unescaped_spaces(c, ignore_trailing_space = True) for c in set(candidates)] # remove duplciates and turn "wow ok" -> "wow\ ok"
+# Candidate lists are rebuilt on each keystroke but rarely change between them, so their indexes are kept
+completion_indexes = LRUCache(max_entries = 8)
 
-	items = []
 
-	# IF "*" already in word, it's not being used for completion, so just return items. (this is so that "git add *" doesn't complain about repeated *'s)
-	if "*" in word:
-		return items
+def get_completion_index(candidates) -> "CompletionIndex":
+	from dag.dagcli.completionindex import CompletionIndex # lazy import here because completers is imported with dag, but only completion needs the index
 
-	items = dag_complete_beginning(completion_list, word)
+	candidates = tuple(candidates) # Candidates may be a generator, which can only be iterated once
+	index = completion_indexes.get(candidates)
 
-	# IF we have optionso that complete from beginning: Return those results
-	if items:
-		return items
+	if index is None:
+		index = CompletionIndex([dag.strtools.escape_unescaped_spaces(c, ignore_trailing_space = True) for c in set(candidates)], LHMAP) # remove duplciates and turn "wow ok" -> "wow\ ok"
+		completion_indexes.put(candidates, index)
 
-	# IF not items: Look for any matches that fit .*c.*h.*a.*r.* pattern and starts with word start char
-	if len(items) < 10:
-		items = dag_complete_regex_contains(completion_list, word)
-		items = [i for i in items if i[0] == word[0]]
-		items += sorted(items, key=len)
+	return index
 
-	#if not items and all(w in LHMAP for w in word): -> removed because lhfuzzy also turns "ompl" into "completeline"
-	if len(items) < 10:	
-		items = dag_complete_lefthand_fuzzy(completion_list, word)
-		sizeitems = [i for i in items if len(i) == len(word)]
-		items += sizeitems or items
 
-	if not items:
-		items += fuzzier_complete_lefthand_fuzzy(completion_list, word)
-		pass
-
-
-	return list(dict.fromkeys(items))
+def dag_complete(word, candidates):
+	return get_completion_index(candidates).complete(word)
 
 
 #>>>> InputCommand Completer
@@ -0,0 +1,159 @@
+import bisect
+from collections.abc import Iterable, Mapping
+
+
+MIN_SUBSEQUENCE_MATCHES = 5 # Fewer subsequence matches than this and the left-hand fuzzy matches are used instead
+MAX_CHAR = chr(0x10FFFF)
+
+
+class CompletionIndex:
+	"""
+	A set of completion candidates, indexed once so that each keystroke doesn't rescan (or regex-search) every candidate
+
+	Candidates are kept sorted, so the candidates starting with a word are one slice found by bisection. Each character maps to a
+	bitmask of the candidates containing it: ANDing the masks for a word's characters leaves only the candidates that could match it
+	as a subsequence, and only those are checked
+	"""
+
+	def __init__(self, candidates: Iterable[str], fuzzymap: Mapping[str, str] | None = None):
+		self.items = sorted(set(candidates))
+		self.fuzzymap = fuzzymap or {}
+		self.charmasks = self.build_charmasks(self.items)
+
+
+	@staticmethod
+	def build_charmasks(items: list[str]) -> dict[str, int]:
+		positions = {}
+
+		for i, item in enumerate(items):
+			for ch in set(item):
+				positions.setdefault(ch, []).append(i)
+
+		charmasks = {}
+		nbytes = len(items) // 8 + 1
+
+		for ch, idxs in positions.items():
+			bits = bytearray(nbytes)
+
+			for i in idxs:
+				bits[i >> 3] |= 1 << (i & 7)
+
+			charmasks[ch] = int.from_bytes(bits, "little")
+
+		return charmasks
+
+
+	def __len__(self):
+		return len(self.items)
+
+
+
+
+	def get_mask(self, charclasses: list[str]) -> int:
+		"""The candidates containing at least one character from every class"""
+		mask = (1 << len(self.items)) - 1
+
+		for charclass in charclasses:
+			classmask = 0
+
+			for ch in charclass:
+				classmask |= self.charmasks.get(ch, 0)
+
+			mask &= classmask
+
+			if not mask:
+				break
+
+		return mask
+
+
+	@staticmethod
+	def iter_ids(mask: int):
+		bits = bin(mask)[:1:-1] # Lowest bit first
+		i = bits.find("1")
+
+		while i != -1:
+			yield i
+			i = bits.find("1", i + 1)
+
+
+	@staticmethod
+	def is_subsequence(item: str, charclasses: list[str]) -> bool:
+		"""Whether the item has a character from each class, in order. Taking the earliest match for each class is always safe"""
+		pos = 0
+
+		for charclass in charclasses:
+			found = [idx for ch in charclass if (idx := item.find(ch, pos)) != -1]
+
+			if not found:
+				return False
+
+			pos = min(found) + 1
+
+		return True
+
+
+	def match(self, charclasses: list[str]) -> list[int]:
+		"""The ids (which are also alphabetical ranks) of the candidates matching the classes as a subsequence"""
+		items = self.items
+		return [i for i in self.iter_ids(self.get_mask(charclasses)) if self.is_subsequence(items[i], charclasses)]
+
+
+	def get_lefthand_charclasses(self, word: str) -> list[str]:
+		return [ch + self.fuzzymap.get(ch, "") for ch in word]
+
+
+	def sort_by_len(self, ids: Iterable[int]) -> list[str]:
+		items = self.items
+		return [items[i] for i in sorted(ids, key = lambda i: (len(items[i]), i))]
+
+
+
+
+	def complete_beginning(self, word: str) -> list[str]:
+		lo = bisect.bisect_left(self.items, word)
+		hi = bisect.bisect_left(self.items, word + MAX_CHAR, lo)
+		return self.items[lo:hi]
+
+
+	def complete_subsequence(self, word: str) -> list[str]:
+		"""Candidates containing the word's characters in order (what ".*w.*o.*r.*d.*" matches), alphabetically"""
+		return [self.items[i] for i in self.match([*word])]
+
+
+	def complete_lefthand_fuzzy(self, word: str) -> list[str]:
+		"""Like complete_subsequence, but each character may also be any of its LHMAP alternatives. Shortest first"""
+		return self.sort_by_len(self.match(self.get_lefthand_charclasses(word)))
+
+
+	def complete_fuzzier(self, word: str) -> list[str]:
+		"""Like complete_lefthand_fuzzy, but any one of the word's characters may be missing. Shortest first"""
+		charclasses = self.get_lefthand_charclasses(word)
+		ids = set()
+
+		for i in range(len(charclasses)):
+			ids.update(self.match(charclasses[:i] + charclasses[i+1:]))
+
+		return self.sort_by_len(ids)
+
+
+	def complete(self, word: str) -> list[str]:
+		"""
+		Runs the completion passes in order, stopping at the first that finds enough:
+		(1) Candidates starting with word, (2) subsequence matches sharing word's first character,
+		(3) left-hand fuzzy matches, (4) left-hand fuzzy matches missing one character
+		"""
+
+		# IF "*" already in word, it's not being used for completion (this is so that "git add *" doesn't complain about repeated *'s)
+		if "*" in word:
+			return []
+
+		if (items := self.complete_beginning(word)) or not word:
+			return items
+
+		items = [item for item in self.complete_subsequence(word) if item[0] == word[0]]
+
+		if len(items) >= MIN_SUBSEQUENCE_MATCHES:
+			return items
+
+		return self.complete_lefthand_fuzzy(word) or self.complete_fuzzier(word)
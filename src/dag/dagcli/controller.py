@@ -230,6 +230,16 @@ def dtresults(key: dag.Searcher = ""):
 	return {k: v for k, v in sorted(results.items(), key=lambda item: item[1], reverse = True) if not key or key.search(k)}
 
 
+@dag.cmd
+def importtimes(prefix = "dag", limit: int = 25):
+	"""Cold-start import cost of each module, measured in a fresh interpreter"""
+	from dag.lib import importtimes
+
+	times = importtimes.measure("dag", paths = [str(dag.SRC_PATH)])
+	dag.echo(f"<c b>Total:</c b> {importtimes.get_total_ms(times, 'dag'):.1f} ms")
+	return importtimes.report(times, prefix = prefix, limit = limit)
+
+
 @dag.arg.GreedyWords("text")
 @dag.cmd
 def lex(text):
@@ -0,0 +1,246 @@
+"""
+A dag instance that stays warm between commands, serving the thin client in dag_daemon_client.py over a Unix domain socket
+
+	python -m dag.dagcli.daemon SOCKETPATH
+
+The client starts the daemon when none is listening. The daemon exits after DAEMON_IDLE_TIMEOUT seconds without a request, and
+also when a dag module or app file changed since it started, so that the client's next start runs the new code
+"""
+
+import contextlib, io, os, socket, sys, traceback, tracemalloc
+from typing import NoReturn
+
+import dag
+from dag import dag_daemon_client as protocol
+from dag.dagcli.controller import DagCLIController
+from dag.dagcli.instances import DagCLIInstance
+from dag.dagcli.reloader import ModuleReloader
+from dag.dagcli.view import DagCLIView
+from dag.exceptions import DagReloadException
+
+
+
+class SocketWriter(io.TextIOBase):
+	"""Stands in for stdout/stderr while a request runs, sending whatever is written to the client as it's written"""
+
+	def __init__(self, sock: socket.socket):
+		self.sock = sock
+
+
+	def writable(self) -> bool:
+		return True
+
+
+	def write(self, text: str) -> int:
+		if text:
+			try:
+				protocol.send_message(self.sock, {"out": text})
+			except OSError:
+				pass # The client went away. The command still finishes
+
+		return len(text)
+
+
+
+@contextlib.contextmanager
+def request_environment(request: dict):
+	"""Runs the block in the client's cwd, environment and terminal size. shutil.get_terminal_size reads COLUMNS/LINES"""
+	oldcwd = os.getcwd()
+	oldenv = dict(os.environ)
+
+	try:
+		os.environ.clear()
+		os.environ.update(request.get("env") or {})
+		os.environ["COLUMNS"] = str(request.get("columns") or 80)
+		os.environ["LINES"] = str(request.get("lines") or 24)
+		os.chdir(request.get("cwd") or oldcwd)
+
+		yield
+	finally:
+		os.chdir(oldcwd)
+		os.environ.clear()
+		os.environ.update(oldenv)
+
+
+
+
+class DaemonServer:
+	def __init__(self, socketpath: str, idle_timeout: float | None = None):
+		self.socketpath = socketpath
+		self.idle_timeout = idle_timeout
+		self.sock = None
+
+
+	def listen(self) -> bool:
+		"""False if another daemon is already listening on the socket"""
+		if (sock := protocol.connect(self.socketpath)) is not None:
+			sock.close()
+			return False
+
+		with contextlib.suppress(FileNotFoundError):
+			os.unlink(self.socketpath) # Left behind by a daemon that didn't shut down cleanly
+
+		os.makedirs(os.path.dirname(self.socketpath), exist_ok = True)
+
+		self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self.sock.bind(self.socketpath)
+		os.chmod(self.socketpath, 0o600) # Requests run with the daemon's permissions, so only its user may connect
+		self.sock.listen()
+
+		return True
+
+
+	def serve(self, handle) -> None:
+		"""
+		Passes each connection to handle until it returns False or no request arrives within idle_timeout
+
+		:param handle: Called with each connected socket. Returns whether to keep serving
+		"""
+
+		self.sock.settimeout(self.idle_timeout or None)
+
+		while self.sock is not None:
+			try:
+				conn, address = self.sock.accept()
+			except socket.timeout:
+				return
+
+			conn.settimeout(None)
+
+			with conn:
+				if not handle(conn):
+					return
+
+
+	def close(self) -> None:
+		"""Stops listening. Called before a stale daemon answers, so that the client's retry starts a new daemon instead of reconnecting"""
+		if self.sock is None:
+			return
+
+		self.sock.close()
+		self.sock = None
+
+		with contextlib.suppress(FileNotFoundError):
+			os.unlink(self.socketpath)
+
+
+
+
+class DagDaemonInstance(DagCLIInstance):
+	"""A DagCLIInstance that runs the command lines sent by clients instead of prompting for them"""
+
+	def __init__(self, server: DaemonServer, reloader: ModuleReloader):
+		self.server = server
+		self.reloader = reloader
+
+		super().__init__([])
+		self.viewclass = DagCLIView # Prints via print(), so that the output can be redirected to the client
+
+
+	def run_passed_args(self) -> None:
+		pass # There's no terminal of the daemon's own to resize
+
+
+	def init_controller(self):
+		return DagCLIController(is_interactive = False)
+
+
+	def do_run(self) -> NoReturn:
+		try:
+			self.reloader.snapshot()
+			self.server.serve(self.handle_connection)
+		finally:
+			self.server.close()
+			self.shutdown()
+
+
+	def handle_connection(self, conn: socket.socket) -> bool:
+		with conn.makefile("r", encoding = "utf-8") as connfile:
+			request = next(protocol.read_messages(connfile), None)
+
+		if request is None:
+			return True
+
+		if request.get("version") != protocol.PROTOCOL_VERSION or self.reloader.is_stale():
+			self.server.close()
+			protocol.send_message(conn, {"stale": True})
+			return False
+
+		status, cwd, is_reloading = self.run_request(conn, request)
+
+		if is_reloading:
+			self.server.close() # "reload" was run: The next request starts a new daemon with the current code
+
+		with contextlib.suppress(OSError):
+			protocol.send_message(conn, {"exit": status, "cwd": cwd})
+
+		return not is_reloading
+
+
+	@contextlib.contextmanager
+	def launcher_flags(self, argv: list[str]):
+		"""
+		Applies the launcher flags in argv (See DagCLIInstance.apply_launcher_flags, and "=m" in dag_cli_initializer.py) for one
+		request, and yields the other args. The daemon's debug mode, view and memory tracing are restored afterwards
+		"""
+
+		olddebug, oldviewclass, oldview = dag.debug.DEBUG_MODE, self.viewclass, self.view
+		is_tracing = "=m" in argv and not tracemalloc.is_tracing()
+
+		try:
+			if is_tracing:
+				tracemalloc.start()
+
+			args = self.apply_launcher_flags([arg for arg in argv if arg != "=m"])
+
+			if self.viewclass is not oldviewclass:
+				self.view = self.init_view()
+
+			yield args
+		finally:
+			dag.debug.DEBUG_MODE = olddebug
+			self.viewclass, self.view = oldviewclass, oldview
+
+			if is_tracing:
+				tracemalloc.stop()
+
+
+	def run_request(self, conn: socket.socket, request: dict) -> tuple[int, str, bool]:
+		""":returns: (The exit status, the cwd the command ended in, whether the command asked dag to reload)"""
+		writer = SocketWriter(conn)
+		status, cwd, is_reloading = 0, request.get("cwd"), False
+
+		with request_environment(request), self.launcher_flags(request.get("argv") or []) as args, contextlib.redirect_stdout(writer), contextlib.redirect_stderr(writer):
+			self.controller.last_exception = None
+
+			try:
+				self.controller.run_input_line(" ".join(args))
+				status = 1 if self.controller.last_exception else 0
+			except DagReloadException:
+				is_reloading = True
+			except SystemExit as e:
+				status = e.code if isinstance(e.code, int) else int(e.code is not None)
+			except Exception:
+				traceback.print_exc()
+				status = 1
+
+			cwd = os.getcwd()
+
+		return status, cwd, is_reloading
+
+
+
+
+def main(socketpath: str | None = None) -> None:
+	socketpath = socketpath or str(dag.directories.STATE / "daemon.sock")
+	server = DaemonServer(socketpath, dag.settings.daemon_idle_timeout)
+
+	if not server.listen():
+		return
+
+	DagDaemonInstance(server, ModuleReloader(dag.CODE_PATH)).run()
+
+
+
+if __name__ == "__main__":
+	main(sys.argv[1] if sys.argv[1:2] else None)
@@ -1,6 +1,5 @@
-import re, ast
+import ast
 from typing import NoReturn
-from functools import partial
 
 import dag
 from dag import dagcmds
@@ -74,14 +73,6 @@ class FiltArg(PrefixedCliArgument, prefix = "##"):
 
 
 	def do_filter(self, icresponse):
-		def filterfn(value, resource):
-			drilledvalue = drill.drill(resource, self.name)
-
-			try:
-				return drilledvalue._dag_filt_value(op, value)
-			except:
-				return op(drilledvalue, value)
-
 		collection = icresponse.raw_response
 		opsign = self.operator or "=="
 		val = self.value
@@ -89,9 +80,8 @@ class FiltArg(PrefixedCliArgument, prefix = "##"):
 		if opsign == "=":
 			opsign = "=="
 
-		items = collection.create_subcollection()
-
 		op = comparison.ops[opsign]
+		index = collection.get_index(self.name) # Reused by later filters on the same collection
 
 		val = val[1:] if val and val[0] in ["'", '"'] else val # Strip quotes
 		val = val[:-1] if val and val[-1] in ["'", '"'] else val # Strip quotes
@@ -104,8 +94,7 @@ class FiltArg(PrefixedCliArgument, prefix = "##"):
 			val, flagchars = dag.rslashes.get_regex_content(val)
 			flags = dag.rslashes.parse_flagchars(flagchars)
 
-			op = lambda x: re.search(str(val), str(drill.drill(x, self.name)), flags)
-			items += collection.filter(op)
+			positions = index.search(val, flags)
 		# ELSE val is not regex: search for literal value
 		else:
 			origval = val
@@ -114,12 +103,11 @@ class FiltArg(PrefixedCliArgument, prefix = "##"):
 			except:
 				pass
 				
-			items += collection.filter(partial(filterfn, val))
+			positions = index.find(op, val)
 
 			# IF val and origval differ: Then val is no longer a string. Search for the string version as well
 			# (This is done so that 1967 will match both int 1967 and string "1967")
 			if val != origval:
-				items += collection.filter(partial(filterfn, origval))
+				positions = sorted({*positions, *index.find(op, origval)})
 
-		items.remove_duplicates()
-		icresponse.raw_response = items
\ No newline at end of file
+		icresponse.raw_response = collection.create_subcollection(index.get_resources(positions))
\ No newline at end of file
@@ -44,6 +44,12 @@ from dag.dagcli import pathinfo
 
 
 from dag import tempcache, instances, directories
+from dag.lib import concurrency
+from dag.cachefiles import cachefiles
+
+
+
+LAUNCHER_FLAGS = ["==w", "==p", "==D"] # Passed by whatever launched dag, not meant as command input
 
 
 
@@ -85,22 +91,27 @@ class DagCLIInstance(instances.Instance):
 		if not "==w" in self.passed_args:				# If started with "==w", don't resize the window
 			termsize = os.get_terminal_size()
 			dag.get_terminal().resize_window(rows = max(dag.settings.WINDOW_ROWS, termsize.lines), cols = max(dag.settings.WINDOW_COLS, termsize.columns))
-		else:
-			self.passed_args.remove("==w")
 
+		self.passed_args = self.apply_launcher_flags(self.passed_args)
 
-		if "==p" in self.passed_args:
-			self.viewclass = DagPyCmdCLIView
-			self.passed_args.remove("==p")
+		if self.passed_args:						# Any other input text is immediately set to run
+			self.controller.run_input_line(" ".join(self.passed_args))
 
 
-		if "==D" in self.passed_args:				# If started with "==d", don't resize the window
-			dag.debug.DEBUG_MODE = True
-			self.passed_args.remove("==D")
 
-		if self.passed_args:						# Any other input text is immediately set to run
-			self.controller.run_input_line(" ".join(self.passed_args))
+	def apply_launcher_flags(self, args: list[str]) -> list[str]:
+		"""
+		Applies the launcher flags in args ("==p": The readline view, "==D": Debug mode) and returns the other args.
+		"==w" (don't resize the window) only matters to run_passed_args, so it's just removed
+		"""
 
+		if "==p" in args:
+			self.viewclass = DagPyCmdCLIView
+
+		if "==D" in args:
+			dag.debug.DEBUG_MODE = True
+
+		return [arg for arg in args if arg not in LAUNCHER_FLAGS]
 
 
 	def init_view(self):
@@ -119,6 +130,12 @@ class DagCLIInstance(instances.Instance):
 	def initialize(self):
 		dag.directories.initialize()
 		self.populate_pathinfo()
+		self.configure_workerpools()
+
+
+	def configure_workerpools(self) -> None:
+		"""Sizes the worker pools reused by .MULTIPROCESS/.MULTITHREAD calls. The pools themselves are created on first use"""
+		concurrency.workerpools.configure(process_size = dag.settings.process_pool_size or None, thread_size = dag.settings.thread_pool_size or None)
 		
 
 	def run_prompt_loop(self) -> None:
@@ -165,4 +182,19 @@ class DagCLIInstance(instances.Instance):
 		try:
 			tempcache.clean()
 		except:
-			pass
\ No newline at end of file
+			pass
+		finally:
+			try:
+				self.close_httppools()
+			except:
+				pass
+			finally:
+				try:
+					concurrency.workerpools.close()	# Reloaded instances may run different code, so workers shouldn't outlive the instance
+				except:
+					pass
+				finally:
+					try:
+						cachefiles.memory.clear()	# The payloads' codecs come from modules that may be about to be reloaded
+					except:
+						pass
\ No newline at end of file
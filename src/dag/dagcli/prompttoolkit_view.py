@@ -111,7 +111,7 @@ def process_changed_cursor(buffer):
 		return
 
 	with dag.ctx("parse_while_valid", "skip_validate_inputarg", "skip_breakpoint"):
-		incmd = inputscripts.generate_from_text(before_cursor).get_last_incmd()
+		incmd = inputscripts.get_last_incmd_from_text(before_cursor)
 		pass
 
 	if is_end_of_line:
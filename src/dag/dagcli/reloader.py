@@ -0,0 +1,389 @@
+import ast, configparser, hashlib, importlib, os, sys, time
+from dataclasses import dataclass
+from types import FunctionType, ModuleType
+
+
+ROOT_PACKAGE = "dag"
+DEFAULTAPP_MODULE = "dag.defaultdagcmd"
+FULL_RELOAD_FRACTION = 0.5 # Past this share of dag's modules, purging everything is simpler and no slower
+IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None), tuple, frozenset) # Equal values may share one object, so these can't be traced by identity
+
+
+@dataclass
+class FileState:
+	mtime_ns: int
+	size: int
+	digest: str
+
+
+def get_file_state(filepath: str) -> FileState | None:
+	try:
+		with open(filepath, "rb") as file:
+			content = file.read()
+
+		stat = os.stat(filepath)
+	except OSError:
+		return None
+
+	return FileState(stat.st_mtime_ns, stat.st_size, hashlib.blake2b(content, digest_size = 16).hexdigest())
+
+
+def is_incremental(root: ModuleType) -> bool:
+	"""The root package's INCREMENTAL_RELOAD setting. Values from dag.ini may still be the strings "True"/"False" """
+	value = getattr(getattr(root, "settings", None), "incremental_reload", None)
+
+	if isinstance(value, str):
+		return configparser.ConfigParser.BOOLEAN_STATES.get(value.strip().lower(), True)
+
+	return True if value is None else bool(value)
+
+
+def is_file_changed(filepath: str, state: FileState | None, since_ns: int) -> bool:
+	"""
+	Whether a file differs from its recorded state. Only files whose mtime/size moved are re-hashed, so touching a file without editing it isn't a change
+
+	:param since_ns: For files without a recorded state (loaded after the snapshot): Changed if modified after this time
+	"""
+
+	try:
+		stat = os.stat(filepath)
+	except OSError:
+		return True
+
+	if state is None:
+		return stat.st_mtime_ns > since_ns
+
+	if (stat.st_mtime_ns, stat.st_size) == (state.mtime_ns, state.size):
+		return False
+
+	newstate = get_file_state(filepath)
+	return newstate is None or newstate.digest != state.digest
+
+
+
+
+def resolve_import(modulename: str, is_package: bool, module: str | None, level: int) -> str:
+	"""Turns a (possibly relative) "from ... import" into an absolute module name"""
+	if not level:
+		return module or ""
+
+	parts = modulename.split(".") if is_package else modulename.split(".")[:-1]
+	parts = parts[:len(parts) - (level - 1)]
+
+	return ".".join(parts + ([module] if module else []))
+
+
+def iter_toplevel_nodes(nodes):
+	"""Yields a module's statements, skipping function bodies: Imports inside functions run at call time, so they always get the current module"""
+	for node in nodes:
+		if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+			continue
+
+		yield node
+		yield from iter_toplevel_nodes(ast.iter_child_nodes(node))
+
+
+def get_module_imports(modulename: str, filepath: str, is_package: bool = False) -> set[str]:
+	"""The names of the modules (and, for "from x import y", the possible submodules) a module imports when it's executed"""
+	try:
+		with open(filepath, "rb") as file:
+			tree = ast.parse(file.read(), filepath)
+	except (OSError, SyntaxError, ValueError):
+		return set()
+
+	imports = set()
+
+	for node in iter_toplevel_nodes(tree.body):
+		if isinstance(node, ast.Import):
+			imports.update(alias.name for alias in node.names)
+		elif isinstance(node, ast.ImportFrom):
+			base = resolve_import(modulename, is_package, node.module, node.level)
+			imports.add(base)
+			imports.update(f"{base}.{alias.name}" for alias in node.names)
+
+	return imports
+
+
+
+def get_origin_module(value) -> str | None:
+	"""The name of the module that defined a value (or its class)"""
+	if value is None or isinstance(value, IMMUTABLE_TYPES):
+		return None
+
+	if isinstance(value, ModuleType):
+		return value.__name__
+
+	return value.__module__ if isinstance(value, (type, FunctionType)) else type(value).__module__
+
+
+
+
+class ModuleReloader:
+	"""
+	Reloads only the dag modules (and dag app files) that changed since the last snapshot, plus the modules that import them
+
+	The root "dag" package isn't re-executed: Modules that use "dag.name" see the new objects once dag's attributes are rebound.
+	Anything it can't reload safely (e.g.: dag/__init__.py itself changed) falls back to purging every dag module, as a full restart would
+	"""
+
+	def __init__(self, codepath: str | os.PathLike, root_package: str = ROOT_PACKAGE):
+		self.codepath = str(codepath)
+		self.root_package = root_package
+		self.states: dict[str, FileState] = {}
+		self.snapshot_ns = time.time_ns()
+
+		self.imports_cache: dict[str, tuple[int, set[str]]] = {} # filepath: (mtime_ns, imports). Persists across reloads so unchanged files are parsed once
+		self.last_reloaded: list[str] = []
+
+
+	def is_tracked(self, modulename: str, module: ModuleType | None) -> bool:
+		filepath = getattr(module, "__file__", None)
+		return bool(filepath) and filepath.startswith(self.codepath) and modulename not in ("__main__", __name__)
+
+
+	def get_tracked_modules(self) -> dict[str, ModuleType]:
+		return {name: module for name, module in list(sys.modules.items()) if self.is_tracked(name, module)}
+
+
+	def get_defaultapp(self):
+		defaultdagcmd = sys.modules.get(DEFAULTAPP_MODULE)
+		return getattr(defaultdagcmd, "defaultapp", None)
+
+
+	def get_app_filepaths(self) -> set[str]:
+		"""The files that defined the identifiers currently attached to the defaultapp (including app files outside of dag)"""
+		if (defaultapp := self.get_defaultapp()) is None:
+			return set()
+
+		filepaths = set()
+
+		for identifier in [*defaultapp.dagcmds.dagcmds.values(), *self.iter_regexcmds(defaultapp.dagcmds)]:
+			if (callframeinfo := getattr(identifier, "_callframeinfo", None)) is not None:
+				filepaths.add(str(callframeinfo.filepath))
+
+		return filepaths
+
+
+	@staticmethod
+	def iter_regexcmds(table):
+		for regexcmds in table.regexcmds.values():
+			yield from regexcmds
+
+		for child in table.children.values():
+			yield from ModuleReloader.iter_regexcmds(child)
+
+
+
+
+	def snapshot(self) -> None:
+		"""Records the state of every loaded dag module and app file. Called once the instance has loaded"""
+		self.snapshot_ns = time.time_ns()
+		filepaths = {module.__file__ for module in self.get_tracked_modules().values()} | self.get_app_filepaths()
+		self.states = {filepath: state for filepath in filepaths if (state := get_file_state(filepath)) is not None}
+
+
+	def get_changed_filepaths(self, filepaths: set[str]) -> set[str]:
+		return {filepath for filepath in filepaths if is_file_changed(filepath, self.states.get(filepath), self.snapshot_ns)}
+
+
+	def is_stale(self) -> bool:
+		"""Whether any loaded dag module or app file changed since the last snapshot. Only stats files, unless one's mtime/size moved"""
+		filepaths = {module.__file__ for module in self.get_tracked_modules().values()} | self.get_app_filepaths()
+		return bool(self.get_changed_filepaths(filepaths))
+
+
+	def get_imports(self, modulename: str, module: ModuleType) -> set[str]:
+		filepath = module.__file__
+
+		try:
+			mtime_ns = os.stat(filepath).st_mtime_ns
+		except OSError:
+			return set()
+
+		cached = self.imports_cache.get(filepath)
+
+		if cached is None or cached[0] != mtime_ns:
+			cached = self.imports_cache[filepath] = (mtime_ns, get_module_imports(modulename, filepath, hasattr(module, "__path__")))
+
+		return cached[1]
+
+
+	def get_dependents(self, modulenames: set[str], modules: dict[str, ModuleType]) -> set[str]:
+		"""
+		The modules that (directly or indirectly) import any of the given modules
+
+		The root package is left out both ways: Nearly every module does "import dag" and reads its attributes at call time,
+		and the root's own attributes are rebound after the reload instead (See get_root_rebinds)
+		"""
+
+		importers = {}
+		root = modules.get(self.root_package)
+
+		for name, module in modules.items():
+			if name == self.root_package:
+				continue
+
+			for imported in self.get_imports(name, module):
+				# "from dag import r_": Depends on whichever module r_ came from
+				if imported not in modules and imported.rpartition(".")[0] == self.root_package:
+					imported = get_origin_module(root.__dict__.get(imported.rpartition(".")[2])) if root is not None else None
+
+				if imported != self.root_package and imported in modules:
+					importers.setdefault(imported, set()).add(name)
+
+		dependents = set(modulenames)
+		pending = [*modulenames]
+
+		while pending:
+			for importer in importers.get(pending.pop(), ()):
+				if importer not in dependents:
+					dependents.add(importer)
+					pending.append(importer)
+
+		return dependents
+
+
+
+
+	def reload(self) -> list[str] | None:
+		"""
+		Reloads whatever changed since the last snapshot
+
+		:returns: The names of the reloaded modules, or None if every dag module was purged instead
+		"""
+
+		modules = self.get_tracked_modules()
+		root = modules.get(self.root_package)
+
+		if root is None or not is_incremental(root):
+			return self.purge(modules)
+
+		modulefiles = {module.__file__: name for name, module in modules.items()}
+		changedfiles = self.get_changed_filepaths(set(modulefiles) | self.get_app_filepaths())
+		changedmodules = {modulefiles[filepath] for filepath in changedfiles if filepath in modulefiles}
+
+		if self.root_package in changedmodules:
+			return self.purge(modules)
+
+		affected = self.get_dependents(changedmodules, modules)
+
+		if len(affected) > len(modules) * FULL_RELOAD_FRACTION:
+			return self.purge(modules)
+
+		affectedfiles = changedfiles | {modules[name].__file__ for name in affected}
+
+		if DEFAULTAPP_MODULE not in affected:
+			self.remove_identifiers(affectedfiles)
+
+		if not affected:
+			self.last_reloaded = []
+			return self.last_reloaded
+
+		try:
+			rebinds = self.get_root_rebinds(root, {name: modules[name] for name in affected})
+		except LookupError:
+			return self.purge(modules)
+
+		ordered = [name for name in modules if name in affected] # sys.modules keeps import order, so dependencies come before their importers
+
+		for name in ordered:
+			sys.modules.pop(name, None)
+			self.unbind_from_parent(name, modules[name])
+
+		try:
+			for name in ordered:
+				if name not in sys.modules:
+					importlib.import_module(name)
+		except Exception:
+			return self.purge(self.get_tracked_modules())
+
+		for attr, (modulename, name) in rebinds.items():
+			newmodule = sys.modules.get(modulename)
+
+			if newmodule is None:
+				root.__dict__.pop(attr, None)
+			else:
+				setattr(root, attr, newmodule if name is None else getattr(newmodule, name))
+
+		for attr in getattr(root, "lazy_attrs", {}):
+			root.__dict__.pop(attr, None) # Lazy attrs are cached on first access and may point at reloaded modules
+
+		self.last_reloaded = ordered
+		return self.last_reloaded
+
+
+	def get_root_rebinds(self, root: ModuleType, affected: dict[str, ModuleType]) -> dict[str, tuple[str, str | None]]:
+		"""
+		Finds which of the root package's attributes come from affected modules: {attr: (modulename, name in module, or None for the module itself)}
+
+		:raises LookupError: If an attribute is an object built from an affected module's class that can't be traced to a module-level name
+		"""
+
+		origins = {}
+		named_origins = {} # Immutable values (e.g.: "from .definitions import CODE_PATH") are only traced when the root uses the same name
+
+		for modulename, module in affected.items():
+			origins[id(module)] = (modulename, None)
+
+			for name, value in vars(module).items():
+				if isinstance(value, IMMUTABLE_TYPES):
+					named_origins.setdefault((name, id(value)), (modulename, name))
+				else:
+					origins.setdefault(id(value), (modulename, name))
+
+		rebinds = {}
+
+		for attr, value in vars(root).items():
+			if id(value) in origins:
+				rebinds[attr] = origins[id(value)]
+			elif (attr, id(value)) in named_origins:
+				rebinds[attr] = named_origins[(attr, id(value))]
+			elif not isinstance(value, (ModuleType, type)) and type(value).__module__ in affected:
+				raise LookupError(attr)
+
+		return rebinds
+
+
+	def remove_identifiers(self, filepaths: set[str]) -> None:
+		"""Removes identifiers defined in the given files from the defaultapp, so they're re-registered when next loaded"""
+		if not filepaths or (defaultapp := self.get_defaultapp()) is None:
+			return
+
+		def is_affected(identifier) -> bool:
+			callframeinfo = getattr(identifier, "_callframeinfo", None)
+			return callframeinfo is not None and str(callframeinfo.filepath) in filepaths
+
+		table = defaultapp.dagcmds
+
+		for name, identifier in [*table.dagcmds.items()]:
+			if is_affected(identifier):
+				table.remove(name)
+
+		self.remove_regexcmds(table, is_affected)
+
+
+	@staticmethod
+	def remove_regexcmds(table, is_affected) -> None:
+		for priority, regexcmds in table.regexcmds.items():
+			regexcmds[:] = [regexcmd for regexcmd in regexcmds if not is_affected(regexcmd)]
+
+		for child in table.children.values():
+			ModuleReloader.remove_regexcmds(child, is_affected)
+
+
+	@staticmethod
+	def unbind_from_parent(modulename: str, module: ModuleType) -> None:
+		"""Importing a submodule sets it as an attribute of its package. Remove the old one so that nothing reads it before it's re-imported"""
+		parentname, _, name = modulename.rpartition(".")
+
+		if (parent := sys.modules.get(parentname)) is not None and parent.__dict__.get(name) is module:
+			delattr(parent, name)
+
+
+	def purge(self, modules: dict[str, ModuleType]) -> None:
+		"""Removes every dag module, so that the next import starts from scratch"""
+		for name in modules:
+			sys.modules.pop(name, None)
+
+		self.last_reloaded = [*modules]
+		return None
@@ -78,7 +78,8 @@ class DagCmdExecutor(DagCmdExecutionContext):
 
 
 	def is_cached(self):
-		return cachefiles.exists_from_dagcmd_exctx(self)
+		# A cachefile older than the dagcmd's cache_ttl setting is treated as missing so that it gets refetched
+		return cachefiles.exists_from_dagcmd_exctx(self) and cachefiles.is_fresh_from_dagcmd_exctx(self, self.dagcmd.settings.cache_ttl)
 
 
 	# Used by CollectionDagCmd for further processing
@@ -93,6 +94,9 @@ class DagCmdExecutor(DagCmdExecutionContext):
 			response = None
 			dagcmd = self.dagcmd
 
+			if self.update_cache:
+				cachefiles.forget_from_dagcmd_exctx(self)
+
 			if not dag.settings.update_all_caches and not self.update_cache and not dag.ctx.dontcache:
 				# Check tempcache first
 				if dagcmd.settings.tempcache and tempcachefiles.exists_from_dagcmd_exctx(self):
@@ -33,6 +33,7 @@ def extract_fn(fn: Callable) -> tuple[Callable, Callable]:
 #>>>> DagCmd
 class DagCmd(Identifier, dag.mixins.DagSettings, dag.DotAccess):
 	dagcmd_executor = DagCmdExecutor
+	_merged_settings = None
 
 	def __init__(self, settings, fn = None, dagapp = None, name = None, added_argspec_args = None, callframeinfo = None):
 		with dag.dtprofiler("dagcmd_init") as tp:
@@ -152,7 +153,11 @@ class DagCmd(Identifier, dag.mixins.DagSettings, dag.DotAccess):
 	@property
 	def settings(self):
 		if self.root:
-			return self.root.settings | self._settings # dagapp.settings is a NabbableSettings instance, so unioning will yield another NS instance 
+			# Same as "self.root.settings | self._settings", but only re-merged when either side changes
+			if self._merged_settings is None:
+				self._merged_settings = dag.dot.MergeCache()
+
+			return self._merged_settings.get(self.root.settings, self._settings)
 
 		return self._settings
 
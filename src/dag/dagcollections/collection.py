@@ -8,6 +8,8 @@ from dag.util import prompter, mixins, daguuid
 
 from dag.dagcollections.partitioned_collection import PartitionedCollection
 from dag.dagcollections.resource import Resource
+from dag.dagcollections.lazyresources import LazyResources, build_index
+from dag.dagcollections.collectionindex import CollectionIndex
 from dag.exceptions import DagContinueLoopException
 from dag.dagcmd_exctx import DagCmdExecutionContext
 
@@ -25,6 +27,8 @@ def setup_resource(item, dagcoll, resource_class):
 
 class Collection(Sequence, dot.DotAccess, mixins.DagLaunchable, mixins.DagDrillable, mixins.Alistable, mixins.DagStyleFormattable):
 	_resource_class = Resource
+	_resource_settings_merge = None
+	_indexes = None # {drill path: CollectionIndex}, built by get_index
 
 	def __init__(self, response, settings = None, parsed = None, name = ""):
 		if not response:
@@ -65,6 +69,7 @@ class Collection(Sequence, dot.DotAccess, mixins.DagLaunchable, mixins.DagDrilla
 		self.settings.setdefault("id", "")													#RESOURCE
 		self.settings.setdefault("idx", "")													#COLL
 		self.settings.setdefault("launch", "")												#RESOURCE
+		self.settings.setdefault("lazy", None)												#COLL
 		self.settings.setdefault("_resource_settings", dag.DotDict())						#RESOURCE
 
 		self.launch_url = self.settings.launch.format(**self.parsed)					#COLL
@@ -123,6 +128,10 @@ class Collection(Sequence, dot.DotAccess, mixins.DagLaunchable, mixins.DagDrilla
 		return DagCmdExecutionContext(self.collectioncmd, self.parsed)
 
 
+	def __getstate__(self):
+		return {k: v for k, v in self.__dict__.items() if k != "_indexes"} # Indexes are rebuilt when queried
+
+
 	def __setstate__(self, d):
 		d["collectioncmd"] = None # Make sure the collectioncmd doesn't get pickled bc it carries a lot of baggage
 		super().__setstate__(d)
@@ -249,17 +258,51 @@ class Collection(Sequence, dot.DotAccess, mixins.DagLaunchable, mixins.DagDrilla
 		return self._new_collection([])
 
 
+	def is_lazy(self, total: int) -> bool:
+		"""Whether Resources should only be built when accessed. Set per-collection via the "lazy" setting, or else by collection size"""
+		if self.settings.lazy is not None:
+			return bool(self.settings.lazy)
+
+		return bool(dag.settings.lazy_collection_size) and total >= dag.settings.lazy_collection_size
+
+
+	@property
+	def merged_resource_settings(self):
+		"""The collection's settings overlaid with its resource settings, as read by each Resource's ResourceInfo. Cached until either changes"""
+		if self._resource_settings_merge is None:
+			self._resource_settings_merge = dot.MergeCache()
+
+		return self._resource_settings_merge.get(self.settings, self.settings._resource_settings)
+
+
 	def _setup(self, response):
 		if isinstance(response, dag.Response) and dag.is_mapping(response):
 			response = [v for v in response._values()]
 
-		self.resources = [setup_resource(r, self, self._resource_class) for r in response] # No clue why, but setup_resource seems much faster than having Resource(r,self) in the listcomp
+		if self.is_lazy(len(response)):
+			# Raw items, so that DagResponses are only made for the Resources that get built
+			self.resources = LazyResources(self, response._data if isinstance(response, dag.Response) else response)
+		else:
+			self.resources = [setup_resource(r, self, self._resource_class) for r in response] # No clue why, but setup_resource seems much faster than having Resource(r,self) in the listcomp
 
 		self.process_resources()
 
 
+	def _setup_resource(self, item):
+		"""Builds a LazyResources item on first access"""
+		resource = setup_resource(item, self, self._resource_class)
+		self.process_resource_values(resource)
+		return resource
+
+
 
 	def process_resources(self):
+		self.invalidate_indexes()
+
+		if isinstance(self.resources, LazyResources):
+			self._choicesdict, self._ids = build_index(self.resources, self.merged_resource_settings, self.resource_settings, self.settings.label_ignore_chars)
+			return
+
 		self._choicesdict = {}
 		self._ids = {}
 
@@ -271,23 +314,27 @@ class Collection(Sequence, dot.DotAccess, mixins.DagLaunchable, mixins.DagDrilla
 			if id := resource._dag.id:
 				self._ids[id] = resource
 
-			if (datevalues := self.resource_settings.datevalues):
-				for dateval in dag.listify(datevalues):
-					try:
-						dateentry = dag.drill(resource, dateval)
-						dtime = dag.DTime(dateentry)
-						dag.util.drill.set_idx_via_drill(dateval, dtime, resource._response)
-					except ValueError:
-						pass
+			self.process_resource_values(resource)
+
 
-			if (uuidvalues := self.resource_settings.uuidvalues):
-				for uv in dag.listify(uuidvalues):
-					try:
-						uuidentry = dag.drill(resource, uv)
-						uuidvalue = daguuid.DagUUID(uuidentry)
-						dag.util.drill.set_idx_via_drill(uv, uuidvalue, resource._response)
-					except ValueError:
-						pass
+	def process_resource_values(self, resource):
+		if (datevalues := self.resource_settings.datevalues):
+			for dateval in dag.listify(datevalues):
+				try:
+					dateentry = dag.drill(resource, dateval)
+					dtime = dag.DTime(dateentry)
+					dag.util.drill.set_idx_via_drill(dateval, dtime, resource._response)
+				except ValueError:
+					pass
+
+		if (uuidvalues := self.resource_settings.uuidvalues):
+			for uv in dag.listify(uuidvalues):
+				try:
+					uuidentry = dag.drill(resource, uv)
+					uuidvalue = daguuid.DagUUID(uuidentry)
+					dag.util.drill.set_idx_via_drill(uv, uuidvalue, resource._response)
+				except ValueError:
+					pass
 
 
 
@@ -317,7 +364,7 @@ class Collection(Sequence, dot.DotAccess, mixins.DagLaunchable, mixins.DagDrilla
 
 
 	def drill(self, drillee):
-		return [dag.drill(res, drillee) for res in self]
+		return dag.util.drill.drill_all(self, drillee)
 
 
 	def map(self, lamb):
@@ -351,7 +398,8 @@ class Collection(Sequence, dot.DotAccess, mixins.DagLaunchable, mixins.DagDrilla
 			if drillparts and drillparts[0] not in self.keys():
 				raise AttributeError(f"Attribute \"{attr}\" not found in collection \"{self.name}\"")
 
-			key = lambda x: dag.drill(x, attr) or ""
+			driller = dag.util.drill.compile_drill(attr)
+			key = lambda x: driller(x) or ""
 
 		return self.update_collection(self.create_subcollection(comparison.sortlist(self.resources, key = key, reverse = reverse)))
 
@@ -567,18 +615,41 @@ class Collection(Sequence, dot.DotAccess, mixins.DagLaunchable, mixins.DagDrilla
 		return PartitionedCollection(attr, self)
 
 
-	def get_values_of(self, attr):
-		parts = set()
+	def get_index(self, attr: str) -> CollectionIndex:
+		"""The (lazily built) index of the resources' values for a drill path. Rebuilt if the resources have changed since"""
+		if self._indexes is None:
+			self._indexes = {}
 
-		for resource in self.resources:
-			if callable(attr):
-				part = attr(resource)
-			else:
-				part = dag.drill(resource, attr)
+		index = self._indexes.get(attr)
+
+		if index is None or index.resources is not self.resources or len(index.values) != len(self.resources):
+			index = self._indexes[attr] = CollectionIndex(self.resources, attr)
+
+		return index
 
-			parts.add(part)
 
-		return [*parts]
+	def invalidate_indexes(self):
+		self._indexes = None
+
+
+	def filter_by(self, attr: str, op = "==", *values):
+		"""The resources whose drilled attr compares (via op) to any of the values. Uses the attr's index"""
+		try:
+			op = comparison.ops[op] if isinstance(op, str) else op
+		except KeyError as e:
+			raise AttributeError(f"Invalid comparison operator: {op}") from e
+
+		index = self.get_index(attr)
+		positions = sorted({i for value in values for i in index.find(op, value)})
+
+		return self.create_subcollection(index.get_resources(positions))
+
+
+	def get_values_of(self, attr):
+		if callable(attr):
+			return [*{attr(resource) for resource in self.resources}]
+
+		return [*set(dag.util.drill.drill_all(self.resources, attr))]
 
 
 	def add_shortcut(self, name, resource):
@@ -669,7 +740,7 @@ class Collection(Sequence, dot.DotAccess, mixins.DagLaunchable, mixins.DagDrilla
 			
 
 	def add_resource(self, resource):
-		assert type(resource) == self._resource_class, f"When adding resource to Collection, it must be of type {self._resource_class.__name__}"
+		assert isinstance(resource, self._resource_class), f"When adding resource to Collection, it must be of type {self._resource_class.__name__}"
 		assert resource._dag.collection == self, "Resource must come from same Collection"
 		
 		self.resources.append(resource)
@@ -0,0 +1,157 @@
+import bisect, operator, re
+from numbers import Number
+
+from dag.util import drill
+
+
+MISSING = object() # The value of resources the index's drill failed on. These never match
+
+# Values that can be indexed: Comparing them can't be overridden by _dag_filt_value, and they hash like they compare
+PLAIN_TYPES = (str, int, float, bool, type(None))
+
+ORDERING_OPS = {operator.lt, operator.le, operator.gt, operator.ge}
+
+
+
+def get_sort_family(value: object) -> type | None:
+	"""Plain values can only be ordered against others from the same family. None if the value can't be ordered"""
+	if isinstance(value, str):
+		return str
+
+	if isinstance(value, Number) and value == value: # NaN never compares, so isn't sorted
+		return Number
+
+	return None
+
+
+
+class CollectionIndex:
+	"""
+	The values of one drill path over every resource in a collection, drilled once and then queried repeatedly
+
+	Equality queries use a hash index and ordering queries use sorted indexes, both built on first use. If any value isn't
+	plain (e.g.: it's a DTime with its own _dag_filt_value), queries scan the cached values instead
+
+	Queries return positions into the collection's resources, in order
+	"""
+
+	def __init__(self, resources, attr: str):
+		self.resources = resources
+		self.attr = attr
+
+		self.values = self.drill_values(resources, attr)
+		self.is_plain = all(value is MISSING or type(value) in PLAIN_TYPES for value in self.values)
+
+		self.hashindex = None
+		self.sortedindexes = None
+
+
+	@staticmethod
+	def drill_values(resources, attr: str) -> list:
+		driller = drill.compile_drill(attr)
+		values = []
+
+		for resource in resources:
+			try:
+				values.append(driller(resource))
+			except (Exception, drill.DagDrillError):
+				values.append(MISSING)
+
+		return values
+
+
+	def get_hashindex(self) -> dict:
+		if self.hashindex is None:
+			self.hashindex = {}
+
+			for i, value in enumerate(self.values):
+				if value is not MISSING:
+					self.hashindex.setdefault(value, []).append(i)
+
+		return self.hashindex
+
+
+	def get_sortedindexes(self) -> dict:
+		"""{sort family: (sorted values, their positions)}"""
+		if self.sortedindexes is None:
+			families = {}
+
+			for i, value in enumerate(self.values):
+				if value is not MISSING and (family := get_sort_family(value)):
+					families.setdefault(family, []).append((value, i))
+
+			self.sortedindexes = {}
+
+			for family, pairs in families.items():
+				pairs.sort(key = lambda pair: pair[0])
+				self.sortedindexes[family] = ([value for value, i in pairs], [i for value, i in pairs])
+
+		return self.sortedindexes
+
+
+	def get_resources(self, positions: list[int]) -> list:
+		return [self.resources[i] for i in positions]
+
+
+
+
+	def find(self, op, value: object) -> list[int]:
+		"""The positions of the resources whose value satisfies op(value, given value), as FiltArg filters them"""
+		if self.is_plain and type(value) in PLAIN_TYPES:
+			if op is operator.eq:
+				return [*self.get_hashindex().get(value, [])]
+
+			if op is operator.ne:
+				matches = set(self.get_hashindex().get(value, []))
+				return [i for i, v in enumerate(self.values) if v is not MISSING and i not in matches]
+
+			if op in ORDERING_OPS:
+				return self.find_ordered(op, value)
+
+		return self.scan(op, value)
+
+
+	def find_ordered(self, op, value: object) -> list[int]:
+		if not (family := get_sort_family(value)) or family not in (sortedindexes := self.get_sortedindexes()):
+			return [] # Comparing across families raises TypeError, which filtering treats as not matching
+
+		keys, positions = sortedindexes[family]
+
+		match op:
+			case operator.lt:
+				positions = positions[:bisect.bisect_left(keys, value)]
+			case operator.le:
+				positions = positions[:bisect.bisect_right(keys, value)]
+			case operator.gt:
+				positions = positions[bisect.bisect_right(keys, value):]
+			case operator.ge:
+				positions = positions[bisect.bisect_left(keys, value):]
+
+		return sorted(positions)
+
+
+	def scan(self, op, value: object) -> list[int]:
+		positions = []
+
+		for i, drilledvalue in enumerate(self.values):
+			if drilledvalue is MISSING:
+				continue
+
+			try:
+				try:
+					result = drilledvalue._dag_filt_value(op, value)
+				except:
+					result = op(drilledvalue, value)
+
+				if result and result != NotImplemented:
+					positions.append(i)
+			except Exception:
+				continue
+
+		return positions
+
+
+	def search(self, pattern: str, flags: int = 0) -> list[int]:
+		"""The positions of the resources whose value (as a string) matches the regex"""
+		regex = re.compile(str(pattern), flags)
+		return [i for i, value in enumerate(self.values) if value is not MISSING and regex.search(str(value))]
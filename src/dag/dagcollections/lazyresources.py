@@ -0,0 +1,172 @@
+from collections.abc import MutableMapping, Sequence
+
+import dag
+from dag.util import jsonstream
+from dag.util.drill import DagDrillError
+
+
+
+class LazyResources(Sequence):
+	"""A Collection's Resources, where each Resource is only built the first time it's accessed"""
+
+	def __init__(self, collection, items):
+		self.collection = collection
+		self.items = list(items)
+		self.resources = [None] * len(self.items)
+
+
+	def materialize(self, idx: int):
+		resource = self.resources[idx]
+
+		if resource is None:
+			resource = self.resources[idx] = self.collection._setup_resource(self.items[idx])
+
+		return resource
+
+
+	@property
+	def total_materialized(self) -> int:
+		return len(self.resources) - self.resources.count(None)
+
+
+	def __getitem__(self, idx):
+		if isinstance(idx, slice):
+			return [self.materialize(i) for i in range(*idx.indices(len(self.items)))]
+
+		return self.materialize(idx)
+
+
+	def __len__(self):
+		return len(self.items)
+
+
+	def __iter__(self):
+		for i in range(len(self.items)):
+			yield self.materialize(i)
+
+
+	def append(self, resource):
+		self.items.append(resource)
+		self.resources.append(resource)
+
+
+	def __add__(self, other):
+		return [*self] + [*other]
+
+
+	def __radd__(self, other):
+		return [*other] + [*self]
+
+
+
+class ResourceIndex(MutableMapping):
+	"""Maps labels/ids to Resources. Entries may be stored as indexes into LazyResources, and are only materialized when looked up"""
+
+	def __init__(self, resources):
+		self.resources = resources
+		self.entries = {}
+
+
+	def set_index(self, key, idx: int) -> None:
+		self.entries[key] = idx
+
+
+	def __getitem__(self, key):
+		value = self.entries[key]
+		return self.resources.materialize(value) if type(value) is int else value
+
+
+	def __setitem__(self, key, value):
+		self.entries[key] = value
+
+
+	def __delitem__(self, key):
+		del self.entries[key]
+
+
+	def __contains__(self, key):
+		return key in self.entries
+
+
+	def __iter__(self):
+		return iter(self.entries)
+
+
+	def __len__(self):
+		return len(self.entries)
+
+
+
+
+def get_raw_path(setting) -> list[str | int] | None:
+	"""The setting as a list of keys, if it's a plain drill string that can be looked up directly in raw item data"""
+	if not isinstance(setting, str) or not setting or "{" in setting:
+		return None
+
+	return jsonstream.get_stream_path(setting)
+
+
+def get_raw_value(item, path: list[str | int]):
+	"""Looks up a scalar value in an item's raw data. Raises LookupError if the slow path must be used to get identical results"""
+	from dag.dagcollections.resource import Resource
+
+	if isinstance(item, Resource):
+		item = item._response
+
+	if isinstance(item, dag.Response):
+		item = item._data
+
+	if type(item) is not dict:
+		raise LookupError(path)
+
+	try:
+		value = jsonstream.drill_path(item, path)
+	except DagDrillError as e:
+		raise LookupError(path) from e
+
+	if isinstance(value, (dict, list)):
+		raise LookupError(path)
+
+	return value
+
+
+def build_index(resources: LazyResources, settings, resource_settings, label_ignore_chars) -> tuple[ResourceIndex, ResourceIndex]:
+	"""
+	Builds a Collection's choicesdict and ids in one pass over its raw items, without creating Resources
+
+	Items whose label/id can't be looked up directly (e.g.: LambdaBuilder or format-string settings) fall back to
+	building the Resource and asking its ResourceInfo, so the results match an eagerly-built Collection
+	"""
+
+	choicesdict = ResourceIndex(resources)
+	ids = ResourceIndex(resources)
+
+	labelsetting = settings.get("label") if resource_settings.label else None
+	labelpath = get_raw_path(labelsetting)
+	labelchars = settings.label_ignore_chars
+	idsetting = settings.get("id")
+	idpath = get_raw_path(idsetting)
+
+	for i, item in enumerate(resources.items):
+		if labelsetting:
+			try:
+				label = get_raw_value(item, labelpath) if labelpath is not None else resources.materialize(i)._dag.label
+
+				if labelpath is not None:
+					label = dag.slugify(label, ignore_chars = labelchars) if isinstance(label, str) else ""
+			except LookupError:
+				label = resources.materialize(i)._dag.label
+
+			if label:
+				choicesdict.set_index(label if labelchars == label_ignore_chars else dag.slugify(label, ignore_chars = label_ignore_chars), i)
+
+		if idsetting:
+			try:
+				id = str(get_raw_value(item, idpath)) if idpath is not None else resources.materialize(i)._dag.id
+			except LookupError:
+				id = resources.materialize(i)._dag.id
+
+			if id:
+				ids.set_index(id, i)
+
+	return choicesdict, ids
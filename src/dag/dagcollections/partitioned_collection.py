@@ -3,6 +3,7 @@ from collections.abc import MutableMapping
 
 import dag
 from dag.lib import comparison
+from dag.dagcollections.collectionindex import MISSING
 
 
 class PartitionedCollection(MutableMapping):
@@ -24,12 +25,15 @@ class PartitionedCollection(MutableMapping):
 	def _build_partition(self, attr):
 		parts = OrderedDict()
 
-		for resource in self.resources:
-			if callable(attr):
-				part = attr(resource)
-			else:
-				part = dag.drill(resource, attr)
+		if callable(attr):
+			partvalues = [attr(resource) for resource in self.resources]
+		else:
+			partvalues = self.collection.get_index(attr).values
+
+			if any(value is MISSING for value in partvalues):
+				partvalues = dag.util.drill.drill_all(self.resources, attr) # Raises the drill error
 
+		for part, resource in zip(partvalues, self.resources):
 			parts.setdefault(part, []).append(resource)
 			
 		for part in parts:
@@ -11,6 +11,41 @@ from dag.util import mixins, lambdabuilders
 
 
 
+MAX_KEYED_CLASSES = 1024
+
+# Resource subclasses holding a ProxyDescriptor for each of a response's keys, stored by (base class, keys)
+keyed_classes = {}
+
+
+def get_keyed_resource_class(cls: type, keys: tuple) -> type:
+	"""
+	Returns a subclass of cls with a ProxyDescriptor for each key, so that the keys resolve before cls's own attributes
+
+	Resources with the same keys share one subclass, so building a Resource never mutates a class
+	"""
+
+	try:
+		return keyed_classes[cls, keys]
+	except KeyError:
+		pass
+
+	if len(keyed_classes) >= MAX_KEYED_CLASSES:
+		return cls
+
+	base = getattr(cls, "_dag_keyed_base", None) or cls
+	attrs = {name: ProxyDescriptor("_response", name) for name in keys if isinstance(name, str) and not name.startswith("__")}
+	attrs |= {"__module__": base.__module__, "__qualname__": base.__qualname__, "_dag_keyed_base": base}
+
+	keyedcls = keyed_classes[cls, keys] = type(base.__name__, (base,), attrs)
+	return keyedcls
+
+
+def restore_resource(cls: type):
+	"""The state is restored afterwards by Resource.__setstate__, so that the ResourceInfo's reference back to the Resource can be unpickled"""
+	return cls.__new__(cls)
+
+
+
 class Resource(mixins.DagLaunchable, mixins.CacheFileNamer, mixins.DagStyleFormattable, mixins.DagDrillable, dot.DotAccess, mixins.DagSettings):
 	def __init__(self, response, collection = None):
 		breakpoint(collection)
@@ -18,8 +53,7 @@ class Resource(mixins.DagLaunchable, mixins.CacheFileNamer, mixins.DagStyleForma
 			response = dag.Response(response)
 
 		if dag.is_mapping(response):
-			for name in response._data.keys():
-				setattr(self.__class__, name, ProxyDescriptor("_response", name))
+			self.__class__ = get_keyed_resource_class(type(self), tuple(response._data))
 
 		self._response = response or dag.Response({})
 
@@ -34,6 +68,18 @@ class Resource(mixins.DagLaunchable, mixins.CacheFileNamer, mixins.DagStyleForma
 		return self._dag
 
 
+	def __reduce__(self):
+		# Keyed subclasses are made at runtime and can't be pickled by reference, so pickle as the base class
+		return restore_resource, (getattr(type(self), "_dag_keyed_base", None) or type(self),), self.__getstate__()
+
+
+	def __setstate__(self, state):
+		super().__setstate__(state)
+
+		if dag.is_mapping(self._response):
+			self.__class__ = get_keyed_resource_class(type(self), tuple(self._response._data))
+
+
 	def __class_getitem__(cls, item):
 		# Get item via Annotated.__metadata__. Get cls by Annotated.__origin__
 		return GenericAlias(cls, item)
@@ -188,17 +234,20 @@ class ResourceInfo:
 
 
 	def __getattr__(self, attr):
+		if attr.startswith("__") or "collection" not in self.__dict__:
+			raise AttributeError(attr) # e.g.: Unpickling looks up __setstate__ before collection is restored
+
 		item = self.settings.get(attr)
 
 		if isinstance(item, ResourcesLambdaBuilder):
-			return item(self.resource)
+			return item._do_call(self.resource) # Skips checking whether the call is being recorded, since it's not
 
 		return item
 
 
 	@property
 	def settings(self):
-		return self.collection.settings | self.collection.settings._resource_settings
+		return self.collection.merged_resource_settings
 
 
 	@property
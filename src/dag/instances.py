@@ -13,6 +13,23 @@ class Instance:
 	
 	def __init__(self):
 		dag.is_instance_running = True
+		self._httppools = None
+
+
+	@property
+	def httppools(self):
+		"""The keep-alive HTTP connection pools shared by every IOMethod call made during this instance"""
+		if self._httppools is None:
+			from dag.io.httppools import HttpConnectionPools
+			self._httppools = HttpConnectionPools()
+
+		return self._httppools
+
+
+	def close_httppools(self) -> None:
+		if self._httppools is not None:
+			self._httppools.close()
+			self._httppools = None
 
 
 	def init_view(self):
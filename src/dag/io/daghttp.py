@@ -16,17 +16,56 @@ class HttpCall(IOSession):
 
 	def process_settings(self, settings):
 		settings.setdefault("response_parser", dag.ctx.active_dagcmd.settings.response_parser or dag.JSON)
+		settings.setdefault("pooled", True)
 		return settings
 
 
 	def io_session(self):
-		return self.settings.get("sess") or session()
+		if sess := self.settings.get("sess"):
+			return sess
+
+		if not self.settings.get("pooled"):
+			return session()
+
+		from dag.io import httppools # lazy import here because httppools is only needed for pooled sessions
+
+		# Calls made by the same app share a keep-alive connection pool
+		baseurl = dag.ctx.active_dagcmd.settings.baseurl or ""
+		return session(poolkey = httppools.HttpConnectionPools.get_key(baseurl, (self.targets or [""])[0]))
 
 	def process_targets(self):
 		urls = self.targets
 		return [(dag.ctx.active_dagcmd.settings.baseurl or "") + u if not re.search(r'^http.?://', u) else u for u in urls]
 
 
+	def concurrency_group(self, url):
+		return urllib.parse.urlsplit(url).netloc
+
+
+	def get_cache_meta(self, response):
+		try:
+			return {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+		except AttributeError:
+			return {}
+
+
+	def get_revalidation_runsettings(self, runsettings, cachemeta):
+		headers = {}
+
+		if etag := cachemeta.get("etag"):
+			headers["If-None-Match"] = etag
+
+		if last_modified := cachemeta.get("last_modified"):
+			headers["If-Modified-Since"] = last_modified
+
+		# Sent with this request only, since the session (and its headers) is shared by every target in the call
+		return runsettings | {"request_headers": headers}
+
+
+	def is_not_modified(self, response):
+		return getattr(response, "status_code", None) == 304
+
+
 	def process_bytes(self, response):
 		return bytes(response.content)
 
@@ -38,6 +77,22 @@ class HttpCall(IOSession):
 			return response
 
 
+	def get_response_stream(self, response):
+		# Hooks (or error handling) may have already read the body
+		if getattr(response, "_content_consumed", True):
+			return super().get_response_stream(response)
+
+		response.raw.decode_content = True
+		return response.raw
+
+
+	def close_response(self, response):
+		try:
+			response.close()
+		except AttributeError:
+			pass
+
+
 	def process_action(self):
 		self.action = getattr(self.io_sess.session, self.action_name)		
 
@@ -64,7 +119,7 @@ class HttpCall(IOSession):
 
 		auth = dag.ctx.active_dagcmd.settings.auth if not dag.ctx.setting_token else None
 
-		response = self.action(url, json = sess.json or None, data = sess.data, files = sess.files, auth = auth, verify = sess.verify)
+		response = self.action(url, json = sess.json or None, data = sess.data, files = sess.files, auth = auth, verify = sess.verify, headers = kwargs.get("request_headers"), stream = self.get_stream_path() is not None)
 
 		if kwargs.get("pager"):
 			kwargs.get("pager").run_pager(url, response)
@@ -146,11 +201,13 @@ def get_file(url, filename, getter = None, directory = ".", **kwargs): # Not sur
 
 
 class DagHttpSession(dag.DotAccess):
-	def __init__(self, *args, **kwargs):
+	def __init__(self, *args, poolkey = None, **kwargs):
 		self.args = args
 		self.kwargs = kwargs
 		self.session = None
 		self.entrances = 0
+		self.poolkey = poolkey			# If set, the session's adapters are borrowed from the instance's HttpConnectionPools
+		self.pooled_prefixes = []
 
 		
 	def __enter__(self):
@@ -159,6 +216,10 @@ class DagHttpSession(dag.DotAccess):
 		if self.session is None:
 			self.session = requests.session(*self.args, **self.kwargs)
 
+			if self.poolkey is not None:
+				from dag.io import httppools # lazy import here because httppools is only needed for pooled sessions
+				self.pooled_prefixes = httppools.get_pools().mount(self.session, self.poolkey)
+
 		self.entrances += 1
 
 		return self
@@ -168,6 +229,10 @@ class DagHttpSession(dag.DotAccess):
 		self.entrances -= 1
 
 		if self.entrances <= 0:	# Set up this way in case session is entered into after started earlier somewhere else (Might not be necessary bc CTXManager is a class, not obj)
+			if self.pooled_prefixes:
+				from dag.io import httppools # lazy import here because httppools is only needed for pooled sessions
+				httppools.HttpConnectionPools.unmount(self.session, self.pooled_prefixes) # Keeps pooled connections alive after the session closes
+
 			self.session.__exit__()
 
 
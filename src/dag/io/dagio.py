@@ -1,11 +1,12 @@
-import copy
+import copy, io
 from functools import partial
 from contextlib import contextmanager
 
 import dag
 from dag.lib import concurrency
 from dag.cachefiles import cachefiles
-from dag.responses import registered_parsers, parse_response_item, ResponseParserAttrSettings
+from dag.responses import registered_parsers, parse_response_item, parse_response_stream, ResponseParserAttrSettings
+from dag.util import jsonstream
 
 
 registered_iomethods = dag.ItemRegistry()
@@ -28,8 +29,10 @@ class IOMethod(ResponseParserAttrSettings):
 		self.set_settings_attr("CACHE", "cache", True)
 		self.set_settings_attr("BYTES", "bytes", True)
 		self.set_settings_attr("RAW", "raw", True)
+		self.set_settings_attr("STREAM", "stream", True)
 		self.set_settings_attr("MULTIPROCESS", "concurrency_map", concurrency.multiprocess_map, default = concurrency.multithread_map)
 		self.set_settings_attr("MULTITHREAD", "concurrency_map", concurrency.multithread_map, default = concurrency.multiprocess_map)
+		self.set_settings_attr("ASYNC", "concurrency_map", concurrency.async_map, default = concurrency.multiprocess_map)
 
 
 
@@ -69,7 +72,17 @@ class IOSession:
 
 
 	def run_concurrent(self, action, targets, *args):
-		return self.settings['concurrency_map'](action, targets, *args)
+		concurrency_map = self.settings['concurrency_map']
+
+		if concurrency_map is concurrency.async_map:
+			return concurrency_map(action, targets, *args, groupfn = self.concurrency_group, group_limit = dag.settings.async_group_limit)
+
+		return concurrency_map(action, targets, *args)
+
+
+	def concurrency_group(self, target):
+		"""The group a target belongs to when bounding async concurrency"""
+		return None
 
 
 	@contextmanager
@@ -100,23 +113,99 @@ class IOSession:
 		return cachefiles.read(dagmod_name, target)
 
 
+	def get_cache_ttl(self):
+		"""Seconds that a cached response stays fresh. Set per-call via the cache_ttl setting, or per-dagcmd via the dagcmd's cache_ttl setting"""
+		if (ttl := self.settings.get("cache_ttl")) is not None:
+			return ttl
+
+		try:
+			return dag.ctx.active_dagcmd.settings.cache_ttl
+		except AttributeError:
+			return None
+
+
+	def get_revalidation_runsettings(self, runsettings, cachemeta):
+		"""Adds run settings that ask the target whether a stale cached response is still valid"""
+		return runsettings
+
+
+	def is_not_modified(self, response) -> bool:
+		"""Whether a revalidation response says that the cached response is still valid"""
+		return False
+
+
+	def get_cache_meta(self, response) -> dict:
+		"""Metadata stored alongside a cached response, used for later revalidation"""
+		return {}
+
+
+	def get_stream_path(self):
+		"""If streaming, the drill path (as keys/indices) to parse out of the response. None means the response is parsed whole"""
+		if not self.settings.get("stream") or self.settings.get("bytes"):
+			return None
+
+		return jsonstream.get_stream_path(self.settings.get("drill"))
+
+
+	def is_cache_usable(self, cachemeta: dict) -> bool:
+		"""A streamed response is cached as only its drilled-into value, which is only the response to calls streaming the same path"""
+		if not (drilled := cachemeta.get("drilled")):
+			return True
+
+		return isinstance(drilled, list) and drilled == self.get_stream_path()
+
+
+	def get_response_stream(self, response):
+		"""A binary file object that the response parser can read incrementally"""
+		response = self.prepare_response_for_parsing(response)
+		return io.BytesIO(response.encode() if isinstance(response, str) else bytes(response))
+
+
+	def close_response(self, response) -> None:
+		pass
+
+
 	def run_action(self, target, *args, **kwargs):
 		runsettings = args[-1] if args else {} # Since multiprocess map doesn't do kwargs, they are passed as a dict to the last arg
 		self.settings |= runsettings # NOTE, KWARGS DOESN'T WORK BECAUSE CONCURRENCY ONLY PASSES ARGS, SO KWARGS ARE PASSED AS A DICT INTO ARGS
 		args = args[:-1] # Remove the runsettings from the args
 
 		dagmod_name = self.get_active_dagmod_name()
+		is_stale = False
+		is_drilled = False
+		is_cache_unusable = False
 
 		if self.settings.get("cache") and not dag.settings.update_all_caches and cachefiles.exists(dagmod_name, target):
-			return self.read_from_cachefile(dagmod_name, target)
+			cachemeta = cachefiles.read_meta(dagmod_name, target)
+
+			if not self.is_cache_usable(cachemeta):
+				is_cache_unusable = True # Streamed with a different drill: Fetched again and overwritten
+			elif cachefiles.is_fresh(dagmod_name, target, self.get_cache_ttl()):
+				return self.read_from_cachefile(dagmod_name, target)
+			else:
+				# Stale: Ask the target whether the cached response is still good (e.g.: HTTP If-None-Match)
+				is_stale = True
+				runsettings = self.get_revalidation_runsettings(runsettings, cachemeta)
 
 		self.process_action()
 
 		dag.echo(f"\n<c b #0F0 / {dag.words.gerund(self.action_name).upper()}:>\n<c u #FFF / {target}>\n")
 		response = self.do_action(target, *args, **runsettings)
 
+		if is_stale and self.is_not_modified(response):
+			self.close_response(response)
+			cachefiles.refresh(dagmod_name, target)
+			response = self.read_from_cachefile(dagmod_name, target)
+
+			if (drillee := self.settings.get("drill")) and not cachemeta.get("drilled"):
+				response = dag.drill(response, drillee)
+
+			return response
+
 		if self.settings.get("raw"): 
 			return response
+
+		cachemeta = self.get_cache_meta(response)
 			
 		if self.settings.get("attr"):
 			response = getattr(response, self.settings['attr'])
@@ -129,17 +218,30 @@ class IOSession:
 			except AttributeError:
 				response_parser = dag.responses.DagResponseParser()
 
-			if response_parser:
+			stream_path = self.get_stream_path()
+
+			if response_parser and stream_path is not None and getattr(response_parser, "supports_stream", False):
+				# Only the drilled-into value is built, so the full document is never held in memory
+				rawresponse = response
+
+				try:
+					response = parse_response_stream(self.get_response_stream(rawresponse), stream_path, response_parser)
+				finally:
+					self.close_response(rawresponse)
+
+				is_drilled = True
+				cachemeta["drilled"] = stream_path # Only the value at this path is cached, so only calls streaming the same path may use it
+			elif response_parser:
 				response = self.prepare_response_for_parsing(response)
 				response = parse_response_item(response, response_parser)
 
 		self.after_action_hooks(response)
 
 		# Write to cache
-		if self.settings.get("cache") and (dag.settings.update_all_caches or not cachefiles.exists(dagmod_name, target)):
-			cachefiles.write(response, dagmod_name, target)
+		if self.settings.get("cache") and (dag.settings.update_all_caches or is_stale or is_cache_unusable or not cachefiles.exists(dagmod_name, target)):
+			cachefiles.write(response, dagmod_name, target, meta = cachemeta)
 
-		if drillee := self.settings.get("drill"):
+		if (drillee := self.settings.get("drill")) and not is_drilled:
 			response = dag.drill(response, drillee)
 
 		return response
@@ -0,0 +1,173 @@
+import threading, time, urllib.parse
+
+import dag
+
+
+HTTP_PREFIXES = ("https://", "http://")
+
+
+class PooledAdapter:
+	"""An HTTPAdapter kept alive between IOMethod calls, plus the bookkeeping needed to expire it"""
+
+	def __init__(self, key: str, pool_size: int):
+		from requests.adapters import HTTPAdapter # lazy import here because importing requests slows down dag load
+
+		self.key = key
+		self.adapter = HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size)
+		self.created = time.monotonic()
+		self.last_used = self.created
+		self.uses = 0
+
+
+	def is_idle(self, idle_timeout: float, now: float) -> bool:
+		return idle_timeout > 0 and now - self.last_used > idle_timeout
+
+
+	def connection_stats(self) -> dict[str, int]:
+		"""Counts the connections opened and requests sent by the adapter's urllib3 host pools"""
+		connections = requests = 0
+		pools = self.adapter.poolmanager.pools
+
+		for poolkey in pools.keys():
+			if (pool := pools.get(poolkey)) is not None:
+				connections += pool.num_connections
+				requests += pool.num_requests
+
+		return {"connections": connections, "requests": requests, "reused": max(requests - connections, 0)}
+
+
+	def close(self) -> None:
+		self.adapter.close()
+
+
+
+class HttpConnectionPools:
+	"""
+	Holds one keep-alive HTTPAdapter per app so that TCP/TLS connections are reused across dag.get/dag.post calls
+
+	Each call still gets its own requests.Session (so headers/params/cookies don't leak between calls),
+	but the session's transport adapters are borrowed from here instead of being built fresh
+	"""
+
+	def __init__(self, pool_size: int | None = None, idle_timeout: float | None = None):
+		self.pool_size = pool_size or dag.settings.http_pool_size or 10
+		self.idle_timeout = idle_timeout if idle_timeout is not None else (dag.settings.http_pool_idle_timeout or 0)
+
+		self.adapters: dict[str, PooledAdapter] = {}
+		self.lock = threading.Lock()
+
+		self.hits = 0
+		self.misses = 0
+		self.expired = 0
+
+
+	@staticmethod
+	def get_key(baseurl: str = "", url: str = "") -> str:
+		"""Pools are keyed by the app's baseurl. When there is no baseurl, the url's host is used instead"""
+		if baseurl:
+			return baseurl
+
+		parsed = urllib.parse.urlsplit(url)
+		return f"{parsed.scheme}://{parsed.netloc}" if parsed.netloc else ""
+
+
+	def get_adapter(self, key: str) -> PooledAdapter:
+		with self.lock:
+			now = time.monotonic()
+			pooled = self.adapters.get(key)
+
+			if pooled is not None and pooled.is_idle(self.idle_timeout, now):
+				pooled.close()
+				self.expired += 1
+				pooled = None
+
+			if pooled is None:
+				pooled = self.adapters[key] = PooledAdapter(key, self.pool_size)
+				self.misses += 1
+			else:
+				self.hits += 1
+
+			pooled.last_used = now
+			pooled.uses += 1
+
+			return pooled
+
+
+	def mount(self, session, key: str) -> list[str]:
+		"""Mounts the pooled adapter onto a requests.Session. Returns the prefixes that were mounted"""
+		adapter = self.get_adapter(key).adapter
+
+		for prefix in HTTP_PREFIXES:
+			session.mount(prefix, adapter)
+
+		return [*HTTP_PREFIXES]
+
+
+	@staticmethod
+	def unmount(session, prefixes: list[str]) -> None:
+		"""Removes pooled adapters from a session so that closing the session leaves the pool's connections open"""
+		for prefix in prefixes:
+			session.adapters.pop(prefix, None)
+
+
+	def prune(self) -> int:
+		"""Closes every adapter that has been idle longer than the idle timeout"""
+		with self.lock:
+			now = time.monotonic()
+			idle = [key for key, pooled in self.adapters.items() if pooled.is_idle(self.idle_timeout, now)]
+
+			for key in idle:
+				self.adapters.pop(key).close()
+
+			self.expired += len(idle)
+			return len(idle)
+
+
+	def close(self) -> None:
+		with self.lock:
+			for pooled in self.adapters.values():
+				pooled.close()
+
+			self.adapters.clear()
+
+
+	@property
+	def hit_rate(self) -> float:
+		lookups = self.hits + self.misses
+		return self.hits / lookups if lookups else 0.0
+
+
+	@property
+	def stats(self) -> dict:
+		pools = {}
+
+		for key, pooled in self.adapters.items():
+			pools[key] = {"uses": pooled.uses, "idle": round(time.monotonic() - pooled.last_used, 3)} | pooled.connection_stats()
+
+		return {
+			"pool_size": self.pool_size,
+			"idle_timeout": self.idle_timeout,
+			"hits": self.hits,
+			"misses": self.misses,
+			"expired": self.expired,
+			"hit_rate": round(self.hit_rate, 3),
+			"pools": pools,
+		}
+
+
+
+# Used when dag is imported as a library and no instance is running
+_default_pools = None
+
+
+def get_pools() -> HttpConnectionPools:
+	"""Returns the connection pools owned by the running dag instance"""
+	global _default_pools
+
+	if dag.instance is not None:
+		return dag.instance.httppools
+
+	if _default_pools is None:
+		_default_pools = HttpConnectionPools()
+
+	return _default_pools
@@ -3,9 +3,6 @@ from collections import namedtuple
 
 import dag
 
-with dag.dtprofiler("import PIL Image"):
-	from PIL import Image
-
 ImgDimensions = namedtuple("ImgDimensions", "height width")
 FILETYPES = [".jpg", ".png", ".jpeg", ".gif", ".bmp", ".tiff"]
 
@@ -1,27 +1,131 @@
+import threading
 from typing import Callable, List, Any
+from collections import defaultdict
 from collections.abc import Sequence
 
 import concurrent.futures
 
 
 
-def run_multiprocess_task(fn: Callable[..., Any], inputs: Sequence[Any], *args) -> list[Any]:
-	from pathos.multiprocessing import ProcessingPool as Pool, cpu_count
+class WorkerPool:
+	"""
+	A pathos worker pool that is created on first use and then reused by every map until it is closed
+
+	Workers import what they need when unpickling tasks, so lazy imports don't outdate a pool. Reloads do: The instance
+	closes dag's pools when it shuts down (See DagCLIInstance.shutdown), and the next instance's maps rebuild them
+	"""
+
+	def __init__(self, kind: str = "process", size: int | None = None):
+		if kind not in ("process", "thread"):
+			raise ValueError(f"WorkerPool kind must be \"process\" or \"thread\", not \"{kind}\"")
+
+		self.kind = kind
+		self.size = size
+		self.pool = None
+		self.lock = threading.Lock()
+
+
+	def get_pool(self):
+		with self.lock:
+			if self.pool is None:
+				from pathos.pools import ProcessPool, ThreadPool
+				from pathos.multiprocessing import cpu_count
+
+				poolclass = ProcessPool if self.kind == "process" else ThreadPool
+				self.pool = poolclass(nodes = self.size or cpu_count(), id = f"dag-{self.kind}-{id(self)}") # PATHOS caches pools by id, so each WorkerPool gets its own
+				self.pool.restart(force = True) # A dead WorkerPool's id may be reused, so make sure this one is running
 
-	#from multiprocessing import Pool, cpu_count
-	pool_count = min(len(inputs), cpu_count())
+			return self.pool
 
-	with Pool(pool_count) as p:
-		p.restart() # PATHOS provides this for if a pool is closed. It will recycle pools even if Pool() is called many times
+
+	def submit(self, fn: Callable[..., Any], inputs: Sequence[Any], *args, chunksize: int | None = None):
+		"""Submits the whole mapping at once. Returns an AsyncResult whose .get() gives results in order of inputs"""
+		inputs = list(inputs)
 
 		# amap zips the args, so each arg needs to be an array equal in length to the inputs
+		zipped_args = [[a]*len(inputs) if not isinstance(a, list) else a for a in args]
+		kwargs = {"chunksize": chunksize} if chunksize else {}
+
+		return self.get_pool().amap(fn, inputs, *zipped_args, **kwargs)
+
+
+	def map(self, fn: Callable[..., Any], inputs: Sequence[Any], *args, chunksize: int | None = None, timeout: float | None = None) -> list[Any]:
+		"""
+		Calls the fn once for each provided input and returns the results in order of inputs
+
+		:param chunksize: How many inputs are sent to a worker at a time
+		:param timeout: How many seconds each task may take. If exceeded, the pool is cancelled and TimeoutError is raised
+		"""
+
+		if not timeout:
+			return self.submit(fn, inputs, *args, chunksize = chunksize).get()
+
+		from multiprocess import TimeoutError as PoolTimeoutError
+
+		# Per-task timeouts require each input to be its own task
+		pool = self.get_pool()
+		tasks = [pool.apipe(fn, item, *args) for item in inputs]
+
+		try:
+			return [task.get(timeout) for task in tasks]
+		except PoolTimeoutError as e:
+			self.cancel()
+			raise TimeoutError(f"WorkerPool task took longer than {timeout} seconds") from e
+
+
+	def _teardown(self, terminate: bool = False) -> None:
+		if self.pool is None:
+			return
+
+		try:
+			self.pool.terminate() if terminate else self.pool.close()
+			self.pool.join()
+		finally:
+			self.pool.clear()
+			self.pool = None
+
+
+	def cancel(self) -> None:
+		"""Abruptly stops any running tasks. The pool is recreated the next time it is used"""
+		with self.lock:
+			self._teardown(terminate = True)
+
+
+	def close(self) -> None:
+		with self.lock:
+			self._teardown()
+
+
+
+class WorkerPools:
+	"""The process and thread pools used by multiprocess_map and multithread_map"""
+
+	def __init__(self):
+		self.process = WorkerPool("process")
+		self.thread = WorkerPool("thread")
+
+
+	def configure(self, process_size: int | None = None, thread_size: int | None = None) -> None:
+		"""Sets pool sizes. Pools whose size changed are closed so that they get rebuilt at the new size"""
+		for pool, size in ((self.process, process_size), (self.thread, thread_size)):
+			if pool.size != size:
+				pool.close()
+				pool.size = size
+
+
+	def close(self) -> None:
 		try:
-			return p.amap(fn, inputs, *[[a]*len(inputs) if not isinstance(a, list) else a for a in args])
-		except Exception as e:
-			breakpoint()
-			pass
+			self.process.close()
 		finally:
-			p.close() #PATHOS isn't properly closing pools, so have to do it myself. Hopefully pathos fixes in future: https://github.com/uqfoundation/pathos/issues/244
+			self.thread.close()
+
+
+workerpools = WorkerPools()
+
+
+
+def run_multiprocess_task(fn: Callable[..., Any], inputs: Sequence[Any], *args) -> list[Any]:
+	return workerpools.process.submit(fn, inputs, *args)
 
 
 def run_multiprocess_get(fn: Callable[..., Any], inputs: Sequence[Any], *args) -> list[Any]:
@@ -69,16 +173,81 @@ def multithread_map(fn: Callable[..., Any], inputs: Sequence[Any], *args) -> lis
 
 	# If input is an array, run in threads
 	if len(inputs) > 1:
-		# We can use a with statement to ensure threads are cleaned up promptly
-		with concurrent.futures.ThreadPoolExecutor() as executor:
-			# map
-			return list(executor.map(fn, inputs, *[[a]*len(inputs) for a in args]))
+		# Nested maps run in a throwaway executor so that they can't deadlock waiting on the shared pool's busy threads
+		if threading.current_thread() is not threading.main_thread():
+			with concurrent.futures.ThreadPoolExecutor() as executor:
+				return list(executor.map(fn, inputs, *[[a]*len(inputs) for a in args]))
+
+		return workerpools.thread.submit(fn, inputs, *[[a]*len(inputs) for a in args]).get()
 
 	# Else, only single input: run normally 	
 	return [fn(inputs[0], *args)]
 
 
 
+_event_loop = None
+
+def get_event_loop() -> "asyncio.AbstractEventLoop":
+	"""Returns the event loop shared by every async_map call, creating it if it doesn't exist yet"""
+	import asyncio # lazy import here because importing asyncio slows down dag load
+	global _event_loop
+
+	if _event_loop is None or _event_loop.is_closed():
+		_event_loop = asyncio.new_event_loop()
+
+	return _event_loop
+
+
+async def _async_map(fn: Callable[..., Any], inputs: Sequence[Any], args: tuple, groupfn: Callable[[Any], Any], group_limit: int) -> list[Any]:
+	import asyncio
+	loop = asyncio.get_running_loop()
+	semaphores = defaultdict(lambda: asyncio.Semaphore(group_limit))
+
+	async def run(item):
+		# Only group_limit inputs from the same group (e.g.: host) are in flight at once
+		async with semaphores[groupfn(item)]:
+			return await loop.run_in_executor(None, fn, item, *args)
+
+	# gather returns results in the order the coroutines were passed in
+	return await asyncio.gather(*[run(item) for item in inputs])
+
+
+def async_map(fn: Callable[..., Any], inputs: Sequence[Any], *args, groupfn: Callable[[Any], Any] | None = None, group_limit: int = 6) -> list[Any]:
+	"""
+	Initiates an asyncio mapping on a single, reused event loop. Calls the fn once for each provided input.
+	Any provided *args are passed into all mappings. Each mapping uses the same args
+
+	Blocking fns (such as HTTP calls) are awaited in the loop's executor, so no processes are forked and nothing is pickled
+
+	If only one input is received, call the function like normal and return in a list
+
+	Results are returned in order of inputs received
+
+	:param fn: The function to be called multiple times
+	:param inputs: The inputs to be passed, one at a time, into a mapping
+	:param args: Any args that must be passed into every maping
+	:param groupfn: Maps an input to its group (e.g.: a URL to its host). Concurrency is bounded per group
+	:param group_limit: The maximum number of inputs from one group that may run at once
+	:returns: A list of the results after each mapping has completed
+	"""
+
+	if len(inputs) <= 1:
+		return [fn(inputs[0], *args)] if inputs else []
+
+	import asyncio # lazy import here because importing asyncio slows down dag load
+	coro = _async_map(fn, inputs, args, groupfn or (lambda item: None), max(group_limit, 1))
+
+	try:
+		asyncio.get_running_loop()
+	except RuntimeError:
+		return get_event_loop().run_until_complete(coro)
+
+	# A loop is already running in this thread (e.g.: called from within prompt_toolkit), so run on a separate thread
+	with concurrent.futures.ThreadPoolExecutor(max_workers = 1) as executor:
+		return executor.submit(asyncio.run, coro).result()
+
+
+
 
 """
 def async_process_data(data):
@@ -1,5 +1,5 @@
 from __future__ import annotations
-import sys, inspect
+import sys, inspect, threading
 from functools import cached_property
 from types import TracebackType
 from typing import NoReturn, Generator
@@ -10,6 +10,25 @@ from contextlib import contextmanager
 
 
 
+class ThreadContextStorage:
+	"""
+	The storage of a Context's variables. Threads running a snapshot (see Context.use_snapshot) get their own copy,
+	so that they can change the context without changing it for other threads. Otherwise, all threads share the storage
+	"""
+
+	def __get__(self, ctx, ctxcls = None):
+		if ctx is None:
+			return self
+
+		data = getattr(ctx._dag_threadlocal, "data", None)
+		return data if data is not None else ctx.__dict__["_dag_shared_data"]
+
+
+	def __set__(self, ctx, data):
+		ctx.__dict__["_dag_shared_data"] = data
+
+
+
 class Context(dot.DotDict):
 	"""
 	A context manager AND context for dagmodules that stores information about variables
@@ -21,14 +40,33 @@ class Context(dot.DotDict):
 		While doing *DO_OPS*, any check against ctx.key returns val
 	"""
 
+	_dict = ThreadContextStorage()
+	_data = ThreadContextStorage()
+
 	def __init__(self):
 		"""
 		An instance of Context, which maintains the states of given variables and allows access to those variables via object attr access
 		"""
+		object.__setattr__(self, '_dag_threadlocal', threading.local())
 		super().__init__()
 
-		# Used to temporarily store context variables
-		object.__setattr__(self, '_data', self._dict)
+
+	def snapshot(self) -> dict:
+		"""The current context variables, to be used by another thread via use_snapshot"""
+		return dict(self._data)
+
+
+	@contextmanager
+	def use_snapshot(self, snapshot: dict) -> Generator[None, None, None]:
+		"""Gives this thread its own copy of a snapshot's context variables until the block ends"""
+		threadlocal = self._dag_threadlocal
+		previous = getattr(threadlocal, "data", None)
+		threadlocal.data = dict(snapshot)
+
+		try:
+			yield
+		finally:
+			threadlocal.data = previous
 
 
 	def __setattr__(self, attr, value):
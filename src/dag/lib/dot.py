@@ -112,6 +112,15 @@ def prep_dotdict(di): # Done outside of DotDict to prevent clogging the .namespa
 
 
 
+def shared_dotdict(cls: type[DotDict], di: dict) -> DotDict: # Done outside of DotDict to prevent clogging the .namespace
+	"""A cls (a DotDict type) directly over di (no copy, no key checks). di is copied before the DotDict's first change, so it may be shared"""
+	dotdict = cls.__new__(cls)
+	dotdict.__dict__.update(_dict = di, _dag_is_shared = True)
+	return dotdict
+
+
+
+
 class DotDict(MutableMapping, DotAccess):
 	"""
 	A class that wraps a dictionary allowing for dot write/access
@@ -121,6 +130,9 @@ class DotDict(MutableMapping, DotAccess):
 	So, with di = {"key": "val"}: di.key == "val"; dict.not_a_key is None
 	"""
 
+	_dag_version = 0 # Bumped on every change, so that MergeCaches know when to re-merge
+	_dag_is_shared = False
+
 	def __init__(self, di = None):
 		"""
 		A DotDict instance containing a dictionary with values
@@ -137,6 +149,14 @@ class DotDict(MutableMapping, DotAccess):
 		object.__setattr__(self, '_dict', di or {})
 
 
+	def _changing(self) -> None:
+		if self._dag_is_shared:
+			object.__setattr__(self, '_dict', dict(self._dict))
+			object.__setattr__(self, '_dag_is_shared', False)
+
+		object.__setattr__(self, '_dag_version', self._dag_version + 1)
+
+
 	def __dir__(self):
 		"""
 		Append internal dict's keys to this object's dir entries
@@ -168,6 +188,7 @@ class DotDict(MutableMapping, DotAccess):
 		if not isinstance(idx, str):
 			raise ValueError(f"DotDict key must be a str (Given: {idx})")
 
+		self._changing()
 		self._dict[idx] = value
 
 
@@ -178,6 +199,7 @@ class DotDict(MutableMapping, DotAccess):
 		:param idx: The index to remove from the dict
 		"""
 
+		self._changing()
 		del self._dict[idx]
 
 
@@ -224,6 +246,7 @@ class DotDict(MutableMapping, DotAccess):
 		if not isinstance(attr, str):
 			raise ValueError(f"DotDict key must be a str (Given: {type(attr)} = {attr})")
 
+		self._changing()
 		self._dict[attr] = value
 		
 
@@ -290,6 +313,52 @@ class DotDict(MutableMapping, DotAccess):
 
 
 
+class MergeCache:
+	"""
+	Caches the merge of DotDict layers (later layers win, as with "layer1 | layer2"), only re-merging once a layer is replaced or changed
+
+	Each get() returns a copy-on-write DotDict over the cached merge, so callers may modify what they're given without affecting the cache
+	"""
+
+	def __init__(self):
+		self.state = None # (each layer's dict, each layer's version, the merged dict). One tuple so that threads never see a partial update
+
+
+	def get(self, *layers: DotDict) -> DotDict:
+		if (state := self.state) is not None:
+			dicts, versions, merged = state
+
+			try:
+				for layer, di, version in zip(layers, dicts, versions):
+					if layer._dict is not di or layer._dag_version != version:
+						break
+				else:
+					return shared_dotdict(type(layers[0]), merged)
+			except AttributeError: # A layer isn't a DotDict
+				pass
+
+		return self.merge(layers)
+
+
+	def merge(self, layers: tuple[DotDict, ...]) -> DotDict:
+		if not all(isinstance(layer, DotDict) for layer in layers):
+			merged = layers[0]
+
+			for layer in layers[1:]:
+				merged = merged | layer
+
+			return merged
+
+		merged = dict(layers[0]._dict)
+
+		for layer in layers[1:]:
+			merged.update({key: layer[key] for key in layer}) # Same as "|": The right side's values are read via __getitem__
+
+		self.state = (tuple(layer._dict for layer in layers), tuple(layer._dag_version for layer in layers), merged)
+		return shared_dotdict(type(layers[0]), merged)
+
+
+
 def maybe_make_dotdict(item: object, dotdict: DotDict) -> object:
 	"""
 	If given item is a dict, turns it into the type of the given dotdict
@@ -0,0 +1,63 @@
+import os, re, subprocess, sys
+from dataclasses import dataclass
+
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportTime:
+	module: str
+	self_ms: float
+	cumulative_ms: float
+	depth: int
+
+
+
+def measure(module: str = "dag", python: str = sys.executable, paths: list[str] | None = None) -> list[ImportTime]:
+	"""
+	Imports a module in a fresh interpreter with "-X importtime" and returns how long each (sub)module took
+
+	Runs in a subprocess so that the measurement is a cold start, unaffected by modules already imported here
+
+	:param paths: Directories to prepend to the subprocess's PYTHONPATH
+	"""
+
+	env = os.environ.copy()
+
+	if paths:
+		env["PYTHONPATH"] = os.pathsep.join([*paths, *filter(None, [env.get("PYTHONPATH")])])
+
+	result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"], capture_output = True, text = True, env = env)
+
+	if result.returncode:
+		raise ImportError(f"Failed to import {module}:\n{result.stderr}")
+
+	return parse(result.stderr)
+
+
+def parse(importtime_output: str) -> list[ImportTime]:
+	times = []
+
+	for line in importtime_output.splitlines():
+		if match := IMPORTTIME_LINE.match(line):
+			selfus, cumulativeus, indent, module = match.groups()
+			times.append(ImportTime(module, int(selfus) / 1000, int(cumulativeus) / 1000, (len(indent) - 1) // 2))
+
+	return times
+
+
+def get_total_ms(times: list[ImportTime], module: str) -> float:
+	"""The cumulative import time of a top-level module"""
+	return max((t.cumulative_ms for t in times if t.module == module), default = 0.0)
+
+
+def report(times: list[ImportTime], prefix: str = "", limit: int = 25) -> str:
+	"""Lists the modules (optionally only those starting with prefix) that cost the most to import"""
+	times = sorted([t for t in times if t.module.startswith(prefix)], key = lambda t: t.cumulative_ms, reverse = True)
+	lines = [f"{'cumulative ms':>14} {'self ms':>9}  module"]
+
+	for t in times[:limit]:
+		lines.append(f"{t.cumulative_ms:>14.1f} {t.self_ms:>9.1f}  {t.module}")
+
+	return "\n".join(lines)
@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+
+class LRUCache:
+	"""A thread-safe least-recently-used cache, bounded by both entry count and (caller-reported) byte size"""
+
+	_missing = object()
+
+	def __init__(self, max_entries: int = 256, max_bytes: int | None = None):
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+
+		self.items: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+		self.bytes = 0
+		self.lock = threading.Lock()
+
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+
+	def __contains__(self, key: Hashable) -> bool:
+		return key in self.items
+
+
+	def __len__(self) -> int:
+		return len(self.items)
+
+
+	def get(self, key: Hashable, default: Any = None) -> Any:
+		with self.lock:
+			item = self.items.get(key, self._missing)
+
+			if item is self._missing:
+				self.misses += 1
+				return default
+
+			self.items.move_to_end(key)
+			self.hits += 1
+			return item[0]
+
+
+	def put(self, key: Hashable, value: Any, size: int = 0) -> None:
+		"""Stores a value. Values larger than max_bytes aren't stored at all"""
+		if self.max_bytes and size > self.max_bytes:
+			self.pop(key)
+			return
+
+		with self.lock:
+			if key in self.items:
+				self.bytes -= self.items.pop(key)[1]
+
+			self.items[key] = (value, size)
+			self.bytes += size
+
+			while len(self.items) > self.max_entries or (self.max_bytes and self.bytes > self.max_bytes):
+				self.bytes -= self.items.popitem(last = False)[1][1]
+				self.evictions += 1
+
+
+	def pop(self, key: Hashable, default: Any = None) -> Any:
+		with self.lock:
+			if key not in self.items:
+				return default
+
+			value, size = self.items.pop(key)
+			self.bytes -= size
+			return value
+
+
+	def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+		"""Removes every entry whose key matches the predicate. Returns the number removed"""
+		with self.lock:
+			keys = [key for key in self.items if predicate(key)]
+
+			for key in keys:
+				self.bytes -= self.items.pop(key)[1]
+
+			return len(keys)
+
+
+	def clear(self) -> None:
+		with self.lock:
+			self.items.clear()
+			self.bytes = 0
+
+
+	@property
+	def stats(self) -> dict:
+		lookups = self.hits + self.misses
+
+		return {
+			"entries": len(self.items),
+			"bytes": self.bytes,
+			"hits": self.hits,
+			"misses": self.misses,
+			"evictions": self.evictions,
+			"hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+		}
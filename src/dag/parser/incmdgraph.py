@@ -0,0 +1,95 @@
+from collections.abc import Iterator
+
+import dag
+from dag.parser import Token
+from dag.parser.incmds import InputCommand, InputCommandBuilder
+
+
+UNIT_TERMINI = [Token.SEMICOLON, Token.DOUBLE_SEMICOLON] # Every other terminus (pipes, "&&", "||") ties the next command to this one
+
+
+
+def split_units(incmdbuilders: list[InputCommandBuilder]) -> list[list[InputCommandBuilder]]:
+	"""
+	Splits a command list into its units: The runs of commands joined by pipes, "&&" or "||", which must run in order.
+	e.g.: "nhl games | grep sea ; weather && mlb games" -> [[nhl games, grep sea], [weather, mlb games]]
+	"""
+
+	units = [[]]
+
+	for incmdbuilder in incmdbuilders:
+		units[-1].append(incmdbuilder)
+
+		if incmdbuilder.terminus in UNIT_TERMINI:
+			units.append([])
+
+	return [unit for unit in units if unit]
+
+
+def yield_tokens(incmdbuilder: InputCommandBuilder) -> Iterator[str]:
+	for token in incmdbuilder.tokens or ():
+		if isinstance(token, str):
+			yield token
+		else:
+			yield from token # CommaLists
+
+
+def is_subinstance_token(token: str) -> bool:
+	return dag.strtools.text_is_wrapped_with_unescaped(token, "(", ")")
+
+
+def is_ctx_mutating(incmd: InputCommand) -> bool:
+	"""
+	Whether a command reads or changes state that other commands in the list use: The last response (e.g.: ">", "last"),
+	session settings, and so on. Dagcmds mark this with the "sequential" setting. Ones that ask for confirmation count too
+	"""
+
+	settings = incmd.settings
+	return bool(settings.get("sequential") or settings.get("confirm") or not settings.get("store_ic_response", True))
+
+
+def is_independent(unit: list[InputCommandBuilder]) -> bool:
+	"""
+	Whether a unit can run at the same time as its neighbours. Subinstance arguments (e.g.: "echo (last)") may read the
+	responses before them, so they make their unit depend on everything before it, as do ctx-mutating commands
+	"""
+
+	if any(is_subinstance_token(token) for incmdbuilder in unit for token in yield_tokens(incmdbuilder)):
+		return False
+
+	# The commands are built here only to find their dagcmds. They're rebuilt when run, since a piped command's args depend on the response before it
+	try:
+		with dag.ctx(piped_responses = None):
+			for incmdbuilder in unit:
+				if any(is_ctx_mutating(incmd) for incmd in incmdbuilder.buildincmds()):
+					return False
+	except Exception:
+		return False # Runs on its own, so that the error is raised in order when it's rebuilt
+
+	return True
+
+
+def schedule(units: list[list[InputCommandBuilder]]) -> list[list[list[InputCommandBuilder]]]:
+	"""
+	Groups units into batches that run one after the other. The units in a batch are independent and run at once.
+	A unit that isn't independent waits for everything before it, and everything after it waits for it, so it gets a batch of its own
+	"""
+
+	batches = []
+	batch = []
+
+	for unit in units:
+		if is_independent(unit):
+			batch.append(unit)
+			continue
+
+		if batch:
+			batches.append(batch)
+			batch = []
+
+		batches.append([unit])
+
+	if batch:
+		batches.append(batch)
+
+	return batches
@@ -12,7 +12,8 @@ from dag.parser.inputscripts import InputScript
 from dag.parser.icresponses import InputCommandResponse
 from dag.parser.incmdlists import InputCommandList
 from dag.parser.incmds import InputCommand
-from dag.parser import dagargparser
+from dag.parser import dagargparser, incmdgraph
+from dag.parser.pipestreams import PipeStream, is_streamable
 
 
 class InputScriptExecutor:
@@ -41,7 +42,12 @@ class InputScriptExecutor:
 
 #>>>> InputCommandListExecutor
 class InputCommandListExecutor:
-	def __init__(self, inscriptexecutor: InputScriptExecutor, iclist: InputCommandList):
+	def __init__(self, inscriptexecutor: InputScriptExecutor, iclist: InputCommandList, *, defer_output: bool = False):
+		"""
+		:param defer_output: Whether to hold the list's output (and the bookkeeping that reads it) until flush_deferred is called.
+			Used to run a unit of the list on another thread while still outputting in order
+		"""
+
 		self.inscriptexecutor = inscriptexecutor
 		self.iclist = iclist
 
@@ -54,63 +60,203 @@ class InputCommandListExecutor:
 		self.last_exception = None
 
 		self.piped_responses = []
+		self.pipestreams = []
+
+		self.deferred = [] if defer_output else None
+
+
+	@property
+	def is_deferring(self) -> bool:
+		return self.deferred is not None
 
 
 	def execute(self) -> InputCommandResponse | None:
-		ic_response = None
+		with dag.ctx(piped_responses = self.piped_responses):
+			try:
+				if self.is_concurrent():
+					return self.execute_concurrently()
+
+				return self.execute_incmds(self.iclist.yield_incmds())
+			finally:
+				self.close_pipestreams()
+
+
+	def is_concurrent(self) -> bool:
+		return not self.is_deferring and len(self.iclist.incmdbuilders) > 1 and dag.settings.concurrent_command_lists
+
+
+	def execute_concurrently(self) -> InputCommandResponse | None:
+		"""
+		Splits the list into units (commands joined by pipes, "&&" or "||") and runs them in batches (see incmdgraph.schedule).
+		The units in a batch run at once, but are output one by one in their original order
+		"""
+
+		for batch in incmdgraph.schedule(incmdgraph.split_units(self.iclist.incmdbuilders)):
+			if len(batch) == 1:
+				self.execute_incmds(self.yield_unit_incmds(batch[0]))
+			else:
+				self.execute_batch(batch)
+
+		return self.last_icresponse
+
+
+	def execute_batch(self, batch: list) -> None:
+		"""
+		Runs each unit on the shared thread pool with its own executor, then outputs them in order
+
+		A unit that raises doesn't stop the others. Later failures are echoed in place. The first is re-raised once every unit
+		has been output, as it would have been if the units had run one by one
+		"""
+
+		snapshot = dag.ctx.snapshot()
 
+		def run(unit):
+			unitexecutor = InputCommandListExecutor(self.inscriptexecutor, self.iclist, defer_output = True)
+
+			with dag.ctx.use_snapshot(snapshot):
+				try:
+					unitexecutor.execute_unit(unit)
+					return unitexecutor, None
+				except Exception as e:
+					return unitexecutor, e
+
+		first_exception = None
+
+		for unitexecutor, exception in concurrency.multithread_map(run, batch):
+			unitexecutor.flush_deferred()
+			self.adopt_results(unitexecutor)
+
+			if exception is not None:
+				if first_exception is not None:
+					dag.instance.view.echo(f"\n<c red>{type(exception).__name__}: {exception}</c>")
+
+				first_exception = first_exception or exception
+
+		if first_exception is not None:
+			raise first_exception
+
+
+	def execute_unit(self, unit: list) -> InputCommandResponse | None:
 		with dag.ctx(piped_responses = self.piped_responses):
-			for incmd in self.iclist.yield_incmds():
+			try:
+				return self.execute_incmds(self.yield_unit_incmds(unit))
+			finally:
+				self.close_pipestreams()
+
+
+	@staticmethod
+	def yield_unit_incmds(unit: list):
+		for incmdbuilder in unit:
+			yield from incmdbuilder.buildincmds()
+
+
+	def defer(self, fn, *args) -> None:
+		"""Calls the fn now, or when flush_deferred is called if this executor's output is deferred"""
+		if self.is_deferring:
+			self.deferred.append((fn, args))
+		else:
+			fn(*args)
+
+
+	def flush_deferred(self) -> None:
+		deferred, self.deferred = self.deferred or [], None
+
+		for fn, args in deferred:
+			fn(*args)
+
+
+	def adopt_results(self, unitexecutor: "InputCommandListExecutor") -> None:
+		"""Takes on the state a unit's executor was left in, as if its commands had been run by this executor"""
+		self.last_icresponse = unitexecutor.last_icresponse or self.last_icresponse
+		self.last_response = unitexecutor.last_response if unitexecutor.last_icresponse else self.last_response
+		self.last_response_no_multicol = unitexecutor.last_response_no_multicol if unitexecutor.last_icresponse else self.last_response_no_multicol
+		self.last_incmd = unitexecutor.last_incmd or self.last_incmd
+		self.active_exception = unitexecutor.active_exception or self.active_exception
+		self.last_exception = unitexecutor.last_exception
+
+
+	def store_response(self, incmd: InputCommand, ic_response: InputCommandResponse | None) -> None:
+		dag.instance.controller.last_incmd = incmd
+		dag.instance.controller.last_ic_response = ic_response # Set here so that commands with semicolons  (e.g. "password-genrate ; >") work
+		self.last_icresponse = ic_response or self.last_icresponse
+		self.last_response = dag.get_terminal().strip_escape_codes(str(self.last_icresponse.response or "")) or ""
+		self.last_response_no_multicol = self.last_icresponse.response_no_multicol or ""
+
+
+	def execute_incmds(self, incmds) -> InputCommandResponse | None:
+		ic_response = None
+
+		for incmd in incmds:
+			try:
 				try:
-					try:
-						if self.last_exception and self.last_incmd.terminus is dag.parser.Token.AND_IF:
-							continue
-						elif self.last_incmd and not self.last_exception and self.last_incmd.terminus is dag.parser.Token.OR_IF:
-							self.last_exception = None
-							continue
-						icexecutor = InputCommandExecutor(self, incmd)
-						ic_response = icexecutor.execute()
-						dag.instance.controller.last_incmd = incmd
-						dag.instance.controller.last_ic_response = ic_response # Set here so that commands with semicolons  (e.g. "password-genrate ; >") work
-						self.last_icresponse = ic_response or self.last_icresponse
-						self.last_response = dag.get_terminal().strip_escape_codes(str(self.last_icresponse.response or "")) or ""
-						self.last_response_no_multicol = self.last_icresponse.response_no_multicol or ""
-
-						if incmd.is_piped:
-							self.piped_responses.append(ic_response.raw_response)
-
-						# If we made it this far, then there were no exceptions. Indicate that here
+					if self.last_exception and self.last_incmd.terminus is dag.parser.Token.AND_IF:
+						continue
+					elif self.last_incmd and not self.last_exception and self.last_incmd.terminus is dag.parser.Token.OR_IF:
 						self.last_exception = None
-					except (Exception, BaseException) as e:
-						self.active_exception = e
-						self.last_exception = e
-						self.inscriptexecutor.last_exception = e
-						raise e
-
-				except OSError as e:
-					dag.instance.view.echo(e)
-					continue
-				except DagError as e:
-					dag.instance.view.echo(f"<c bold>DagError: execution halted:</c>\n\n")
-					#dag.print_traceback()
-					#breakpoint()
-
-					dag.instance.view.echo(f"\n<c red>{e}</c>")
-					continue
-				except DagFalseException as e:
-					response = False
-					ic_response = incmd.generate_response(response, {})
-					dag.instance.view.echo(response)
-					continue
-				except DagExitDagCmd:
-					print("exiting cmd")
-					continue
-				finally:
-					if incmd.is_should_store_input_info:
-						self.last_icrsponse = ic_response
-						self.last_incmd = incmd
-
-			return self.last_icresponse
+						continue
+					icexecutor = InputCommandExecutor(self, incmd)
+					ic_response = icexecutor.execute()
+					self.defer(self.store_response, incmd, ic_response)
+
+					if incmd.is_piped:
+						self.piped_responses.append(ic_response.raw_response)
+
+					# If we made it this far, then there were no exceptions. Indicate that here
+					self.last_exception = None
+				except (Exception, BaseException) as e:
+					self.active_exception = e
+					self.last_exception = e
+					self.inscriptexecutor.last_exception = e
+					raise e
+
+			except OSError as e:
+				self.defer(dag.instance.view.echo, e)
+				continue
+			except DagError as e:
+				self.defer(dag.instance.view.echo, f"<c bold>DagError: execution halted:</c>\n\n")
+				#dag.print_traceback()
+				#breakpoint()
+
+				self.defer(dag.instance.view.echo, f"\n<c red>{e}</c>")
+				continue
+			except DagFalseException as e:
+				response = False
+				ic_response = incmd.generate_response(response, {})
+				self.defer(dag.instance.view.echo, response)
+				continue
+			except DagExitDagCmd:
+				print("exiting cmd")
+				continue
+			finally:
+				if incmd.is_should_store_input_info:
+					self.last_icrsponse = ic_response
+					self.last_incmd = incmd
+
+		return self.last_icresponse
+
+
+	def open_pipestream(self, incmd: InputCommand, parsed, response: object) -> PipeStream:
+		"""
+		Wraps a generator being piped so that the next command consumes it as it's produced. The dagcmd's "pipe_buffer" setting
+		(else dag.settings.pipe_buffer_size) lets the generator run that many items ahead of the consumer in its own thread
+		"""
+
+		if isinstance(response, PipeStream):
+			return response
+
+		if (buffersize := incmd.settings.get("pipe_buffer")) is None:
+			buffersize = dag.settings.pipe_buffer_size
+
+		stream = PipeStream(response, {"parsed": parsed, "active_dagcmd": incmd.dagcmd, "active_incmd": incmd}, buffersize = buffersize or 0)
+		self.pipestreams.append(stream)
+
+		return stream
+
+
+	def close_pipestreams(self) -> None:
+		"""Streams that weren't consumed to the end (e.g.: the pipe ended in "head", or a command failed) stop their producers here"""
+		while self.pipestreams:
+			self.pipestreams.pop().close()
 #<<<< InputCommandListExecutor
 
 
@@ -130,69 +276,155 @@ class InputCommandExecutor:
 					typedparser = dagargparser.TypedParser(incmd)
 					parsed = typedparser.parse()
 
-				for newparsed in incmd.expand_parsed(parsed):
+				parseds = incmd.expand_parsed(parsed)
+
+				if self.is_concurrent(parseds):
+					return self.execute_parsed_incmds_concurrently(incmd, parseds)
+
+				for newparsed in parseds:
 					response = self.execute_parsed_incmd(incmd, newparsed)
 
 				return response
 				#return self.execute_parsed_incmd(incmd, parsed)
 
 
-	def execute_parsed_incmd(self, incmd, parsed) -> InputCommandResponse | None:
+	def is_concurrent(self, parseds: list) -> bool:
+		"""Whether the expanded variants should be run at once. Set per dagcmd by "concurrent_expansion", else by dag.settings"""
+		if len(parseds) < 2 or self.iclistexecutor.is_deferring: # A deferring list is already running on the pool
+			return False
+
+		if (concurrent := self.incmd.settings.get("concurrent_expansion")) is not None:
+			return bool(concurrent)
+
+		return bool(dag.settings.concurrent_expansions)
+
+
+	def execute_parsed_incmds_concurrently(self, incmd, parseds: list) -> InputCommandResponse | None:
+		"""
+		Runs the variants on the shared thread pool, then outputs them one by one in their original order
+
+		A variant that raises doesn't stop the others. Later failures are echoed in place. The first is re-raised once every variant
+		has been output, so that the command list handles it as usual (e.g.: for "&&")
+		"""
+
+		snapshot = dag.ctx.snapshot()
+
+		def run(parsed):
+			with dag.ctx.use_snapshot(snapshot), dag.ctx(parsed = parsed):
+				try:
+					return self.run_parsed_incmd(incmd, parsed, announce = False), None
+				except Exception as e:
+					return None, e
+
 		response = None
-		ic_response = None
+		first_exception = None
 
-		with dag.ctx(parsed = parsed):
-			# Search for metadirectives
-			response = incmd.inputargs.execute("process_incmd_meta", incmd, parsed,  _inputobj_execution_breaker = lambda x: x is not None,)
-
-			# If response is none: No meta data was present. Execute the dagcmd
-			if response is None:
-				#>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
-				# Before Running Command
-				#<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
-				# if tempcache requested and not to be updated and tempcache data already exists: get tempcached response if it exists and requested
-				if incmd.do_read_from_tempcache:
-					response = tempcache.tempcachefiles.read_from_dagcmd_exctx(incmd)
-
-				#>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
-				# Run dagcmd
-				#<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
+		for parsed, (result, exception) in zip(parseds, concurrency.multithread_map(run, parseds)):
+			if exception is not None:
+				if first_exception is not None:
+					dag.instance.view.echo(f"\n<c red>{type(exception).__name__}: {exception}</c>")
+
+				first_exception = first_exception or exception
+				continue
+
+			with dag.ctx(parsed = parsed):
 				dag.instance.view.pre_incmd_execute(incmd, parsed)
-				ic_response = incmd.generate_response(response, parsed)
-
-				#>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
-				# After running dagcmd
-				#<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
-				# If response is dag.Error: Print error and return
-				if isinstance(ic_response.raw_response, dag.Error):
-					dag.instance.view.echo(f"DagError: <c red / {ic_response.raw_response.message}>")
-					return ic_response
-				# If display styling hasn't been disabled: Style the response for CLI display
-				if not dag.settings.noformat and not incmd.is_piped and not incmd.terminus is dag.parser.Token.DOUBLE_SEMICOLON:
-					ic_response.generate_formatted_response_for_cli(parsed)
-
-				# If tempcache had been requested: Append response saying so
-				if incmd.do_read_from_tempcache:
-					ic_response.prepend_response("<c red/Reading from tempcache\n----------------------------\n\n>")
-
-				processed_response = incmd.outputprocessor.process_output(ic_response, self)
-
-				# If tempcache is enabled on dagcmd and response wasn't read from tempcache: Write to TempCache, if possible
-				if False and incmd.do_write_to_tempcache:
-					try:
-						tempcache.tempcachefiles.write_from_dagcmd_exctx(ic_response.raw_response, incmd)
-						#concurrency.run_multiprocess_task(tempcache.tempcachefiles.write_from_dagcmd_exctx, [ic_response.raw_response, incmd]) -> keeps being buggy
-					except Exception as e:
-						dag.instance.view.echo(f"\n\n<c red>Could not write to tempcache ({e})</c>")
-						pass
-
-				# If processed_response is None: The output is meant for CLI. Process accordingly
-				if processed_response is None:
-					dag.instance.controller.process_dagcmd_response_for_cli(ic_response, self)
-					
-			# Else, meta data was present: Style and output the data
-			else:
-				ic_response = incmd.generate_response(response, parsed)
-				incmd.outputprocessor.process_output(ic_response, self)
+				response = self.output_parsed_incmd(incmd, parsed, *result)
+
+		if first_exception is not None:
+			raise first_exception
 
-			return ic_response
\ No newline at end of file
+		return response
+
+
+	def execute_parsed_incmd(self, incmd, parsed) -> InputCommandResponse | None:
+		with dag.ctx(parsed = parsed):
+			# Piped responses aren't output, and the next command needs them now
+			if self.iclistexecutor.is_deferring and not incmd.is_piped:
+				is_meta, ic_response = self.run_parsed_incmd(incmd, parsed, announce = False)
+				self.iclistexecutor.defer(self.output_deferred_parsed_incmd, incmd, parsed, is_meta, ic_response)
+				return ic_response
+
+			is_meta, ic_response = self.run_parsed_incmd(incmd, parsed)
+			return self.output_parsed_incmd(incmd, parsed, is_meta, ic_response)
+
+
+	def output_deferred_parsed_incmd(self, incmd, parsed, is_meta: bool, ic_response: InputCommandResponse) -> InputCommandResponse | None:
+		with dag.ctx(active_dagcmd = incmd.dagcmd, active_incmd = incmd, directives = incmd.directives, pipe_active = incmd.is_piped, parsed = parsed):
+			dag.instance.view.pre_incmd_execute(incmd, parsed)
+			return self.output_parsed_incmd(incmd, parsed, is_meta, ic_response)
+
+
+	def run_parsed_incmd(self, incmd, parsed, announce: bool = True) -> tuple[bool, InputCommandResponse]:
+		"""
+		Gets the variant's response, without outputting it
+
+		:param announce: Whether to print the dagcmd's message before running it
+		:returns: (Whether the response came from a metadirective, the response)
+		"""
+
+		# Search for metadirectives
+		response = incmd.inputargs.execute("process_incmd_meta", incmd, parsed,  _inputobj_execution_breaker = lambda x: x is not None,)
+
+		# If response isn't none: Meta data was present
+		if response is not None:
+			return True, incmd.generate_response(response, parsed)
+
+		#>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
+		# Before Running Command
+		#<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
+		# if tempcache requested and not to be updated and tempcache data already exists: get tempcached response if it exists and requested
+		if incmd.do_read_from_tempcache:
+			response = tempcache.tempcachefiles.read_from_dagcmd_exctx(incmd)
+
+		#>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
+		# Run dagcmd
+		#<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
+		if announce:
+			dag.instance.view.pre_incmd_execute(incmd, parsed)
+
+		return False, incmd.generate_response(response, parsed)
+
+
+	def output_parsed_incmd(self, incmd, parsed, is_meta: bool, ic_response: InputCommandResponse) -> InputCommandResponse | None:
+		# If meta data was present: Style and output the data
+		if is_meta:
+			incmd.outputprocessor.process_output(ic_response, self)
+			return ic_response
+
+		#>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>
+		# After running dagcmd
+		#<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<<
+		# If response is dag.Error: Print error and return
+		if isinstance(ic_response.raw_response, dag.Error):
+			dag.instance.view.echo(f"DagError: <c red / {ic_response.raw_response.message}>")
+			return ic_response
+
+		# If response is a generator: Stream it to the next command if piped. Otherwise, this is where the stream ends, so collect it
+		if is_streamable(ic_response.raw_response):
+			stream = self.iclistexecutor.open_pipestream(incmd, parsed, ic_response.raw_response)
+			ic_response.raw_response = stream if incmd.is_piped else stream.materialize()
+		# If display styling hasn't been disabled: Style the response for CLI display
+		if not dag.settings.noformat and not incmd.is_piped and not incmd.terminus is dag.parser.Token.DOUBLE_SEMICOLON:
+			ic_response.generate_formatted_response_for_cli(parsed)
+
+		# If tempcache had been requested: Append response saying so
+		if incmd.do_read_from_tempcache:
+			ic_response.prepend_response("<c red/Reading from tempcache\n----------------------------\n\n>")
+
+		processed_response = incmd.outputprocessor.process_output(ic_response, self)
+
+		# If tempcache is enabled on dagcmd and response wasn't read from tempcache: Write to TempCache, if possible
+		if False and incmd.do_write_to_tempcache:
+			try:
+				tempcache.tempcachefiles.write_from_dagcmd_exctx(ic_response.raw_response, incmd)
+				#concurrency.run_multiprocess_task(tempcache.tempcachefiles.write_from_dagcmd_exctx, [ic_response.raw_response, incmd]) -> keeps being buggy
+			except Exception as e:
+				dag.instance.view.echo(f"\n\n<c red>Could not write to tempcache ({e})</c>")
+				pass
+
+		# If processed_response is None: The output is meant for CLI. Process accordingly
+		if processed_response is None:
+			dag.instance.controller.process_dagcmd_response_for_cli(ic_response, self)
+
+		return ic_response
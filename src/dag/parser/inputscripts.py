@@ -1,7 +1,7 @@
 import dag
 
 from dag.parser import Token, WORD
-from dag.parser.lexer import DagLexer
+from dag.parser.lexer import DagLexer, IncrementalDagLexer
 from dag.parser.incmdlistbuilder import InputCommandListBuilder
 from dag.parser.incmds import InputCommand
 
@@ -76,6 +76,32 @@ def generate_from_text(line = "", strip_trailing_spaces = False):
 
 
 
+# Used for lines that are re-parsed on every keystroke (completion, cursor tracking)
+keystroke_lexer = IncrementalDagLexer()
+
+
+def get_last_incmd_from_text(line = ""):
+	"""
+	Returns generate_from_text(line).get_last_incmd(), but only lexes the part of the line that changed since the last call,
+	and only builds the InputCommand(s) after the line's last terminus ("|", ";", etc.) instead of every InputCommand in the line
+	"""
+
+	tokens = keystroke_lexer.lex(line)
+
+	# Anything that isn't a WORD or COMMA ends an InputCommand (See InputCommandListBuilder.build_incmds_from_tokens)
+	start = next((i + 1 for i in range(len(tokens) - 1, -1, -1) if not (isinstance(tokens[i], WORD) or tokens[i] == Token.COMMA)), 0)
+
+	# IF nothing follows the last terminus: The last InputCommand is the one it ended
+	if not any(isinstance(token, WORD) for token in tokens[start:]):
+		start = 0
+
+	inputscript = InputScript(tokens[start:])
+	inputscript.build_incmdlists()
+
+	return inputscript.get_last_incmd()
+
+
+
 def yield_incmds_from_text(line = ""):
 	inscript = generate_from_text(line)
 	yield from inscript.yield_incmds()
@@ -1,4 +1,4 @@
-import re
+import os, re, threading
 from typing import NoReturn
 
 import dag
@@ -134,24 +134,33 @@ class DagLexer:
 				self.active_grouping_count += 1
 
 
+	def lex_char(self, ch):
+		if self.escape_char_active:
+			self.buffer += ch
+			self.escape_char_active = False
+			return
+
+		elif ch == "\\": # note: does not push the \ into buffer, but if there's \\, the 2nd will get put into buffer
+			self.escape_char_active = True
+			self.active_punctuation = ""
+		elif self.active_grouping:
+			pass
+
+		self.buffer += ch
+		self.process_punctuation()
+
+
 	def lex(self, text):
 		self.reset()
 
 		for ch in text:
-			if self.escape_char_active:
-				self.buffer += ch
-				self.escape_char_active = False
-				continue
+			self.lex_char(ch)
 
-			elif ch == "\\": # note: does not push the \ into buffer, but if there's \\, the 2nd will get put into buffer
-				self.escape_char_active = True
-				self.active_punctuation = ""
-			elif self.active_grouping:
-				pass
+		return self.finish(text)
 
-			self.buffer += ch
-			self.process_punctuation()
 
+	def finish(self, text):
+		"""Flushes whatever is left in the buffer once every character has been lexed"""
 		if self.buffer:
 			for i in range(len(self.buffer)):
 				if self.buffer[i:] in self.wordseparators:
@@ -167,6 +176,51 @@ class DagLexer:
 		return PostLexer(self.tokens).process()
 
 
+
+class IncrementalDagLexer(DagLexer):
+	"""
+	A DagLexer that remembers its state after each character of the last text it lexed
+
+	Lexing a text that shares a prefix with the last one (e.g.: the same line with a character typed or deleted) resumes
+	from the end of the shared prefix, so each keystroke only lexes the changed tail of the line
+	"""
+
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.text = ""
+		self.checkpoints = [self.get_state()] # The state after each character of self.text. Tokens are only ever appended, so only their count is kept
+		self.lock = threading.Lock() # Shared by the completer's thread and the prompt's cursor tracking
+
+
+	def get_state(self):
+		return len(self.tokens), self.buffer, self.escape_char_active, self.active_punctuation, self.active_grouping, self.active_grouping_count
+
+
+	def set_state(self, state):
+		ntokens, self.buffer, self.escape_char_active, self.active_punctuation, self.active_grouping, self.active_grouping_count = state
+		self.tokens = self.tokens[:ntokens] # A new list, so previously returned tokens aren't changed
+
+
+	def lex(self, text):
+		with self.lock:
+			shared = len(os.path.commonprefix([self.text, text]))
+
+			self.set_state(self.checkpoints[shared])
+			del self.checkpoints[shared + 1:]
+
+			for ch in text[shared:]:
+				self.lex_char(ch)
+				self.checkpoints.append(self.get_state())
+
+			self.text = text
+
+			state = self.get_state()
+			tokens = self.finish(text)
+			self.set_state(state)
+
+			return tokens
+
+
 class PostLexer:
 	def __init__(self, tokens):
 		self.tokens = tokens
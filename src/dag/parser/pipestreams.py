@@ -0,0 +1,173 @@
+import queue, threading, types
+from collections.abc import Iterable, Iterator
+
+import dag
+
+
+DONE = object() # Put on a buffered stream's queue once its source is exhausted
+
+
+
+def is_streamable(response: object) -> bool:
+	"""Whether a piped response should be streamed to the next command instead of being passed whole"""
+	return isinstance(response, (types.GeneratorType, PipeStream))
+
+
+
+class PipeStream:
+	"""
+	A piped response that the next command consumes item by item, as the piping command yields them
+
+	By default, the source is only advanced when an item is requested, so a slow consumer holds up the producer. With a buffersize,
+	a thread runs ahead of the consumer, but blocks once that many items are waiting.
+
+	Closing the stream closes its source generator, so a consumer that stops early (e.g.: "head") stops the producer's work too.
+	Each step of the source runs in the context variables of the command that created it.
+	"""
+
+	def __init__(self, source: Iterable, ctxvars: dict | None = None, buffersize: int = 0):
+		self.source = source
+		self.iterator = iter(source)
+		self.ctxvars = ctxvars or {}
+		self.buffersize = buffersize
+
+		self.is_closed = False
+		self.is_exhausted = False
+
+		self.buffer = None
+		self.producer = None
+		self.exception = None
+
+
+	def __iter__(self) -> Iterator:
+		return self
+
+
+	def __next__(self) -> object:
+		if self.is_closed or self.is_exhausted:
+			raise StopIteration
+
+		if self.buffersize:
+			return self.next_buffered()
+
+		try:
+			with dag.ctx(**self.ctxvars):
+				return next(self.iterator)
+		except StopIteration:
+			self.is_exhausted = True
+			raise
+
+
+	def __bool__(self) -> bool:
+		return True # Streams are truthy even before anything has been produced, so that the parser sees them as piped
+
+
+	def __enter__(self):
+		return self
+
+
+	def __exit__(self, *exc) -> None:
+		self.close()
+
+
+	def __repr__(self) -> str:
+		state = "closed" if self.is_closed else "exhausted" if self.is_exhausted else "open"
+		return f"<PipeStream ({state}): {self.source!r}>"
+
+
+
+
+	def next_buffered(self) -> object:
+		if self.producer is None:
+			self.start_producer()
+
+		item = self.buffer.get()
+
+		if item is DONE:
+			self.is_exhausted = True
+
+			if self.exception is not None:
+				raise self.exception
+
+			raise StopIteration
+
+		return item
+
+
+	def start_producer(self) -> None:
+		self.buffer = queue.Queue(maxsize = self.buffersize)
+		snapshot = dag.ctx.snapshot()
+
+		self.producer = threading.Thread(target = self.produce, args = (snapshot,), daemon = True, name = "dag-pipestream")
+		self.producer.start()
+
+
+	def produce(self, snapshot: dict) -> None:
+		with dag.ctx.use_snapshot(snapshot):
+			try:
+				with dag.ctx(**self.ctxvars):
+					for item in self.iterator:
+						if not self.put(item):
+							break
+			except Exception as e:
+				self.exception = e
+			finally:
+				self.close_source() # The generator is closed in the thread running it. Closing it from another thread raises ValueError
+				self.put(DONE)
+
+
+	def put(self, item: object) -> bool:
+		"""Waits for room in the buffer. False if the stream was closed while waiting"""
+		while not self.is_closed:
+			try:
+				self.buffer.put(item, timeout = 0.05)
+				return True
+			except queue.Full:
+				continue
+
+		return False
+
+
+
+
+	def take(self, total: int) -> list:
+		"""The next total items. The stream is closed afterwards, stopping the producer"""
+		items = []
+
+		try:
+			if total > 0:
+				for item in self:
+					items.append(item)
+
+					if len(items) >= total:
+						break
+		finally:
+			self.close()
+
+		return items
+
+
+	def materialize(self) -> list:
+		"""Every remaining item"""
+		try:
+			return [*self]
+		finally:
+			self.close()
+
+
+	def close(self) -> None:
+		if self.is_closed:
+			return
+
+		self.is_closed = True
+
+		if self.producer is None:
+			self.close_source()
+		elif self.producer is not threading.current_thread():
+			self.producer.join()
+
+
+	def close_source(self) -> None:
+		if close := getattr(self.iterator, "close", None):
+			with dag.ctx(**self.ctxvars):
+				close()
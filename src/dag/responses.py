@@ -500,6 +500,7 @@ class DagResponseParser:
 	parser_method = lambda self, x, *args, **kwargs: x
 	postparser_method = lambda self, x, *args, **kwargs: x
 	parser_error = SyntaxError
+	supports_stream = False
 	_encoding = "utf-8"
 
 
@@ -512,6 +513,10 @@ class DagResponseParser:
 		postparsed_data = self.postparser_method(parsed_data)
 		return self.response_class(postparsed_data)
 
+	def parse_stream(self, stream, path):
+		"""Parses only the value at path (a list of keys/indices) from a binary file object"""
+		raise NotImplementedError(f"{type(self).__name__} can't parse streams")
+
 	def __call__(self, *args, **settings):
 		return type(self)(*args, **settings)
 
@@ -529,11 +534,20 @@ class DictParser(DagResponseParser):
 
 
 class JsonParser(DictParser):
+	supports_stream = True
+
 	def __init__(self, *args, **settings):
 		super().__init__(*args, **settings)
 		self.parser_method = lambda *args, **kwargs: json.loads(*args, **kwargs)
 		self.parser_error = json.decoder.JSONDecodeError
 
+	def parse_stream(self, stream, path):
+		from dag.util import jsonstream
+		value = jsonstream.load_path(stream, path)
+
+		# Scalars are returned bare, like drilling into a whole-document response does
+		return self.response_class(value) if DagResponse._is_can_be_dagresponse(value) else value
+
 
 class YamlParser(DictParser):
 	def __init__(self, *args, **settings):
@@ -606,6 +620,10 @@ class ParserBuilder:
 	def parse(self, data):
 		return self.buildparser().parse(data)
 
+	@property
+	def supports_stream(self):
+		return self.parsercls.supports_stream
+
 	def __call__(self, *args, **settings):
 		return type(self)(self.parsercls, *args, **settings)
 # <<<<<<<<<<<<< ParserBuilder
@@ -674,6 +692,22 @@ def parse_response_item(response, response_parser = None):
 	return str(response)
 
 
+def parse_response_stream(stream, path, response_parser = None):
+	"""Like parse_response_item, but reads only the value at path from a binary file object"""
+	parser = response_parser or (dag.ctx.active_dagcmd.settings.response_parser)
+
+	try:
+		parser = parser.buildparser()
+	except AttributeError:
+		pass
+
+	try:
+		return parser.parse_stream(stream, path)
+	except parser.parser_error as e:
+		dag.hooks.do("response_read_error", stream, e)
+		raise
+
+
 
 
 
@@ -75,6 +75,23 @@ register_default("HISTORY_LENGTH", 500, "history")
 register_default("HISTORY_FILE_NAME", "dag-history", "history")
 register_default("DAGPDB_HISTORY_FILE_NAME", "dagpdb-history", "history")
 register_default("CACHEFILE_EXT", "dagcache", "cache")
+register_default("CACHE_BACKEND", "sqlite", "cache")		# "sqlite": one database for all cachefiles. "files": one gzip file per cachefile
+register_default("CACHE_MAX_BYTES", 1024**3, "cache")		# Least-recently-used cachefiles are evicted past this size. 0 means no limit
+register_default("CACHE_COMPRESSION", "zlib", "cache")		# "zlib", "zstd" (requires zstandard), "lz4" (requires lz4), or "none"
+register_default("CACHE_COMPRESSION_LEVEL", 0, "cache")		# 0 means the compressor's default level
+register_default("CACHE_MEMORY_ENTRIES", 256, "cache")		# Decompressed cachefiles kept in memory for the life of the dag instance
+register_default("CACHE_MEMORY_BYTES", 64 * 1024**2, "cache")	# Measured by the cachefiles' decompressed size. 0 means no limit
+register_default("HTTP_POOL_SIZE", 10, "http")
+register_default("HTTP_POOL_IDLE_TIMEOUT", 60, "http")
+register_default("ASYNC_GROUP_LIMIT", 6, "concurrency")
+register_default("PROCESS_POOL_SIZE", 0, "concurrency")		# 0 means one worker per CPU
+register_default("THREAD_POOL_SIZE", 0, "concurrency")
+register_default("PIPE_BUFFER_SIZE", 0, "concurrency")			# Items a piped generator may produce ahead of the next command, in its own thread. 0 means only on request. Dagcmds can override with "pipe_buffer"
+register_default("CONCURRENT_EXPANSIONS", False, "concurrency")	# Run the variants of expanded commands (e.g.: "nhl boxscore 1,2,3") at once. Dagcmds can override with "concurrent_expansion"
+register_default("CONCURRENT_COMMAND_LISTS", False, "concurrency")	# Run the independent commands of a ";"-separated list (e.g.: "nhl games ; mlb games") at once. Dagcmds that must run in order set "sequential"
+register_default("LAZY_COLLECTION_SIZE", 1000, "collections")	# Collections this large only build Resources when they're accessed. 0 means never
+register_default("DAEMON_IDLE_TIMEOUT", 30 * 60, "daemon")		# Seconds the warm daemon (See dagcli/daemon.py) waits for a request before exiting. 0 means never
+register_default("INCREMENTAL_RELOAD", True, "dev")			# Reloads only re-import changed modules and their importers. False re-imports all of dag
 
 
 
@@ -103,13 +120,31 @@ def write_config(parser):
 		parser.write(configfile)
 
 
+def to_bool(value) -> bool:
+	"""Config files and environment variables hold booleans as strings, where "False" would be truthy"""
+	if not isinstance(value, str):
+		return bool(value)
+
+	try:
+		return configparser.ConfigParser.BOOLEAN_STATES[value.strip().lower()]
+	except KeyError:
+		raise ValueError(f"Not a boolean: {value!r}") from None
+
+
+def parse_config_value(name, value):
+	if isinstance(defaults.flatten().get(name), bool):
+		return to_bool(value)
+
+	return int(value) if dag.strtools.isint(value) else value # Turns integer strings into integers
+
+
 def load_config():
 	parser = load_configparser()
 
 	configsettings = {}
 
 	for section, settings in parser.items():
-		configsettings |= {k:(int(v) if dag.strtools.isint(v) else v) for k,v in settings.items()} # Turns integer strings into integers
+		configsettings |= {k:parse_config_value(k, v) for k,v in settings.items()}
 
 	return SettingsContainer(configsettings)
 
@@ -136,13 +171,17 @@ def get(attr, default = None):
 		value = session_settings.get(attr)
 	elif (val := dag.getenv("DAG_" + attr.upper().removeprefix("DAG_"))) and val is not None:
 		value = val
-	elif (val := conf_settings(attr)) and val is not None:
+	elif (val := conf_settings(attr)) is not None: # Falsy values from dag.ini (e.g.: False, 0) still override the defaults
 		value = val
 	elif (val := defaults.get(attr)) and val is not None:
 		value = val
 
-	if (default := defaults.flatten().get(attr)) and default is not None:
-		value = type(default)(value)
+	default = defaults.flatten().get(attr)
+
+	if isinstance(default, bool):
+		value = to_bool(value if value is not None else default)
+	elif default and default is not None:
+		value = type(default)(value if value is not None else default) # Defaults registered after dag.ini was written aren't in conf_settings
 
 	return value
 
@@ -0,0 +1,271 @@
+import functools, gzip, importlib.util, json, pickle, zlib
+from collections.abc import Callable
+
+import dag
+
+
+# Each payload starts with MAGIC + "codec:version:compressor" + HEADER_END, so that values written by older codec versions can still be read
+# Payloads without MAGIC are legacy caches (gzip/zlib'd dill)
+MAGIC = b"DAGC"
+HEADER_END = b"\x00"
+JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+
+@functools.cache
+def is_module_available(modulename: str) -> bool:
+	"""Cached, so that missing optional libraries aren't searched for on every cache write"""
+	try:
+		return importlib.util.find_spec(modulename) is not None
+	except (ImportError, ValueError):
+		return False
+
+
+
+class Compressor:
+	def __init__(self, name: str, compress: Callable[[bytes, int | None], bytes], decompress: Callable[[bytes], bytes], requires: str = ""):
+		self.name = name
+		self.compress = compress
+		self.decompress = decompress
+		self.requires = requires # The optional library this compressor needs
+
+
+	@property
+	def is_available(self) -> bool:
+		return not self.requires or is_module_available(self.requires)
+
+
+def _zlib_compress(data, level):
+	return zlib.compress(data, level if level is not None else zlib.Z_DEFAULT_COMPRESSION)
+
+
+def _zstd_compress(data, level):
+	import zstandard
+	return zstandard.ZstdCompressor(level = level if level is not None else 3).compress(data)
+
+
+def _zstd_decompress(data):
+	import zstandard
+	return zstandard.ZstdDecompressor().decompress(data)
+
+
+def _lz4_compress(data, level):
+	import lz4.frame
+	return lz4.frame.compress(data, compression_level = level or 0)
+
+
+def _lz4_decompress(data):
+	import lz4.frame
+	return lz4.frame.decompress(data)
+
+
+registered_compressors = dag.ItemRegistry()
+registered_compressors["none"] = Compressor("none", lambda data, level: data, lambda data: data)
+registered_compressors["zlib"] = Compressor("zlib", _zlib_compress, zlib.decompress)
+registered_compressors["zstd"] = Compressor("zstd", _zstd_compress, _zstd_decompress, requires = "zstandard")
+registered_compressors["lz4"] = Compressor("lz4", _lz4_compress, _lz4_decompress, requires = "lz4")
+
+
+def get_compressor(name: str | None = None) -> Compressor:
+	"""Returns the requested compressor, falling back to zlib if it's unknown or its library isn't installed"""
+	compressor = registered_compressors.get(name or dag.settings.cache_compression or "zlib")
+	return compressor if compressor and compressor.is_available else registered_compressors["zlib"]
+
+
+
+
+def is_jsonable(data) -> bool:
+	"""Whether data survives a JSON round trip unchanged (so no tuples, non-str keys, or other custom types)"""
+	datatype = type(data)
+
+	if datatype in JSON_SCALARS:
+		return True
+
+	if datatype is list:
+		return all(is_jsonable(item) for item in data)
+
+	if datatype is dict:
+		return all(type(key) is str and is_jsonable(value) for key, value in data.items())
+
+	return False
+
+
+
+class Codec:
+	name = ""
+	version = 1
+
+	def can_encode(self, item) -> bool:
+		return True
+
+	def encode(self, item) -> bytes:
+		raise NotImplementedError
+
+	def decode(self, payload: bytes, version: int):
+		raise NotImplementedError
+
+
+
+class JsonCodec(Codec):
+	"""Stores plain JSON data, and DagResponses wrapping plain JSON data"""
+	name = "json"
+
+	@staticmethod
+	def get_response_classes():
+		from dag.responses import DagResponse, DictResponse
+		return {"DagResponse": DagResponse, "DictResponse": DictResponse}
+
+
+	def split_item(self, item):
+		"""Splits an item into (DagResponse class name or None, its JSON data)"""
+		clsname = type(item).__name__
+
+		if clsname in self.get_response_classes() and type(item) is self.get_response_classes()[clsname]:
+			return clsname, item._data
+
+		return None, item
+
+
+	def can_encode(self, item):
+		try:
+			return is_jsonable(self.split_item(item)[1])
+		except RecursionError:
+			return False
+
+
+	def dumps(self, data) -> bytes:
+		return json.dumps(data, separators = (",", ":"), ensure_ascii = False).encode()
+
+
+	def loads(self, payload: bytes):
+		return json.loads(payload)
+
+
+	def encode(self, item):
+		clsname, data = self.split_item(item)
+		return self.dumps({"response": clsname, "data": data})
+
+
+	def decode(self, payload, version):
+		value = self.loads(payload)
+		data = value["data"]
+
+		if clsname := value["response"]:
+			return self.get_response_classes()[clsname](data)
+
+		return data
+
+
+
+class MsgpackCodec(JsonCodec):
+	"""Like JsonCodec, but more compact and faster. Requires msgpack"""
+	name = "msgpack"
+
+	def can_encode(self, item):
+		return is_module_available("msgpack") and super().can_encode(item)
+
+
+	def dumps(self, data):
+		import msgpack
+		return msgpack.packb(data, use_bin_type = True)
+
+
+	def loads(self, payload):
+		import msgpack
+		return msgpack.unpackb(payload, raw = False)
+
+
+
+class PickleCodec(Codec):
+	"""Pickle protocol 5: fast, but fails on lambdas and other objects that only dill can handle"""
+	name = "pickle"
+
+	def encode(self, item):
+		return pickle.dumps(item, protocol = 5)
+
+	def decode(self, payload, version):
+		return pickle.loads(payload)
+
+
+
+class DillCodec(Codec):
+	name = "dill"
+
+	def encode(self, item):
+		import dill
+		return dill.dumps(item)
+
+	def decode(self, payload, version):
+		import dill
+		return dill.loads(payload)
+
+
+
+# In order of preference. The first codec that can encode an item (without raising) is used
+# C pickle reads plain JSON data about as fast as json does (and writes it 10-30x faster than dill), so json is only used when requested
+registered_codecs = dag.ItemRegistry()
+
+def register_codec(codec: Codec) -> Codec:
+	registered_codecs[codec.name] = codec
+	return codec
+
+register_codec(MsgpackCodec())
+register_codec(PickleCodec())
+register_codec(DillCodec())
+register_codec(JsonCodec())
+
+
+
+
+def dumps(item, compression: str | None = None, level: int | None = None, codec: str | None = None) -> bytes:
+	"""
+	Serializes an item with the first codec able to handle it, then compresses it
+
+	:param compression: The compressor's name. Defaults to the cache_compression setting
+	:param level: The compression level. Defaults to the cache_compression_level setting
+	:param codec: The name of a codec to try before the others (e.g.: "json" for human-readable payloads)
+	"""
+
+	compressor = get_compressor(compression)
+	level = level if level is not None else (dag.settings.cache_compression_level or None)
+	codecs = [registered_codecs[codec]] if codec else []
+
+	for codec in codecs + [*registered_codecs.values()]:
+		if not codec.can_encode(item):
+			continue
+
+		try:
+			payload = codec.encode(item)
+		except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+			continue
+
+		header = f"{codec.name}:{codec.version}:{compressor.name}".encode()
+		return MAGIC + header + HEADER_END + compressor.compress(payload, level)
+
+	raise TypeError(f"No cache codec could encode {type(item)}")
+
+
+def decompress(data: bytes) -> tuple[Codec, int, bytes]:
+	"""Splits bytes written by dumps() (or by older versions of dag's cachefiles) into (codec, codec version, decompressed payload)"""
+	if not data.startswith(MAGIC):
+		return decompress_legacy(data)
+
+	headerend = data.index(HEADER_END, len(MAGIC))
+	codecname, version, compressorname = data[len(MAGIC):headerend].decode().split(":")
+
+	payload = registered_compressors[compressorname].decompress(data[headerend + len(HEADER_END):])
+	return registered_codecs[codecname], int(version), payload
+
+
+def decompress_legacy(data: bytes) -> tuple[Codec, int, bytes]:
+	"""Caches written before codecs existed: gzip'd dill (cachefiles) or zlib'd dill (DBCache)"""
+	if data[:2] == b"\x1f\x8b":
+		return registered_codecs["dill"], 1, gzip.decompress(data)
+
+	return registered_codecs["dill"], 1, zlib.decompress(data)
+
+
+def loads(data: bytes):
+	"""Deserializes bytes written by dumps(), or by older versions of dag's cachefiles"""
+	codec, version, payload = decompress(data)
+	return codec.decode(payload, version)
@@ -1,11 +1,20 @@
 import re
+from collections.abc import Iterable
 from typing import Union, Any, Optional
 
 import dag
+from dag.lib.lrucache import LRUCache
 
 class DagDrillError(BaseException): pass
 
 
+ATTR, INDEX, CALL = range(3)
+NO_DEFAULT = object()
+
+# Compiled drills, keyed by (driller, splitter, drill_until)
+compiled_drills = LRUCache(max_entries = 512)
+
+
 def get_drillbits(driller: str, splitter: str = ".") -> list[str]:
 	"""
 	Takes the drillstring and splits it into drillbits. This takes into account:
@@ -68,6 +77,147 @@ def get_drillparts(drilltext: str, splitter: str = ".", combined_drillbits: bool
 	
 
 	
+def parse_index_bit(bit: str) -> Any:
+	"""Converts an index drillbit into the key it looks up (e.g.: "[1]" => 1, "['a']" => "a", "[1:3]" => slice(1, 3))"""
+
+	# If text in brackets is wrapped in quotes (aka is a dict entry): Extract the string text (e.g.: "['hi']" => "hi")
+	if (match := re.match(r"^\[['\"](.*)['\"]\]$", bit)):
+		return match.groups()[0]
+
+	# Else, index query isn't looking for a string (aka is a list idx): Remove the "[", "]" wrapping drillbit
+	bit = bit[1:-1]
+
+	# If letters exist in the query index; this is a dict index and not a list index
+	if re.match("[a-zA-Z]", bit) or dag.strtools.is_valid_quoted_string(bit):
+		return bit
+
+	# Elif index query query is a list index: Process potential slicing (even if only one number present)
+	if ":" in bit:
+		return dag.strtools.strtoslice(bit)
+
+	# Elif, query is all numerical: Turn into an int
+	try:
+		return int(bit)
+	except ValueError:
+		return bit
+
+
+
+class CompiledDrill:
+	"""
+	A drillstring parsed once into its steps, so that drilling many items with the same string doesn't re-split and re-parse it
+
+	Get these via compile_drill, which caches them
+	"""
+
+	def __init__(self, driller: str, splitter: str = ".", drill_until: int = 0):
+		self.driller = driller
+		self.drillbits = [bit for bit in get_drillbits(driller, splitter) if bit is not None]
+
+		if drill_until:
+			self.drillbits = self.drillbits[:drill_until]
+
+		self.steps = []
+
+		for bit in filter(None, self.drillbits):
+			if bit.startswith("["):
+				self.steps.append((INDEX, parse_index_bit(bit)))
+
+			# NOTE: Only supports functions with no args
+			elif bit.startswith("("):
+				if len(bit) > 2:
+					raise DagDrillError(f"Drillbits can't include function args at this time")
+
+				self.steps.append((CALL, None))
+
+			else:
+				self.steps.append((ATTR, bit))
+
+
+	def __repr__(self):
+		return f"<{type(self).__name__} {self.driller!r}>"
+
+
+	def __call__(self, drillee: object) -> Any:
+		original_drillee = drillee
+
+		try:
+			for kind, key in self.steps:
+				if kind is ATTR:
+					drillee = getattr(drillee, key)
+				elif kind is INDEX:
+					try:
+						drillee = drillee.__getitem__(key)
+					except (TypeError, KeyError):
+						drillee = drillee.__getitem__(str(key))
+				else:
+					drillee = drillee.__call__()
+		except (AttributeError, IndexError) as e:
+			raise DagDrillError(f"\fn Drill error: {e} {drillee=} drillbits={self.drillbits} {original_drillee=}") from e
+
+		return drillee
+
+
+	def drill_all(self, drillees: Iterable[object], default: Any = NO_DEFAULT) -> list[Any]:
+		"""
+		Drills every item in one pass
+
+		:param default: If given, the value for items that can't be drilled (instead of raising DagDrillError)
+		"""
+
+		if default is NO_DEFAULT:
+			return [self(drillee) for drillee in drillees]
+
+		values = []
+
+		for drillee in drillees:
+			try:
+				values.append(self(drillee))
+			except (DagDrillError, KeyError, TypeError):
+				values.append(default)
+
+		return values
+
+
+
+def compile_drill(driller: str, splitter: str = ".", drill_until: int = 0) -> CompiledDrill:
+	key = (driller, splitter, drill_until)
+
+	if (compiled := compiled_drills.get(key)) is None:
+		compiled = CompiledDrill(driller, splitter, drill_until)
+		compiled_drills.put(key, compiled)
+
+	return compiled
+
+
+def drill_all(drillees: Iterable[object], driller: object, default: Any = NO_DEFAULT) -> list[Any]:
+	"""
+	Drills each item with the same driller, parsing it only once
+
+	:param drillees: The items to be drilled into (e.g.: A Collection)
+	:param driller: The string of bits to process and use to drill, or a DagDriller/ResourcesLambdaBuilder
+	:param default: If given, the value for items that can't be drilled (instead of raising an error)
+	:returns: The drilled value for each item, in order
+	"""
+
+	if isinstance(driller, str):
+		return compile_drill(driller).drill_all(drillees, default)
+
+	if default is NO_DEFAULT:
+		return [drill(drillee, driller) for drillee in drillees]
+
+	values = []
+
+	for drillee in drillees:
+		try:
+			values.append(drill(drillee, driller))
+		except (DagDrillError, KeyError, TypeError):
+			values.append(default)
+
+	return values
+
+
+
 # Take an item and search through it from a string query
 def drill(drillee: object, driller: object, splitter: str = ".", drill_until: int = 0) -> Any:
 	"""
@@ -89,77 +239,9 @@ def drill(drillee: object, driller: object, splitter: str = ".", drill_until: in
 		return driller._dag_drill(drillee)
 
 	if isinstance(driller, dag.ResourcesLambdaBuilder):
-		return driller(drillee)
-
-	# Stores the original item being drilled into
-	original_drillee = drillee
-	original_driller = driller
-
-	# Iterate through driller to separate attr queries and index queries (e.g.: "attr1[item1].attr2" => ["attr1", "item1", "attr2"]). Filters out Nones
-	drillbits = [bit for bit in get_drillbits(driller, splitter) if bit is not None]
-
-	if drill_until:
-		drillbits = drillbits[:drill_until]
-		#driller = splitter.join(drillbits)
-		#driller = get_drillbits(driller, splitter)
-	
-	# Try to query through drillee
-	try:
-		# Iterate through each drillbit, searching for element
-		for bit in drillbits:
-			# If bit is empty: Skip bit
-			if not bit:
-				continue
-
-			# If drillbit is dict index: Process index query
-			if bit.startswith("["):
-
-				# If index query is wrapped in quotes (aka is a dict entry): Extract the string text (e.g.: "'hi'" => "hi")
-				is_bit_quoted = False
-
-				# If text in brackets is wrapped in quotes: Mark as such and remove the brackets/quotes
-				if (match := re.match(r"^\[['\"](.*)['\"]\]$", bit)):
-					is_bit_quoted = True
-					bit = match.groups()[0]
-				# Else, index query isn't looking for a string (aka is a list idx): Remove the "[", "]" wrapping drillbit
-				else:
-					bit = bit[1:-1]
-				
-
-				# If letters exist in the query index; this is a dict index and not a list index. Skip to next step
-				if is_bit_quoted or re.match("[a-zA-Z]", bit) or dag.strtools.is_valid_quoted_string(bit):
-					pass
-				# Elif index query query is a list index: Process potential slicing (even if only one number present)
-				elif ":" in bit:
-					# Split slice query at ":"'s'
-					bit = dag.strtools.strtoslice(bit)
-				# Elif, query is all numerical: Turn into an int
-				elif not isinstance(bit, float):
-					try:
-						bit = int(bit)
-					except ValueError:
-						pass
-
-				try:
-					drillee = drillee.__getitem__(bit)
-				except (TypeError, KeyError):
-					drillee = drillee.__getitem__(str(bit))
-					
-			# Elif query is calling an object function and calling: query function and call
-			# NOTE: Only supports functions with no args
-			elif bit.startswith("("):
-				if len(bit) > 2:
-					raise DagDrillError(f"Drillbits can't include function args at this time")
-
-				drillee = drillee.__call__()
-				
-			# Else, querying an object property: Get object property
-			else:
-				drillee = getattr(drillee, bit)
-	except (AttributeError, IndexError) as e:
-		raise DagDrillError(f"\fn Drill error: {e} {drillee=} {drillbits=} {original_drillee=}") from e
+		return driller._do_call(drillee)
 
-	return drillee
+	return compile_drill(driller, splitter, drill_until)(drillee)
 
 
 
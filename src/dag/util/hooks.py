@@ -9,6 +9,43 @@ def generate_uuid():
 
 
 
+# How many hooks are registered under each hook name. Names that aren't here have no listeners, so firing them can return immediately
+listener_counts: dict[str, int] = {}
+
+# Each hook action's (number of positional args it takes, whether dag should pass "self" in), so that firing a hook doesn't re-inspect it
+hook_signatures: dict = {}
+
+
+def add_listener(hookname: str, action) -> None:
+	listener_counts[hookname] = listener_counts.get(hookname, 0) + 1
+	get_hook_signature(action)
+
+
+def remove_listener(hookname: str) -> None:
+	if (count := listener_counts.get(hookname, 0) - 1) > 0:
+		listener_counts[hookname] = count
+	else:
+		listener_counts.pop(hookname, None)
+
+
+def get_hook_signature(action) -> tuple[int, bool]:
+	try:
+		return hook_signatures[action]
+	except KeyError:
+		pass
+	except TypeError: # Unhashable callable
+		return inspect_hook_signature(action)
+
+	signature = hook_signatures[action] = inspect_hook_signature(action)
+	return signature
+
+
+def inspect_hook_signature(action) -> tuple[int, bool]:
+	actionargs = inspect.getfullargspec(action).args
+	return len(actionargs), not inspect.ismethod(action) and "self" in actionargs
+
+
+
 
 
 class HooksAPI:
@@ -27,6 +64,9 @@ class HooksAPI:
 
 
 	def do(self, hook_name, *args, items = None, **kwargs):
+		if hook_name not in listener_counts:
+			return None
+
 		return self.hooks.do_hook(hook_name, *args, items = items, **kwargs)
 
 
@@ -69,6 +109,7 @@ class HooksContainer:
 
 		settings = self.parentsettings or dag.ctx.active_dagcmd.settings
 		settings.setdefault(f"hook_{hookname}", {})[hookid] = action
+		add_listener(hookname, action)
 
 		return hookid
 
@@ -78,11 +119,15 @@ class HooksContainer:
 		settings = self.parentsettings or dag.ctx.active_dagcmd.settings
 
 		if f"hook_{hookname}" in settings:
-			settings[f"hook_{hookname}"].pop(hookid, None)
+			if settings[f"hook_{hookname}"].pop(hookid, None) is not None:
+				remove_listener(hookname)
 
 
 
 	def do_hook(self, hookname, *args, items = None, **kwargs):
+		if hookname not in listener_counts:
+			return None
+
 		with dag.ctx(f"do_hook_{hookname}"):
 			value = None
 
@@ -102,16 +147,18 @@ class HooksContainer:
 			# Run hooks specific to current command
 			#dagcmd = dag.ctx.active_dagcmd
 
+			settingname = f"hook_{hookname}"
+
 			for item in dag.nonefilter(hookitems):
-				for hookuuid, hookaction in dag.getsettings(item).getnab(f"hook_{hookname}", {}).items():
-					actionargs = inspect.getfullargspec(hookaction).args
-					total_fnargs = len(actionargs)
+				if not (hookactions := dag.getsettings(item).get(settingname)):
+					continue
+
+				for hookuuid, hookaction in [*hookactions.items()]:
+					hookaction = dag.nab_if_nabber(hookaction)
+					total_fnargs, takes_self = get_hook_signature(hookaction)
 
-					if len(args) <= total_fnargs:
-						if not inspect.ismethod(hookaction) and "self" in actionargs:
-							args = (dag.ctx.active_dagcmd.root,) + args  # needed for @dag.hook decorators to pass "self" into the fn
-						else:
-							pass
+					if len(args) <= total_fnargs and takes_self:
+						args = (dag.ctx.active_dagcmd.root,) + args  # needed for @dag.hook decorators to pass "self" into the fn
 
 					value = hookaction(*args[:total_fnargs])
 
@@ -149,6 +196,7 @@ class HookBuilder:
 		uuid = generate_uuid()
 		parentsettings = self.hooksinstance.parentsettings
 		parentsettings.setdefault("hook_" + self.name, {})[uuid] = fn
+		add_listener(self.name, fn)
 		return fn
 
 	def __enter__(self):
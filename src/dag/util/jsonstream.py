@@ -0,0 +1,226 @@
+import functools, json
+from collections.abc import Iterator
+from typing import Any, BinaryIO
+
+from dag.util.drill import DagDrillError, get_drillbits
+
+
+CONTAINER_STARTS = {"start_map", "start_array"}
+CONTAINER_ENDS = {"end_map", "end_array"}
+BUF_SIZE = 64 * 1024
+
+
+@functools.cache
+def get_ijson():
+	"""ijson is optional. Without it, streamed documents are parsed whole and then drilled"""
+	try:
+		import ijson
+		return ijson
+	except ImportError:
+		return None
+
+
+
+def get_stream_path(driller) -> list[str | int] | None:
+	"""
+	Converts a drill (e.g.: "dates[0].games" or r_.dates[0].games) into a list of keys/indices (["dates", 0, "games"])
+
+	Returns None if the drill does anything other than plain key and non-negative index lookups (e.g.: calls, slices, comparisons),
+	in which case the document can't be streamed and should be parsed whole
+	"""
+
+	if driller is None:
+		return None
+
+	if isinstance(driller, str):
+		return get_path_from_drillbits(get_drillbits(driller))
+
+	return get_path_from_lambdabuilder(driller)
+
+
+def get_path_from_drillbits(drillbits: list[str]) -> list[str | int] | None:
+	path = []
+
+	for bit in drillbits:
+		if not bit:
+			continue
+
+		if bit.startswith("("):
+			return None
+
+		if bit.startswith("["):
+			bit = bit[1:-1]
+
+			if len(bit) > 1 and bit[0] == bit[-1] and bit[0] in "'\"":
+				path.append(bit[1:-1])
+			elif bit.isdigit():
+				path.append(int(bit))
+			else:
+				return None
+
+			continue
+
+		path.append(bit)
+
+	return path
+
+
+def get_path_from_lambdabuilder(lb) -> list[str | int] | None:
+	from dag.util.lambdabuilders import LambdaBuilder
+
+	if not isinstance(lb, LambdaBuilder):
+		return None
+
+	path = []
+
+	for record in lb._stored_attrs or []:
+		if record.attr_name == "__getitem__" and len(record.args) == 1 and not record.kwargs:
+			key = record.args[0]
+
+			if not (isinstance(key, str) or (type(key) is int and key >= 0)):
+				return None
+
+			path.append(key)
+		elif record.attr_name.startswith("_") or record.attr_name.isupper() or record.is_called:
+			return None
+		else:
+			path.append(record.attr_name)
+
+	return path
+
+
+
+
+def is_path_match(position: str | int | None, key: str | int) -> bool:
+	return position == key or (type(key) is int and position == str(key))
+
+
+def build_value(event: str, value: Any, events: Iterator[tuple[str, Any]]) -> Any:
+	"""Builds the JSON value that starts with (event, value), consuming its remaining events"""
+	if event not in CONTAINER_STARTS:
+		return value
+
+	root = {} if event == "start_map" else []
+	containers = [root]
+	keys = [None]
+
+	for event, value in events:
+		if event == "map_key":
+			keys[-1] = value
+			continue
+
+		if event in CONTAINER_ENDS:
+			containers.pop()
+			keys.pop()
+
+			if not containers:
+				return root
+
+			continue
+
+		item = {} if event == "start_map" else [] if event == "start_array" else value
+		parent = containers[-1]
+
+		if type(parent) is list:
+			parent.append(item)
+		else:
+			parent[keys[-1]] = item
+
+		if event in CONTAINER_STARTS:
+			containers.append(item)
+			keys.append(None)
+
+	raise DagDrillError("JSON stream ended mid-value")
+
+
+def skip_value(events: Iterator[tuple[str, Any]]) -> None:
+	"""Consumes the rest of a container without building it"""
+	depth = 1
+
+	for event, value in events:
+		if event in CONTAINER_STARTS:
+			depth += 1
+		elif event in CONTAINER_ENDS:
+			depth -= 1
+
+			if not depth:
+				return
+
+
+def iter_path_events(events: Iterator[tuple[str, Any]], path: list[str | int], lazy: bool = False) -> Iterator[Any]:
+	"""
+	Walks ijson basic_parse events, building only the value found at path. Everything outside the path is skipped unbuilt
+
+	:param lazy: If the value at path is an array, yield its items one at a time instead of the array itself
+	"""
+
+	events = iter(events)
+	stack = [] # The key or index of each open container that leads towards path
+
+	for event, value in events:
+		if event == "map_key":
+			stack[-1] = value
+			continue
+
+		if event in CONTAINER_ENDS:
+			stack.pop()
+			continue
+
+		if stack and type(stack[-1]) is int:
+			stack[-1] += 1
+
+		depth = len(stack)
+		is_on_path = not depth or is_path_match(stack[-1], path[depth - 1])
+
+		if is_on_path and depth == len(path):
+			if lazy and event == "start_array":
+				for event, value in events:
+					if event == "end_array":
+						return
+
+					yield build_value(event, value, events)
+
+				return
+
+			# Keys are unique and indices don't repeat, so nothing after this can match: stop reading
+			yield build_value(event, value, events)
+			return
+
+		if is_on_path and event in CONTAINER_STARTS:
+			stack.append(-1 if event == "start_array" else None)
+		elif event in CONTAINER_STARTS:
+			skip_value(events)
+
+	raise DagDrillError(f"JSON stream has no value at {path}")
+
+
+def drill_path(data: Any, path: list[str | int]) -> Any:
+	try:
+		for key in path:
+			data = data[key] if not (type(key) is int and isinstance(data, dict)) else data[str(key)]
+	except (KeyError, IndexError, TypeError) as e:
+		raise DagDrillError(f"JSON has no value at {path}") from e
+
+	return data
+
+
+
+
+def iter_path(fileobj: BinaryIO, path: list[str | int], lazy: bool = False) -> Iterator[Any]:
+	"""Reads a JSON document from a binary file object, yielding the value at path (or its items, if lazy)"""
+	if (ijson := get_ijson()) is None:
+		value = drill_path(json.load(fileobj), path)
+		yield from (value if lazy and type(value) is list else [value])
+		return
+
+	yield from iter_path_events(ijson.basic_parse(fileobj, use_float = True, buf_size = BUF_SIZE), path, lazy)
+
+
+def load_path(fileobj: BinaryIO, path: list[str | int]) -> Any:
+	"""Reads only the value at path from a JSON document"""
+	return next(iter_path(fileobj, path))
+
+
+def iter_items(fileobj: BinaryIO, path: list[str | int]) -> Iterator[Any]:
+	"""Lazily yields the items of the array at path, building one item at a time"""
+	return iter_path(fileobj, path, lazy = True)
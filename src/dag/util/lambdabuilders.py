@@ -1,3 +1,5 @@
+import types
+
 import dag
 from dag.lib import comparison
 from dag.util.attribute_processors import AttrCallframeRecorder
@@ -6,7 +8,22 @@ from dag.util.attribute_processors import AttrCallframeRecorder
 
 #>>>> LambdaBuilder
 class LambdaBuilder(AttrCallframeRecorder):
+	_dag_compiled = None # (records, total records, compiled fn) from get_compiled
+
+	def __getstate__(self) -> dict:
+		# Compiled fns can't be pickled. They're rebuilt on the next call
+		return {k: v for k, v in self.__dict__.items() if k != "_dag_compiled"}
+
+
 	def _do_call(self, root = None):
+		entry = self._dag_compiled
+
+		if entry is None or entry[0] is not self._stored_attrs or entry[1] != len(entry[0] or ()):
+			entry = self._dag_compiled = (self._stored_attrs, len(self._stored_attrs or ()), get_compiled(self._stored_attrs))
+
+		if entry[2] is not None:
+			return entry[2](root)
+
 		with dag.ctx(active_lambdabuilder_root = root):
 			if root:
 				item = root
@@ -35,6 +52,191 @@ class LambdaBuilder(AttrCallframeRecorder):
 
 
 
+#>>>> LambdaBuilder compiler
+# Recorded attributes that convert the item rather than access it
+CONVERSIONS = {"INT": int, "STR": str, "DTIME": None} # DTime is resolved when compiled
+
+# Names whose calls AttributeAccessRecord.get_item handles itself rather than calling the item's method
+SPECIAL_OPS = {
+	"__or__": "item or {0}",
+	"__ior__": "{0} or item",
+	"__and__": "item and {0}",
+	"__iand__": "{0} and item",
+	"__invert__": "not item",
+	"__inv__": "not item",
+}
+
+STATIC_ARG_TYPES = (int, float, complex, bool, bytes, type(None), type, types.FunctionType, types.BuiltinFunctionType)
+
+
+class UncompilableRecord(Exception): pass
+
+
+
+def get_compiled(records: list | None):
+	"""
+	The compiled function for a LambdaBuilder's records, or None if they can't be compiled (and so must be replayed)
+
+	LambdaBuilders compile on their first call, after recording has finished, and recompile if records are added afterwards
+	"""
+
+	if not records:
+		return None
+
+	try:
+		return LambdaCompiler(records).compile()
+	except UncompilableRecord:
+		return None
+
+
+def is_static_arg(arg: object) -> bool:
+	"""Whether an arg is the same every call (isn't nabbed, or changed by being formatted with dag.ctx.parsed)"""
+	if type(arg) is str:
+		return "{" not in arg and "}" not in arg
+
+	# LambdaBuilders have no "format" to be formatted with, so they're only evaluated when called
+	return isinstance(arg, STATIC_ARG_TYPES + (LambdaBuilder,))
+
+
+def prepare_arg(arg: object) -> object:
+	"""Does what AttributeAccessRecord.get_item does to each arg before calling"""
+	arg = dag.nab_if_nabber(arg)
+
+	try:
+		return arg.format(**dag.ctx.parsed)
+	except Exception:
+		return arg
+
+
+def evaluate_lambdabuilder_arg(arg: object, root: object) -> object:
+	# If two lambdabuilders are being used in the same expression, evaulate here. (e.g.: r_.site_id + r_.id)
+	return arg(root) if isinstance(arg, LambdaBuilder) else arg
+
+
+def caught_exception() -> None:
+	"""Reports the exception being handled the way dag.catch does"""
+	with dag.catch():
+		raise
+
+
+
+class LambdaCompiler:
+	"""
+	Turns a LambdaBuilder's records into a Python function doing the same steps, so that calling it doesn't replay each record
+
+	Record names and args that can't change are folded into the function as constants. Args that are nabbed or formatted with
+	dag.ctx.parsed are still prepared on every call, as AttributeAccessRecord.get_item does
+	"""
+
+	def __init__(self, records: list):
+		from dag.util.nabbers import Nabber
+
+		self.records = records
+		self.lines = ["def compiled_lambda(root):", "\tif not root:", "\t\treturn None", "\titem = root"]
+		self.namespace = {
+			"nab": dag.nab_if_nabber,
+			"nabbable": (Nabber, list, tuple, dict),
+			"prepare_arg": prepare_arg,
+			"evaluate_lb": evaluate_lambdabuilder_arg,
+			"caught_exception": caught_exception,
+		}
+
+
+	def add_constant(self, value: object) -> str:
+		name = f"c{len(self.namespace)}"
+		self.namespace[name] = value
+		return name
+
+
+	def emit(self, *lines: str) -> None:
+		self.lines.extend("\t" + line for line in lines)
+
+
+	def compile(self):
+		for record in self.records:
+			self.compile_record(record)
+
+		self.emit("return item")
+
+		code = compile("\n".join(self.lines), "<compiled LambdaBuilder>", "exec")
+		exec(code, self.namespace)
+		return self.namespace["compiled_lambda"]
+
+
+	def compile_record(self, record) -> None:
+		name = record.attr_name
+
+		if name == "RSEARCH" and record.args:
+			raise UncompilableRecord(name)
+
+		if name == "LEN":
+			self.emit("item = len(item)")
+
+		elif name in CONVERSIONS:
+			conversion = CONVERSIONS[name] or dag.DTime
+			self.emit(f"item = {self.add_constant(conversion)}(item)")
+			return
+
+		elif name == "TYPE" and record.args:
+			self.emit(f"item = {self.add_constant(record.args[0])}(item)")
+			return
+
+		self.compile_get_item(record)
+
+
+	def compile_get_item(self, record) -> None:
+		"""The steps of AttributeAccessRecord.get_item"""
+		name = record.attr_name
+
+		self.emit("if isinstance(item, nabbable):", "\titem = nab(item)")
+		self.emit(f"fn = getattr(item, {self.add_constant(name)}, None)")
+
+		if not (record.is_called or record.args or record.kwargs):
+			self.emit("item = fn")
+			return
+
+		args = [self.get_arg_expr(arg) for arg in record.args]
+		kwargs = {key: self.get_arg_expr(value) for key, value in record.kwargs.items()}
+
+		self.emit(f"args = ({''.join(arg + ', ' for arg in args)})")
+		self.emit("kwargs = {" + ", ".join(f"{self.add_constant(key)}: {value}" for key, value in kwargs.items()) + "}")
+
+		if (name == "__radd__" or name in SPECIAL_OPS) and not args:
+			raise UncompilableRecord(name) # These index args[0], so leave raising IndexError to get_item
+
+		# Hacky because strings don't have __radd__
+		if name == "__radd__":
+			self.emit("if fn is None:", "\titem = args[0] + item")
+			self.emit("else:")
+			self.emit_call(record, args, indent = "\t")
+			return
+
+		if name in SPECIAL_OPS:
+			self.emit("item = " + SPECIAL_OPS[name].format("args[0]"))
+			return
+
+		self.emit_call(record, args)
+
+
+	def emit_call(self, record, args: list[str], indent: str = "") -> None:
+		if isinstance(record.attr_recorder, LambdaBuilder):
+			callargs = [f"evaluate_lb(args[{i}], root)" for i in range(len(args))]
+		else:
+			callargs = ["*args"]
+
+		self.emit(f"{indent}try:", f"{indent}\titem = fn({', '.join(callargs + ['**kwargs'])})")
+		self.emit(f"{indent}except Exception:", f"{indent}\tcaught_exception()", f"{indent}\titem = fn")
+
+
+	def get_arg_expr(self, arg: object) -> str:
+		if is_static_arg(arg):
+			return self.add_constant(arg)
+
+		return f"prepare_arg({self.add_constant(arg)})"
+#<<<< LambdaBuilder compiler
+
+
+
 def convert_lb_to_string(lb: LambdaBuilder, is_root_call: bool = True) -> str:
 	def make_str(text):
 		if isinstance(text, str):
@@ -1,13 +1,26 @@
-import gzip, os, pathlib
+import json, os, pathlib, threading, time
+from contextlib import contextmanager
 
 import dag
 
 ext = dag.settings.CACHEFILE_EXT + ".gz"
+metaext = ".meta"
 
 	
 class PersistenceFile:
-	def __init__(self, root):
+	# Class-level so that subclasses which don't call __init__ (e.g.: tempcache) still have them
+	max_bytes = None
+	total_bytes = None
+
+	def __init__(self, root, max_bytes = None):
+		"""
+		Stores values under root, one file per value, serialized by cachecodecs
+
+		:param root: The directory that holds the files
+		:param max_bytes: An int (or a callable returning an int) byte budget. When exceeded, least-recently-used files are evicted
+		"""
 		self.root = pathlib.Path(root)
+		self.max_bytes = max_bytes
 
 
 	def format_filename_chars(self, name):
@@ -19,30 +32,379 @@ class PersistenceFile:
 		return self.root / folder / filename
 
 
+	def get_metapath(self, filepath):
+		return filepath.with_name(filepath.name + metaext)
+
+
+	def get_key(self, folder, filename) -> tuple[str, str]:
+		"""A backend-independent identifier for a stored value"""
+		return str(folder).strip("/"), self.format_filename_chars(filename.strip("/")).removesuffix(ext).removesuffix(".")
+
+
 	def exists(self, folder, filename):
 		filepath = self.process_filepath(folder, filename) 
 		return dag.file.exists(filepath)
 
 
 	def read(self, folder, filename):
-		import dill
-		filepath = self.process_filepath(folder, filename) 
+		from dag.util import cachecodecs # lazy import here because importing cachecodecs (pickle, gzip) slows down dag load
+		return cachecodecs.loads(self.read_bytes(folder, filename))
 
-		with dag.file.open(filepath, "rb", opener = gzip.open) as f:
-			return dill.load(f)
 
+	def read_bytes(self, folder, filename) -> bytes:
+		filepath = self.process_filepath(folder, filename) 
 
-	def write(self, text, folder, filename):
-		import dill
+		# Opening touches the file, so its mtime doubles as its last-access time for LRU eviction
+		with dag.file.open(filepath, "rb") as f:
+			return f.read()
 
+
+	def write(self, text, folder, filename, meta = None):
 		filepath = self.process_filepath(folder, filename) 
 		
 		try:
-			with dag.file.open(filepath, "wb+", opener = gzip.open) as f:
-				dill.dump(text, f)
+			from dag.util import cachecodecs # lazy import here because importing cachecodecs (pickle, gzip) slows down dag load
+			data = cachecodecs.dumps(text)
+		except TypeError as e:
+			dag.echo(f"\n\nCacheFile Write Error: {e}\nSkipping Writing CacheFile\n\n")
+			return filepath
+
+		with dag.file.open(filepath, "wb+") as f:
+			f.write(data)
+
+		self.write_meta(filepath, meta or {})
+		self.track_bytes(filepath)
+
+		return filepath
+
+
+	def delete(self, folder, filename = None) -> bool:
+		"""Deletes a file, or a whole folder if no filename is given"""
+		path = self.process_filepath(folder, filename) if filename is not None else self.root / folder
+
+		if not path.exists():
+			return False
+
+		if path.is_file():
+			try:
+				os.remove(self.get_metapath(path))
+			except OSError:
+				pass
+
+		dag.file.delete(path)
+		return not path.exists()
+
+
+	def write_meta(self, filepath, meta):
+		meta = {"stored_at": time.time()} | {k: v for k, v in meta.items() if v is not None}
+
+		with open(self.get_metapath(filepath), "w") as f:
+			json.dump(meta, f)
+
+
+	def read_meta(self, folder, filename) -> dict:
+		"""Returns the metadata stored with a file (when it was stored, plus any ETag/Last-Modified validators)"""
+		try:
+			with open(self.get_metapath(self.process_filepath(folder, filename))) as f:
+				return json.load(f)
+		except (OSError, ValueError):
+			return {}
+
+
+	def refresh(self, folder, filename) -> None:
+		"""Marks a stored file as freshly stored (e.g.: after a 304 Not Modified revalidation)"""
+		filepath = self.process_filepath(folder, filename)
+		self.write_meta(filepath, self.read_meta(folder, filename) | {"stored_at": time.time()})
+
+
+	def is_fresh(self, folder, filename, ttl = None) -> bool:
+		"""
+		Whether a stored file is younger than its TTL
+
+		:param ttl: Seconds a file stays fresh. If falsy, files never go stale
+		"""
+
+		if not ttl:
+			return True
+
+		stored_at = self.read_meta(folder, filename).get("stored_at")
+		return stored_at is not None and time.time() - stored_at < float(ttl)
+
+
+	def get_max_bytes(self) -> int | None:
+		return self.max_bytes() if callable(self.max_bytes) else self.max_bytes
+
+
+	def iter_files(self):
+		"""Yields (path, size, mtime) for every file under root"""
+		for dirpath, dirnames, filenames in os.walk(self.root):
+			for name in filenames:
+				path = os.path.join(dirpath, name)
+
+				try:
+					stat = os.stat(path)
+				except OSError:
+					continue
+
+				yield path, stat.st_size, stat.st_mtime
+
+
+	def track_bytes(self, filepath) -> None:
+		if not (max_bytes := self.get_max_bytes()):
+			return
+
+		if self.total_bytes is None:
+			self.total_bytes = sum(size for path, size, mtime in self.iter_files())
+		else:
+			try:
+				self.total_bytes += os.path.getsize(filepath)
+			except OSError:
+				pass
+
+		if self.total_bytes > max_bytes:
+			self.evict(max_bytes)
+
+
+	def evict(self, max_bytes, lowwater = 0.9) -> int:
+		"""
+		Deletes least-recently-used files until the root's size is under lowwater * max_bytes
+
+		:returns: The number of bytes freed
+		"""
+
+		files = [*self.iter_files()]
+		total = sum(size for path, size, mtime in files)
+		target = max_bytes * lowwater
+		freed = 0
+
+		sizes = {path: size for path, size, mtime in files}
+
+		for path, size, mtime in sorted(files, key = lambda f: f[2]):
+			if total - freed <= target:
+				break
+
+			if path.endswith(metaext):
+				continue
+
+			for victim in (path, path + metaext):
+				try:
+					os.remove(victim)
+					freed += sizes.get(victim, 0)
+				except OSError:
+					pass
+
+		self.total_bytes = total - freed
+		return freed
+
+
+
+class SqlitePersistenceFile(PersistenceFile):
+	"""
+	Stores every entry as a row in one SQLite database (WAL mode) instead of one file per entry
+
+	Entries are keyed by (folder, filename), so existence checks are an indexed lookup rather than a filesystem stat
+	"""
+
+	schema = """
+		CREATE TABLE IF NOT EXISTS entries (
+			folder TEXT NOT NULL,
+			filename TEXT NOT NULL,
+			value BLOB NOT NULL,
+			meta TEXT NOT NULL DEFAULT '{}',
+			stored_at REAL NOT NULL,
+			accessed_at REAL NOT NULL,
+			size INTEGER NOT NULL,
+			PRIMARY KEY (folder, filename)
+		);
+		CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+	"""
+
+	# Reads only update an entry's access time once it is this many seconds old, to avoid a write per read
+	access_resolution = 60
+
+	def __init__(self, dbpath, max_bytes = None):
+		self.dbpath = pathlib.Path(dbpath)
+		super().__init__(self.dbpath.parent, max_bytes)
+
+		self._conn = None
+		self._pid = None
+		self._lock = threading.RLock()
 
+
+	def __getstate__(self):
+		# Connections can't be pickled. Each process opens its own
+		return self.__dict__ | {"_conn": None, "_pid": None, "_lock": None}
+
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self._lock = threading.RLock()
+
+
+	@property
+	def conn(self) -> "sqlite3.Connection":
+		# Forked processes can't share the parent's connection
+		if self._conn is None or self._pid != os.getpid():
+			self.dbpath.parent.mkdir(parents = True, exist_ok = True)
+
+			import sqlite3 # lazy import here because importing sqlite3 slows down dag load
+			self._conn = sqlite3.connect(self.dbpath, timeout = 30, check_same_thread = False, isolation_level = None)
+			self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL") # Only takes effect when the database is first created
+			self._conn.execute("PRAGMA journal_mode = WAL")
+			self._conn.execute("PRAGMA synchronous = NORMAL")
+			self._conn.executescript(self.schema)
+			self._pid = os.getpid()
+
+		return self._conn
+
+
+	@contextmanager
+	def transaction(self):
+		"""Runs the enclosed statements atomically"""
+		with self._lock:
+			conn = self.conn
+			conn.execute("BEGIN IMMEDIATE")
+
+			try:
+				yield conn
+			except BaseException:
+				conn.execute("ROLLBACK")
+				raise
+
+			conn.execute("COMMIT")
+
+
+	def exists(self, folder, filename):
+		with self._lock:
+			return self.conn.execute("SELECT 1 FROM entries WHERE folder = ? AND filename = ?", self.get_key(folder, filename)).fetchone() is not None
+
+
+	def read_bytes(self, folder, filename):
+		key = self.get_key(folder, filename)
+
+		with self._lock:
+			row = self.conn.execute("SELECT value, accessed_at FROM entries WHERE folder = ? AND filename = ?", key).fetchone()
+
+		if row is None:
+			raise FileNotFoundError(f"No cache entry for {key}")
+
+		value, accessed_at = row
+
+		if (now := time.time()) - accessed_at > self.access_resolution:
+			with self.transaction() as conn:
+				conn.execute("UPDATE entries SET accessed_at = ? WHERE folder = ? AND filename = ?", (now, *key))
+
+		return value
+
+
+	def write(self, text, folder, filename, meta = None):
+		key = self.get_key(folder, filename)
+
+		try:
+			from dag.util import cachecodecs # lazy import here because importing cachecodecs (pickle, gzip) slows down dag load
+			value = cachecodecs.dumps(text)
 		except TypeError as e:
 			dag.echo(f"\n\nCacheFile Write Error: {e}\nSkipping Writing CacheFile\n\n")
-			os.remove(filepath)
+			return key
+
+		now = time.time()
+		meta = {"stored_at": now} | {k: v for k, v in (meta or {}).items() if v is not None}
+
+		max_bytes = self.get_max_bytes()
+
+		with self.transaction() as conn:
+			# Like track_bytes: The total is summed once, then kept up to date from each write's change in size
+			if max_bytes:
+				if self.total_bytes is None:
+					self.total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+				replaced = conn.execute("SELECT size FROM entries WHERE folder = ? AND filename = ?", key).fetchone()
+				self.total_bytes += len(value) - (replaced[0] if replaced else 0)
+
+			conn.execute("INSERT OR REPLACE INTO entries (folder, filename, value, meta, stored_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?, ?)", (*key, value, json.dumps(meta), meta["stored_at"], now, len(value)))
+
+		if max_bytes and self.total_bytes > max_bytes:
+			self.evict(max_bytes)
+
+		return key
+
+
+	def read_meta(self, folder, filename) -> dict:
+		with self._lock:
+			row = self.conn.execute("SELECT meta FROM entries WHERE folder = ? AND filename = ?", self.get_key(folder, filename)).fetchone()
+
+		return json.loads(row[0]) if row else {}
+
+
+	def refresh(self, folder, filename) -> None:
+		key = self.get_key(folder, filename)
+		now = time.time()
+
+		with self.transaction() as conn:
+			if row := conn.execute("SELECT meta FROM entries WHERE folder = ? AND filename = ?", key).fetchone():
+				meta = json.loads(row[0]) | {"stored_at": now}
+				conn.execute("UPDATE entries SET meta = ?, stored_at = ?, accessed_at = ? WHERE folder = ? AND filename = ?", (json.dumps(meta), now, now, *key))
+
+
+	def is_fresh(self, folder, filename, ttl = None) -> bool:
+		if not ttl:
+			return True
+
+		with self._lock:
+			row = self.conn.execute("SELECT stored_at FROM entries WHERE folder = ? AND filename = ?", self.get_key(folder, filename)).fetchone()
+
+		return row is not None and time.time() - row[0] < float(ttl)
+
+
+	def delete(self, folder, filename = None) -> int:
+		"""Deletes an entry, or every entry in a folder (and its subfolders) if no filename is given. Returns the number deleted"""
+		self.total_bytes = None # Deletes are rare, so the next write sums the total again
+
+		with self.transaction() as conn:
+			if filename is not None:
+				return conn.execute("DELETE FROM entries WHERE folder = ? AND filename = ?", self.get_key(folder, filename)).rowcount
+
+			folder = str(folder).strip("/")
+			return conn.execute("DELETE FROM entries WHERE folder = ? OR folder LIKE ? ESCAPE '\\'", (folder, folder.replace("%", "\\%").replace("_", "\\_") + "/%")).rowcount
+
+
+	def get_total_bytes(self) -> int:
+		with self._lock:
+			return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+
+	def evict(self, max_bytes, lowwater = 0.9) -> int:
+		target = max_bytes * lowwater
+		freed = 0
+
+		with self.transaction() as conn:
+			total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+			for folder, filename, size in conn.execute("SELECT folder, filename, size FROM entries ORDER BY accessed_at").fetchall():
+				if total - freed <= target:
+					break
+
+				conn.execute("DELETE FROM entries WHERE folder = ? AND filename = ?", (folder, filename))
+				freed += size
+
+		if freed:
+			with self._lock:
+				self.conn.execute("PRAGMA incremental_vacuum")
+
+		self.total_bytes = total - freed
+		return freed
+
+
+	def vacuum(self) -> None:
+		"""Returns space freed by deleted entries to the filesystem"""
+		with self._lock:
+			self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+			self.conn.execute("VACUUM")
+
+
+	def close(self) -> None:
+		with self._lock:
+			if self._conn is not None and self._pid == os.getpid():
+				self._conn.close()
 
-		return filepath
\ No newline at end of file
+			self._conn = None
@@ -1,4 +1,4 @@
-import re, copy, math, shutil, textwrap, unicodedata, contextlib
+import re, copy, math, shutil, textwrap, unicodedata, contextlib, functools
 
 from collections import defaultdict
 from collections.abc import MutableSequence, MutableMapping
@@ -8,6 +8,32 @@ import dag
 from dag.util import ctags
 
 
+ANSI_ESCAPE = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
+CTAG = re.compile(r'</?c.*?>')
+TRAILING_NEWLINES = re.compile(r"\n*$")
+
+WIDTH_CACHE_SIZE = 16384 # Rendered collections repeat most of their values (and every cell's before/after), so widths are measured once each
+
+
+
+@functools.lru_cache(maxsize = WIDTH_CACHE_SIZE)
+def strip_ctags(text: str) -> str:
+	return CTAG.sub("", text)
+
+
+@functools.lru_cache(maxsize = WIDTH_CACHE_SIZE)
+def get_emoji_length(text: str) -> int:
+	"""Emojis take up two terminal columns, so they're counted again"""
+	if text.isascii():
+		return 0
+
+	return sum(1 for ch in text if ch != "█" and unicodedata.category(ch) == "So")
+
+
+def get_ctag_length(text: str) -> int:
+	return len(text) - len(strip_ctags(text))
+
+
 
 class Column(MutableMapping, dag.dot.DotAccess):
 	default_style = {
@@ -28,9 +54,15 @@ class Column(MutableMapping, dag.dot.DotAccess):
 	def __init__(self, incmd = None, **settings):
 		self.settings = settings
 
-		self.default_style["max_width"] = shutil.get_terminal_size().columns
+	@classmethod
+	def update_max_width(cls) -> None:
+		"""Columns are at most as wide as the terminal. Checked once per formatter, since every row copies its columns"""
+		cls.default_style["max_width"] = shutil.get_terminal_size().columns
+
+	def __getattr__(self, setting, default = None):
+		settings = self.__dict__.get("settings", {})
+		return settings[setting] if setting in settings else self.default_style.get(setting, default)
 
-	def __getattr__(self, setting, default = None):	return (self.default_style | self.settings).get(setting, default)
 	def __getitem__(self, setting): return self.settings[setting]
 	def __setitem__(self, setting, value): self.settings[setting] = value
 	def __delitem__(self, setting): del self.settings[setting]
@@ -50,6 +82,9 @@ class Column(MutableMapping, dag.dot.DotAccess):
 		
 		
 class Row(MutableSequence, dag.dot.DotAccess):
+	ansiiesc = ANSI_ESCAPE
+	re_ctag = CTAG
+
 	def __init__(self, formatter, contents = [], item = None, idxitem = None, templistname = None, templistitem = None, **settings):
 		self.contents = contents
 	
@@ -72,9 +107,6 @@ class Row(MutableSequence, dag.dot.DotAccess):
 
 		self.cellstyles = defaultdict(Column)
 		
-		self.ansiiesc = re.compile(r'\x1B[@-_][0-?]*[ -/]*[@-~]')
-		self.re_ctag = re.compile(r'</?c.*?>')
-		
 		for i in (self.id or "").split() or [None]:
 			self.cellstyles.update({colidx: col.copy() for colidx, col in self.formatter.cols.get(i, {}).items()})
 
@@ -86,47 +118,46 @@ class Row(MutableSequence, dag.dot.DotAccess):
 	class Cell:
 		def __init__(self, row, content = None, idx = None):
 			self.row = row
-			self.idx = idx
+			self.idx = idx # Kept in step with the cell's place in row.cells by the row
 			self.content = str(content)
 
 			
 		@property
 		def contents(self):
-			return [self.content, self.style.suffix + self.style.before, self.style.after + self.style.suffix]
+			return self.get_contents(self.style)
 
-		@property
-		def content(self):
-			return self._content
 
-			
-		@content.setter
-		def content(self, content = ""):
-			self._content = content
-			self.unformatted_content = self.get_unformatted_content(content)
+		def get_contents(self, style) -> list[str]:
+			return [self.content, style.suffix + style.before, style.after + style.suffix]
+
+
+		@property
+		def unformatted_content(self):
+			return strip_ctags(self.content)
 			
 			
-		def unformatted_content_length(self):
-			return len(self.unformatted_content) + self.emoji_length()
+		def unformatted_content_length(self, style = None):
+			return len(self.unformatted_content) + self.emoji_length(style)
 			
 			
-		def unformatted_length(self):
-			return sum(map(self.get_unformatted_content_length, self.contents))
+		def unformatted_length(self, style = None):
+			return sum(map(self.get_unformatted_content_length, self.get_contents(self.style if style is None else style)))
 			
 			
 		def get_unformatted_content_length(self, text):
-			return len(self.get_unformatted_content(text))
+			return len(strip_ctags(text))
 			
 
 		def get_unformatted_content(self, text):
-			return re.sub("</?c.*?>", "", text)
+			return strip_ctags(text)
 			
 			
-		def emoji_length(self):
-			return sum(map(self.get_emoji_length, self.contents))
+		def emoji_length(self, style = None):
+			return sum(map(get_emoji_length, self.get_contents(self.style if style is None else style)))
 			
 		
 		def get_emoji_length(self, text):
-			return sum(1 for _ in filter(lambda x: x != "█" and unicodedata.category(x) == "So", text))
+			return get_emoji_length(text)
 
 
 		def ansii_length(self):
@@ -138,27 +169,30 @@ class Row(MutableSequence, dag.dot.DotAccess):
 			return sum(map(len, ansiistyles))
 			
 			
-		def ctag_length(self):
-			return sum(map(self.get_ctag_length, self.contents))
+		def ctag_length(self, style = None):
+			return sum(map(get_ctag_length, self.get_contents(self.style if style is None else style)))
 			
 			
 		def get_ctag_length(self, text):
-			ctags = self.row.re_ctag.findall(text)
-			return sum(map(len, ctags))
+			return get_ctag_length(text)
 
 
 		@property
 		def width(self):
-			return self.style.width or self.style.margin
+			return self.get_width(self.style)
+
+
+		def get_width(self, style) -> int:
+			return style.width or style.margin
 
 
 		@property
 		def text_width(self):
-			try:
-				return self.width - self.style.margin - (self.row.padding_left if self.cellidx == 0 else 0)
-			except Exception as e:
-				breakpoint()
-				pass
+			return self.get_text_width(self.style)
+
+
+		def get_text_width(self, style) -> int:
+			return self.get_width(style) - style.margin - (self.row.padding_left if self.idx == 0 else 0)
 		
 		
 		def is_empty(self):
@@ -167,23 +201,25 @@ class Row(MutableSequence, dag.dot.DotAccess):
 		
 		@property
 		def cellidx(self):
-			return self.row.cells.index(self)
+			return self.idx
 
 			
 		@property
 		def style(self):
-			negative_style = self.row.cellstyles.get(self.cellidx - len(self.row), {})
-			positive_style = self.row.cellstyles.get(self.cellidx, self.row.formatter.default_col)
+			"""The cell's column style merged over the defaults. Resolving it isn't free, so renderers resolve it once per cell"""
+			row = self.row
+			negative_style = row.cellstyles.get(self.idx - len(row.cells), {})
+			positive_style = row.cellstyles.get(self.idx, row.formatter.default_col)
 
-			style_str = ""
+			negative_settings = negative_style.settings if isinstance(negative_style, Column) else negative_style
+			positive_settings = positive_style.settings if isinstance(positive_style, Column) else positive_style
 
-			if positive_style.get("style", "") or negative_style.get("style", ""): # This prevents the style_str from turning into " ", breaking some later bool checks
-				style_str = positive_style.get("style", "") + " " + negative_style.get("style", "")
+			style_str = ""
 
-			style = dag.DotDict({**Column.default_style, **positive_style, **negative_style})
+			if positive_settings.get("style", "") or negative_settings.get("style", ""): # This prevents the style_str from turning into " ", breaking some later bool checks
+				style_str = positive_settings.get("style", "") + " " + negative_settings.get("style", "")
 
-			style["style"] = style_str
-			return style
+			return dag.dot.shared_dotdict(dag.DotDict, {**Column.default_style, **positive_settings, **negative_settings, "style": style_str})
 
 			
 		def __str__(self):
@@ -206,10 +242,21 @@ class Row(MutableSequence, dag.dot.DotAccess):
 
 	# Implement abstract class w/ these methods
 	def __getitem__(self, cellidx):	return self.cells[cellidx]
-	def __setitem__(self, cellidx, content): self.cells[cellidx] = self.generate_cell(content, cellidx)
-	def __delitem__(self, cellidx):	del self.cells[cellidx]
 	def __len__(self): return len(self.cells)
 
+	def __setitem__(self, cellidx, content):
+		self.cells[cellidx] = self.generate_cell(content, cellidx)
+		self.renumber_cells()
+
+	def __delitem__(self, cellidx):
+		del self.cells[cellidx]
+		self.renumber_cells()
+
+
+	def renumber_cells(self) -> None:
+		for idx, cell in enumerate(self.cells):
+			cell.idx = idx
+
 	
 	def create_cells_at_idx(self, cellidx):
 		if cellidx >= len(self.cells):
@@ -234,6 +281,7 @@ class Row(MutableSequence, dag.dot.DotAccess):
 		
 	def insert(self, cellidx, content):
 		self.cells.insert(cellidx, self.generate_cell(content, cellidx))
+		self.renumber_cells()
 
 		
 	def clear_cells(self):
@@ -310,6 +358,7 @@ class DagStyleFormatter:
 		
 		self.ignorecase = False
 		
+		Column.update_max_width()
 		self.default_col = Column()
 		
 		self.colcount = 0
@@ -524,48 +573,54 @@ class DagStyleFormatter:
 
 					
 	def set_col_lens(self) -> None:
+		"""Measures each column's visible width (with the patterns from sub/cstyle applied), then fits the columns to the window"""
 		collens = {}
+		repls = [(pattern, repl, self.rowstyles.get(pattern, "")) for pattern, repl in self.repl.items()]
 
 		for row in self.rows:
-			collens.setdefault(row.id, {})
+			rowcollens = collens.setdefault(row.id, {})
 
-			for cellidx, cell in enumerate(row):
-				if row.is_message:
-					continue
+			if row.is_message:
+				continue
 
-				for pattern, repl in self.repl.items():
+			for cellidx, cell in enumerate(row.cells):
+				for pattern, repl, rowstyle in repls:
 					if pattern.search(cell.content):
 						cell.content = pattern.sub(repl, cell.content)
-						row.settings['style'] = self.rowstyles.get(pattern, "") + " " + row.settings.get('style' "")
+						row.settings['style'] = rowstyle + " " + row.settings.get('style')
+
+				style = cell.style
+				collen = cell.unformatted_length(style) + cell.emoji_length(style) + style.margin + (row.padding_left if cellidx == 0 else 0)
 
-				collens[row.id][cellidx] = min(cell.style.max_width, max(collens[row.id].get(cellidx, 0), cell.unformatted_length() + cell.emoji_length() + cell.style.margin + (row.padding_left if cellidx == 0 else 0)))
-				breakpoint(collens[row.id][cellidx] < 0)
+				rowcollens[cellidx] = min(style.max_width, max(rowcollens.get(cellidx, 0), collen))
 
 		self.content_collens = collens
 		window_width = shutil.get_terminal_size().columns
+		lastrow = self.rows[-1] if self.rows else None
 
-		for rowid, total_collen in collens.items():
-			max_len_per_cell = math.floor(window_width / max(1, len(collens[rowid])))
+		for rowid, rowcollens in collens.items():
+			max_len_per_cell = math.floor(window_width / max(1, len(rowcollens)))
 			
 			undersized_cells = 0
-			for colidx, collen in collens[rowid].items():
+			for colidx, collen in rowcollens.items():
 				if collen < max_len_per_cell:
 					undersized_cells = undersized_cells + 1
-					max_len_per_cell += (max_len_per_cell - collen)/max(1, len(collens[rowid]) - undersized_cells)
+					max_len_per_cell += (max_len_per_cell - collen)/max(1, len(rowcollens) - undersized_cells)
 					
 			max_len_per_cell = math.floor(max_len_per_cell)
 					
-			for colidx, collen in collens[rowid].items():
-				collens[rowid][colidx] = min(collen, max_len_per_cell, row.cellstyles[colidx].max_width)
-				breakpoint(collens[rowid][colidx] < 0)
+			for colidx, collen in rowcollens.items():
+				rowcollens[colidx] = min(collen, max_len_per_cell, lastrow.cellstyles[colidx].max_width)
+
+		for row in self.rows:
+			for cellidx in range(len(row.cells)):
+				row.cellstyles.setdefault(cellidx, Column())
 
-			for row in self.rows:
-				for cellidx, cell in enumerate(row.cells):
-					row.cellstyles.setdefault(cellidx, Column())
+			rowcollens = collens[row.id]
 
-				for colidx, cellstyle in row.cellstyles.items():
-					if collens[row.id].get(colidx):
-						cellstyle.settings["width"] = collens[row.id][colidx] if not row.id == "__message__" else window_width
+			for colidx, cellstyle in row.cellstyles.items():
+				if rowcollens.get(colidx):
+					cellstyle.settings["width"] = rowcollens[colidx] if not row.id == "__message__" else window_width
 						
 						
 	def generate_overflow_row(self, row: Row) -> Row:
@@ -580,6 +635,27 @@ class DagStyleFormatter:
 
 
 	def print_message(self, row: Row) -> str:
+		parts, nomulticol = [], []
+		self.render_message(row, parts, nomulticol)
+		self.add_response_no_multicol(nomulticol)
+		return "".join(parts)
+
+
+	def print_row(self, row: Row, is_overflow_row: bool = False) -> str:
+		parts, nomulticol = [], []
+		self.render_row(row, parts, nomulticol, is_overflow_row)
+		self.add_response_no_multicol(nomulticol)
+		return "".join(parts)
+
+
+	def add_response_no_multicol(self, nomulticol: list[str]) -> None:
+		if self.ic_response and nomulticol:
+			self.ic_response.response_no_multicol += "".join(nomulticol)
+
+
+
+
+	def render_message(self, row: Row, parts: list[str], nomulticol: list[str]) -> None:
 		rowstyle_openctag = ""
 		rowstyle_closectag = ""
 
@@ -587,100 +663,106 @@ class DagStyleFormatter:
 			rowstyle_openctag = f"<c {row.style}>"
 			rowstyle_closectag = "</c>"
 
-		if self.ic_response:
-			self.ic_response.response_no_multicol += "\n"*row.margin_top + rowstyle_openctag + row.cells[0].content + rowstyle_closectag +"\n"*row.margin_bottom
+		content = row.cells[0].content
 
-		return "\n"*row.margin_top + rowstyle_openctag + row.cells[0].content.ljust(row.cells[0].style.max_width - 5) + rowstyle_closectag +"\n"*row.margin_bottom
+		nomulticol.append("\n"*row.margin_top + rowstyle_openctag + content + rowstyle_closectag +"\n"*row.margin_bottom)
+		parts.append("\n"*row.margin_top + rowstyle_openctag + content.ljust(row.cells[0].style.max_width - 5) + rowstyle_closectag +"\n"*row.margin_bottom)
 
 
-	def print_row(self, row: Row, is_overflow_row: bool = False) -> str:
-		if row.is_message:
-			return self.print_message(row)			
+	def render_row(self, row: Row, parts: list[str], nomulticol: list[str], is_overflow_row: bool = False) -> None:
+		"""
+		Appends the row's text to parts, and its text without columns to nomulticol. Text that doesn't fit in its cell
+		(or comes after a newline) goes into an overflow row, which is rendered right after
+		"""
 
-		response_str = ""
+		if row.is_message:
+			return self.render_message(row, parts, nomulticol)
 
+		margin_top = "\n"*row.margin_top
 		rowstyle = f"<c {row.style}>" if row.style else ""
+		rowclosetag = f"</c>" if row.style else ""
+		collens = self.content_collens[row.id] if not is_overflow_row else None
 
-		overflow_row = self.generate_overflow_row(row)
+		overflow_row = None # Only built once something overflows
 		
 		for cellidx, cell in enumerate(row.cells):
-			left_padding = " "*(row.padding_left if cellidx == 0 else 0)
-
-			cellstyle = cell.style if not row.ignore_colstyle else ""
+			style = cell.style
+			padding_left = row.padding_left if cellidx == 0 else 0
+			left_padding = " "*padding_left
 
-			columnstyle = self.cols.get(row.id, {}).get(cellidx, {}).get("style", "")
-			opencolumnstyle = "<c {columnstyle}>" if columnstyle else ""
-			closeolumnstyle = "</c {columnstyle}>" if columnstyle else ""
+			cellstyle = style if not row.ignore_colstyle else ""
 
-			colstyle = f"<c {cellstyle.style}>" if (cellstyle and cellstyle.style and not cellstyle.style == row.cellstyles.get(cellidx-1, self.generate_row()).style) else ""
-			colclosetag = f"</c {cellstyle.style}>" if (cellstyle and cellstyle.style and not cellstyle.style == row.cellstyles.get(cellidx+1, self.generate_row()).style) else ""
+			colstyle = f"<c {cellstyle.style}>" if (cellstyle and cellstyle.style and not cellstyle.style == self.get_neighbor_style(row, cellidx - 1)) else ""
+			colclosetag = f"</c {cellstyle.style}>" if (cellstyle and cellstyle.style and not cellstyle.style == self.get_neighbor_style(row, cellidx + 1)) else ""
 			
 			after = cellstyle.after + cellstyle.suffix if cellstyle else ""
 			before = cellstyle.prefix + cellstyle.before if cellstyle else ""
 			margin = cellstyle.margin if cellstyle else self.COL_MARGIN_DEFAULT
-						
-			rowclosetag = f"</c>" if row.style else ""
+			width = cell.get_width(style)
 			
 			if not is_overflow_row:
-				try:
-					total_ljust = max(max(len(cell.content), self.content_collens[row.id].get(cellidx, 0)) + len(after) + len(before) + margin - (row.padding_left if cellidx == 0 else 0), cell.width)
-
-				except Exception as e:
-					breakpoint()
-					pass
-				
-				if self.ic_response:
-					self.ic_response.response_no_multicol += f"{left_padding}{before}{cell.content}{after}".ljust(total_ljust)
+				total_ljust = max(max(len(cell.content), collens.get(cellidx, 0)) + len(after) + len(before) + margin - padding_left, width)
+				nomulticol.append(f"{left_padding}{before}{cell.content}{after}".ljust(total_ljust))
 				
 			if "\n" in cell.content:
 				split_lines = cell.content.split("\n")
+				overflow_row = overflow_row or self.generate_overflow_row(row)
 				overflow_row.set_cell(cellidx, "\n".join(split_lines[1:]))
 				cell.content = split_lines[0] + "\n"
 
-			if cell.text_width and cell.unformatted_content_length() > cell.text_width:
-				newline = ""
-				if re.search(r"\n*$", cell.content):
-					newline = re.search(r"\n*$", cell.content)[0]
+			text_width = cell.get_text_width(style)
+
+			if text_width and cell.unformatted_content_length(style) > text_width:
+				newline = TRAILING_NEWLINES.search(cell.content)[0]
 
-				textwidth = max(cell.text_width, 2)
+				textwidth = max(text_width, 2)
 				#line_content = textwrap.wrap(cell.content, width = textwidth) or ['']
 				line_content = ctags.CTagWordWrapper(textwidth).wrap(cell.content) or ['']
 				with dag.catch() as e:
 					line_content[-1] += newline
 
+				overflow_row = overflow_row or self.generate_overflow_row(row)
 				overflow_row.prepend_cell(cellidx , " ".join(line_content[1:]))
 				cell.content = line_content[0]
 
-			response_str += "\n"*row.margin_top + f"{rowstyle}{colstyle}" + cell.style.just(f"{left_padding}{before}{cell.content}{after}", (cell.width + cell.ctag_length() - cell.emoji_length() - cell.style.margin)) + f"{colclosetag}" + " "*cell.style.margin + f"{rowclosetag}"
+			contents = cell.get_contents(style)
+			justwidth = width + sum(map(get_ctag_length, contents)) - sum(map(get_emoji_length, contents)) - style.margin
+
+			parts += [margin_top, rowstyle, colstyle, style.just(f"{left_padding}{before}{cell.content}{after}", justwidth), colclosetag, " "*style.margin, rowclosetag]
 
-		if not overflow_row.is_empty():
-			response_str += "\n"
-			response_str += self.print_row(overflow_row, is_overflow_row = True)
+		has_overflow = overflow_row is not None and not overflow_row.is_empty()
+
+		if has_overflow:
+			parts.append("\n")
+			self.render_row(overflow_row, parts, nomulticol, is_overflow_row = True)
 
 		if not is_overflow_row:
-			response_str += "\n"*(row.margin_bottom if overflow_row.is_empty() else max(2, row.margin_bottom))
-			if self.ic_response:
-				self.ic_response.response_no_multicol += "\n"*(row.margin_bottom)
+			parts.append("\n"*(row.margin_bottom if not has_overflow else max(2, row.margin_bottom)))
+			nomulticol.append("\n"*(row.margin_bottom))
+
 
-		return response_str
+	@staticmethod
+	def get_neighbor_style(row: Row, colidx: int) -> str:
+		"""The style of a neighboring column, which a cell's style tag is merged with when they're the same"""
+		cellstyle = row.cellstyles.get(colidx)
+		return cellstyle.style if cellstyle is not None else ""
 		
 		
 	def print_response(self):
-		response_str = ""
-		
 		self.add_titles()
 
 		self.maybe_enumerate_rows()
 				
 		self.set_col_lens()
 
-		for rowidx, row in enumerate(self.rows):
-			response_row = self.print_row(row)
-			#print(response_row)
-			response_str += response_row
-				
-		return response_str
+		parts, nomulticol = [], []
+
+		for row in self.rows:
+			self.render_row(row, parts, nomulticol)
+
+		self.add_response_no_multicol(nomulticol)
+		return "".join(parts)
 		
 
 	def __str__(self):
-		return self.print_response()
\ No newline at end of file
+		return self.print_response()
@@ -0,0 +1,63 @@
+import pytest
+
+from dag.dagcli import completers
+from dag.dagcli.completers import LHMAP
+from dag.dagcli.completionindex import CompletionIndex
+
+
+@pytest.fixture
+def index():
+	return CompletionIndex(["completeline", "complete", "clear", "cachestats", "exit", "reload", "register", "pokemon", "pikachu", "charizard", "register"], LHMAP)
+
+
+
+def test_dedupes_and_sorts(index):
+	assert index.items == sorted(set(index.items))
+	assert len(index) == 10
+
+
+def test_complete_beginning(index):
+	assert index.complete("comp") == ["complete", "completeline"]
+	assert index.complete("re") == ["register", "reload"]
+
+
+def test_complete_empty_word_returns_everything(index):
+	assert index.complete("") == index.items
+
+
+def test_complete_star_returns_nothing(index):
+	assert index.complete("*") == []
+
+
+def test_complete_subsequence(index):
+	assert index.complete_subsequence("cmp") == ["complete", "completeline"]
+	assert index.complete_subsequence("xyz") == []
+
+
+def test_complete_lefthand_fuzzy(index):
+	# "w" may stand in for "o", "y", or "e"
+	assert "pikachu" in index.complete_lefthand_fuzzy("pkc")
+	assert index.complete_lefthand_fuzzy("wxit") == ["exit"]
+
+
+def test_complete_falls_back_to_fuzzier(index):
+	# "q" isn't in any candidate (and only stands in for "p"), so it's dropped
+	assert index.complete("pokqemon") == ["pokemon"]
+
+
+def test_complete_shortest_first(index):
+	items = index.complete_lefthand_fuzzy("c")
+	assert [len(i) for i in items] == sorted(len(i) for i in items)
+
+
+def test_is_subsequence():
+	assert CompletionIndex.is_subsequence("completeline", ["c", "l", "n"])
+	assert not CompletionIndex.is_subsequence("completeline", ["n", "c"])
+	assert CompletionIndex.is_subsequence("ab", ["xa", "yb"])
+
+
+def test_completion_index_from_generator():
+	candidates = ["pokemon", "pikachu", "pokemon"]
+
+	assert completers.dag_complete("po", (c for c in candidates)) == ["pokemon"]
+	assert completers.get_completion_index(iter(candidates)) is completers.get_completion_index(candidates)
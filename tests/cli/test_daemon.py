@@ -0,0 +1,121 @@
+import os, socket, threading, tracemalloc
+from types import SimpleNamespace
+
+import pytest
+
+import dag
+from dag import dag_daemon_client as client
+from dag.dagcli import daemon
+
+
+@pytest.fixture
+def socketpath(tmp_path):
+	return str(tmp_path / "state" / "daemon.sock")
+
+
+def read_all(sock):
+	with sock.makefile("r", encoding = "utf-8") as sockfile:
+		return [*client.read_messages(sockfile)]
+
+
+
+def test_socket_writer_sends_output_messages():
+	left, right = socket.socketpair()
+
+	with left, right:
+		writer = daemon.SocketWriter(left)
+		print("hello", file = writer)
+		writer.write("")
+		left.shutdown(socket.SHUT_WR)
+
+		assert read_all(right) == [{"out": "hello"}, {"out": "\n"}]
+
+
+def test_request_environment_is_restored(tmp_path):
+	oldcwd = os.getcwd()
+	request = {"cwd": str(tmp_path), "env": {"DAG_DAEMON_TESTVAR": "1"}, "columns": 123, "lines": 45}
+
+	with daemon.request_environment(request):
+		assert os.getcwd() == str(tmp_path)
+		assert os.environ["DAG_DAEMON_TESTVAR"] == "1"
+		assert os.environ["COLUMNS"] == "123"
+
+	assert os.getcwd() == oldcwd
+	assert "DAG_DAEMON_TESTVAR" not in os.environ
+
+
+def test_build_request():
+	request = client.build_request(["nhl", "games"])
+
+	assert request["version"] == client.PROTOCOL_VERSION
+	assert request["argv"] == ["nhl", "games"]
+	assert request["cwd"] == os.getcwd()
+	assert request["columns"] > 0
+
+
+def test_socket_path_from_environment(monkeypatch):
+	monkeypatch.setenv("DAG_DAEMON_SOCKET", "/tmp/dag-test.sock")
+	assert client.get_socket_path() == "/tmp/dag-test.sock"
+
+
+def test_server_round_trip(socketpath, capsys):
+	server = daemon.DaemonServer(socketpath, idle_timeout = 5)
+	assert server.listen()
+	assert not daemon.DaemonServer(socketpath).listen() # Only one daemon per socket
+
+	def handle(conn):
+		with conn.makefile("r", encoding = "utf-8") as connfile:
+			request = next(client.read_messages(connfile), None)
+
+		if request is None: # The second listen()'s check that the socket was taken
+			return True
+
+		daemon.SocketWriter(conn).write(" ".join(request["argv"]))
+		client.send_message(conn, {"exit": 3, "cwd": request["cwd"]})
+		return False
+
+	thread = threading.Thread(target = server.serve, args = (handle,))
+	thread.start()
+
+	response = client.run_request(client.connect(socketpath), client.build_request(["echo", "hi"]))
+	thread.join()
+	server.close()
+
+	assert response == {"exit": 3, "cwd": os.getcwd()}
+	assert capsys.readouterr().out == "echo hi"
+	assert not os.path.exists(socketpath)
+
+
+def test_server_stops_when_idle(socketpath):
+	server = daemon.DaemonServer(socketpath, idle_timeout = 0.05)
+	server.listen()
+	server.serve(lambda conn: True)
+	server.close()
+
+	assert client.connect(socketpath) is None
+
+
+
+def test_launcher_flags_are_applied_per_request(monkeypatch):
+	monkeypatch.setattr(dag.debug, "DEBUG_MODE", False)
+	lines = []
+
+	instance = daemon.DagDaemonInstance.__new__(daemon.DagDaemonInstance)
+	instance.server = daemon.DaemonServer("unused")
+	instance.reloader = SimpleNamespace(is_stale = lambda: False)
+	instance.viewclass, instance.view = daemon.DagCLIView, None
+	instance.controller = SimpleNamespace(last_exception = None, run_input_line = lambda line: lines.append((line, dag.debug.DEBUG_MODE, tracemalloc.is_tracing())))
+
+	left, right = socket.socketpair()
+
+	with left, right:
+		client.send_message(left, client.build_request(["==D", "==w", "=m", "nhl", "games"]))
+		assert instance.handle_connection(right)
+		right.shutdown(socket.SHUT_WR)
+
+		messages = read_all(left)
+
+	assert lines == [("nhl games", True, True)]
+	assert messages[-1]["exit"] == 0
+	assert not dag.debug.DEBUG_MODE
+	assert not tracemalloc.is_tracing()
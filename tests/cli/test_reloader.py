@@ -0,0 +1,113 @@
+import os, sys, pytest
+
+from dag.dagcli import reloader
+from dag.dagcli.reloader import ModuleReloader
+
+
+PACKAGE = "reloadertestpkg"
+
+
+@pytest.fixture
+def package(tmp_path):
+	pkgpath = tmp_path / PACKAGE
+	pkgpath.mkdir()
+
+	(pkgpath / "__init__.py").write_text("from .base import Base, VALUE\nfrom . import child, reader\nlazy_attrs = {}\n")
+	(pkgpath / "base.py").write_text("class Base:\n\tx = 1\nVALUE = 1\n")
+	(pkgpath / "child.py").write_text(f"from {PACKAGE}.base import Base\nclass Child(Base): pass\n")
+	(pkgpath / "reader.py").write_text(f"import {PACKAGE}\ndef get():\n\treturn {PACKAGE}.Base.x\n")
+
+	sys.path.insert(0, str(tmp_path))
+	__import__(PACKAGE)
+
+	yield pkgpath
+
+	sys.path.remove(str(tmp_path))
+
+	for name in [*sys.modules]:
+		if name == PACKAGE or name.startswith(PACKAGE + "."):
+			sys.modules.pop(name)
+
+
+def edit(path, text):
+	stat = os.stat(path)
+	path.write_text(text)
+	os.utime(path, ns = (stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+
+
+def test_resolve_import():
+	assert reloader.resolve_import("dag.io.files", False, "cli", 1) == "dag.io.cli"
+	assert reloader.resolve_import("dag.io", True, "cli", 1) == "dag.io.cli"
+	assert reloader.resolve_import("dag.io.files", False, "lib", 2) == "dag.lib"
+	assert reloader.resolve_import("dag.io.files", False, "dag.lib", 0) == "dag.lib"
+
+
+def test_get_module_imports_skips_function_bodies(tmp_path):
+	path = tmp_path / "mod.py"
+	path.write_text("import a\nfrom .b import c\nif True:\n\timport d\ndef fn():\n\timport e\n")
+
+	assert reloader.get_module_imports("pkg.mod", str(path)) == {"a", "pkg.b", "pkg.b.c", "d"}
+
+
+def test_is_file_changed_ignores_touch(tmp_path):
+	path = tmp_path / "mod.py"
+	path.write_text("x = 1")
+	state = reloader.get_file_state(str(path))
+
+	os.utime(path, ns = (state.mtime_ns + 10**9, state.mtime_ns + 10**9))
+	assert not reloader.is_file_changed(str(path), state, 0)
+
+	edit(path, "x = 2")
+	assert reloader.is_file_changed(str(path), state, 0)
+
+
+
+
+def test_reload_nothing_changed(package):
+	modulereloader = ModuleReloader(package, PACKAGE)
+	modulereloader.snapshot()
+
+	assert modulereloader.reload() == []
+
+
+def test_reload_changed_module_and_importers(package):
+	modulereloader = ModuleReloader(package, PACKAGE)
+	modulereloader.snapshot()
+	root, oldreader = sys.modules[PACKAGE], sys.modules[f"{PACKAGE}.reader"]
+
+	edit(package / "base.py", "class Base:\n\tx = 2\nVALUE = 2\n")
+
+	assert sorted(modulereloader.reload()) == [f"{PACKAGE}.base", f"{PACKAGE}.child"]
+	assert sys.modules[PACKAGE] is root
+	assert sys.modules[f"{PACKAGE}.reader"] is oldreader
+	assert root.Base.x == 2 and root.VALUE == 2
+	assert sys.modules[f"{PACKAGE}.child"].Child.x == 2
+	assert oldreader.get() == 2
+
+
+def test_reload_not_incremental_purges(package, monkeypatch):
+	monkeypatch.setattr(sys.modules[PACKAGE], "settings", type("settings", (), {"incremental_reload": "False"}), raising = False)
+	modulereloader = ModuleReloader(package, PACKAGE)
+	modulereloader.snapshot()
+
+	edit(package / "base.py", "class Base:\n\tx = 2\nVALUE = 2\n")
+
+	assert modulereloader.reload() is None
+
+
+def test_is_incremental():
+	assert reloader.is_incremental(type("root", (), {}))
+	assert not reloader.is_incremental(type("root", (), {"settings": type("settings", (), {"incremental_reload": "False"})}))
+	assert not reloader.is_incremental(type("root", (), {"settings": type("settings", (), {"incremental_reload": False})}))
+
+
+def test_reload_root_change_purges(package):
+	modulereloader = ModuleReloader(package, PACKAGE)
+	modulereloader.snapshot()
+
+	edit(package / "__init__.py", "from .base import Base\n")
+
+	assert modulereloader.reload() is None
+	assert PACKAGE not in sys.modules
@@ -0,0 +1,75 @@
+import operator, re
+import pytest
+
+from dag.dagcollections.collectionindex import CollectionIndex, MISSING
+
+
+class Team:
+	def __init__(self, **kwargs):
+		self.__dict__.update(kwargs)
+
+
+class Filtable:
+	"""Compares via _dag_filt_value, like DTime"""
+
+	def __init__(self, value):
+		self.value = value
+
+	def _dag_filt_value(self, op, other):
+		return op(self.value, other)
+
+
+@pytest.fixture
+def teams():
+	return [Team(name = "mets", wins = 101), Team(name = "cubs", wins = 83), Team(name = "mets", wins = "none"), Team(wins = 83.0), Team(name = None, wins = 74)]
+
+
+def scan(teams, op, value):
+	"""How FiltArg used to filter each resource"""
+	positions = []
+
+	for i, team in enumerate(teams):
+		try:
+			if op(team.wins, value):
+				positions.append(i)
+		except (AttributeError, TypeError):
+			continue
+
+	return positions
+
+
+
+
+def test_missing_values(teams):
+	index = CollectionIndex(teams, "name")
+
+	assert index.values[3] is MISSING
+	assert index.is_plain
+
+
+def test_find_equal(teams):
+	index = CollectionIndex(teams, "name")
+
+	assert index.find(operator.eq, "mets") == [0, 2]
+	assert index.find(operator.eq, "yankees") == []
+	assert index.find(operator.ne, "mets") == [1, 4]
+	assert index.get_resources(index.find(operator.eq, "cubs")) == [teams[1]]
+
+
+@pytest.mark.parametrize("op", [operator.lt, operator.le, operator.gt, operator.ge, operator.eq, operator.ne])
+@pytest.mark.parametrize("value", [83, 83.0, 100, "m", None])
+def test_find_matches_scan(teams, op, value):
+	assert CollectionIndex(teams, "wins").find(op, value) == scan(teams, op, value)
+
+
+def test_unplain_values_are_scanned():
+	teams = [Team(date = Filtable(1)), Team(date = Filtable(5))]
+	index = CollectionIndex(teams, "date")
+
+	assert not index.is_plain
+	assert index.find(operator.gt, 2) == [1]
+
+
+def test_search(teams):
+	assert CollectionIndex(teams, "name").search("^m") == [0, 2]
+	assert CollectionIndex(teams, "name").search("NONE", re.I) == [4]
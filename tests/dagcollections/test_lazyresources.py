@@ -0,0 +1,110 @@
+import sys
+
+import pytest
+
+import dag
+from dag.dagcollections.collection import Collection
+from dag.dagcollections.lazyresources import LazyResources, ResourceIndex, get_raw_path, get_raw_value
+from dag.util import dagdebug
+
+
+class FakeCollection:
+	def __init__(self):
+		self.built = 0
+
+	def _setup_resource(self, item):
+		self.built += 1
+		return {"resource": item}
+
+
+@pytest.fixture
+def resources():
+	return LazyResources(FakeCollection(), [{"name": "a"}, {"name": "b"}, {"name": "c"}])
+
+
+
+def test_resources_are_built_on_access(resources):
+	assert len(resources) == 3
+	assert resources.total_materialized == 0
+
+	assert resources[1] == {"resource": {"name": "b"}}
+	assert resources[1] is resources[1]
+	assert resources.collection.built == 1
+
+
+def test_slices_and_iteration(resources):
+	assert resources[-2:] == [{"resource": {"name": "b"}}, {"resource": {"name": "c"}}]
+	assert len([*resources]) == 3
+	assert resources.collection.built == 3
+
+
+def test_append(resources):
+	resources.append({"resource": "d"})
+	assert resources[3] == {"resource": "d"}
+	assert resources.collection.built == 0
+
+
+def test_resource_index_only_builds_looked_up_items(resources):
+	index = ResourceIndex(resources)
+	index.set_index("a", 0)
+	index.set_index("c", 2)
+
+	assert [*index] == ["a", "c"]
+	assert index.get("c") == {"resource": {"name": "c"}}
+	assert index.get("z") is None
+	assert resources.collection.built == 1
+
+
+def test_get_raw_value():
+	assert get_raw_path("league.name") == ["league", "name"]
+	assert get_raw_path("{league.name}") is None
+	assert get_raw_value({"league": {"name": "NHL"}}, ["league", "name"]) == "NHL"
+
+	with pytest.raises(LookupError):
+		get_raw_value({"league": {"name": "NHL"}}, ["league"])
+
+	with pytest.raises(LookupError):
+		get_raw_value({"league": {}}, ["league", "name"])
+
+
+
+TEAMS = [
+	{"name": "Carolina Hurricanes", "id": 12, "league": {"name": "NHL"}},
+	{"name": "Seattle Kraken", "id": 55, "league": {"name": "NHL"}},
+	{"name": "St. Louis City", "id": "abc", "league": {"name": "MLS"}},
+	{"name": 1999, "id": 7, "league": {"name": "MLS"}},
+]
+
+
+@pytest.fixture
+def ignore_breakpoints(monkeypatch):
+	monkeypatch.setattr(sys, "breakpointhook", dagdebug.set_trace) # As the CLI does, since Resource.__init__ calls breakpoint(collection)
+	monkeypatch.setattr(dagdebug, "IGNORE_BREAKPOINTS", True)
+
+
+def build_collection(lazy, **resource_settings):
+	settings = dag.DotDict({"lazy": lazy, "label_ignore_chars": ["."], "_resource_settings": dag.DotDict(resource_settings)})
+	return Collection([dict(team) for team in TEAMS], settings)
+
+
+@pytest.mark.parametrize("resource_settings", [
+	{"label": "name", "id": "id"},
+	{"label": "league.name", "id": "id"},
+	{"label": "{id}-{name}", "id": "name"},
+	{"id": "id"},
+])
+def test_lazy_and_eager_collections_match(ignore_breakpoints, resource_settings):
+	lazy = build_collection(True, **resource_settings)
+	eager = build_collection(False, **resource_settings)
+
+	assert isinstance(lazy.resources, LazyResources)
+	assert not isinstance(eager.resources, LazyResources)
+
+	assert [r._response for r in lazy] == [r._response for r in eager]
+	assert [r._dag.label for r in lazy] == [r._dag.label for r in eager]
+	assert [r._dag.id for r in lazy] == [r._dag.id for r in eager]
+	assert lazy.ids() == eager.ids()
+
+	assert [*lazy.choicesdict] == [*eager.choicesdict]
+	assert [lazy.choicesdict.get(k)._response for k in lazy.choicesdict] == [eager.choicesdict.get(k)._response for k in eager.choicesdict]
+	assert [lazy._ids.get(k)._response for k in lazy._ids] == [eager._ids.get(k)._response for k in eager._ids]
@@ -0,0 +1,46 @@
+import pickle
+
+from dag.dagcollections import resource
+from dag.dagcollections.resource import Resource
+
+
+
+def test_resources_with_same_keys_share_a_class():
+	first = Resource({"name": "Hurricanes", "id": 12})
+	second = Resource({"name": "Kraken", "id": 55})
+	other = Resource({"title": "Hurricanes"})
+
+	assert type(first) is type(second)
+	assert type(first) is not type(other)
+	assert isinstance(first, Resource)
+	assert "name" not in vars(Resource)
+
+
+def test_keys_resolve_through_descriptors():
+	res = Resource({"name": "Hurricanes", "keys": "not the method"})
+
+	assert res.name == "Hurricanes"
+	assert res.keys == "not the method"
+	assert Resource({"name": "Kraken"}).keys() is not None
+
+
+def test_keyed_class_is_keyed_by_base():
+	keyedcls = resource.get_keyed_resource_class(Resource, ("name",))
+	assert resource.get_keyed_resource_class(keyedcls, ("name",)).__mro__[1] is Resource
+
+
+def test_pickle_roundtrip():
+	res = Resource({"name": "Hurricanes"})
+	unpickled = pickle.loads(pickle.dumps(res))
+
+	assert unpickled.name == "Hurricanes"
+	assert type(unpickled) is type(res)
+	assert unpickled._dag.resource is unpickled
+	assert unpickled._dag.collection is None
+
+
+def test_resource_info_without_state_raises_attribute_error():
+	info = resource.ResourceInfo.__new__(resource.ResourceInfo)
+
+	assert not hasattr(info, "__setstate__")
+	assert getattr(info, "label_ignore_chars", "missing") == "missing"
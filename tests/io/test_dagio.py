@@ -0,0 +1,82 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import dag
+from dag.io import dagio
+
+
+DOCUMENT = {"dates": [1, 2], "teams": ["Kraken"]}
+
+
+class MemoryCache:
+	def __init__(self):
+		self.entries = {}
+
+	def exists(self, folder, filename):
+		return (folder, filename) in self.entries
+
+	def is_fresh(self, folder, filename, ttl = None):
+		return True
+
+	def read(self, folder, filename):
+		return self.entries[folder, filename][0]
+
+	def read_meta(self, folder, filename):
+		return json.loads(json.dumps(self.entries[folder, filename][1])) # Stored as JSON, like the real cachefiles
+
+	def write(self, response, folder, filename, meta = None):
+		self.entries[folder, filename] = (response, meta or {})
+
+
+class Fetcher:
+	def __init__(self):
+		self.total = 0
+
+	def __call__(self, target):
+		self.total += 1
+		return json.dumps(DOCUMENT)
+
+
+def load_path(stream, path):
+	value = json.load(stream)
+
+	for key in path:
+		value = value[key]
+
+	return value
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+	monkeypatch.setattr(dagio, "cachefiles", MemoryCache())
+	monkeypatch.setattr(dagio, "parse_response_stream", lambda stream, path, parser: load_path(stream, path))
+	monkeypatch.setattr(dagio, "parse_response_item", lambda response, parser: json.loads(response))
+	monkeypatch.setattr(dag, "echo", lambda *args, **kwargs: None)
+	return Fetcher()
+
+
+def call(fetcher, **settings):
+	iomethod = SimpleNamespace(action = fetcher, action_name = "get", group = "")
+	parser = SimpleNamespace(supports_stream = True)
+	return dagio.IOSession(iomethod, cache = True, response_parser = parser, **settings).run_action("https://api.nhle.com", {})
+
+
+
+def test_streamed_cache_is_only_used_for_the_same_drill(fetcher):
+	assert call(fetcher, stream = True, drill = "dates") == [1, 2]
+	assert call(fetcher, stream = True, drill = "dates") == [1, 2]
+	assert fetcher.total == 1
+
+	assert call(fetcher, stream = True, drill = "teams") == ["Kraken"]
+	assert fetcher.total == 2
+
+	assert call(fetcher) == DOCUMENT
+	assert fetcher.total == 3
+
+
+def test_whole_document_cache_is_reused(fetcher):
+	assert call(fetcher) == DOCUMENT
+	assert call(fetcher) == DOCUMENT
+	assert fetcher.total == 1
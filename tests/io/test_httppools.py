@@ -0,0 +1,51 @@
+import pytest
+
+from dag.io import httppools
+
+
+@pytest.fixture
+def pools():
+	pools = httppools.HttpConnectionPools(pool_size = 4, idle_timeout = 60)
+	yield pools
+	pools.close()
+
+
+def test_get_key():
+	assert httppools.HttpConnectionPools.get_key("https://api.nhle.com/", "https://other.com/x") == "https://api.nhle.com/"
+	assert httppools.HttpConnectionPools.get_key("", "https://statsapi.mlb.com/api/v1/teams?x=1") == "https://statsapi.mlb.com"
+	assert httppools.HttpConnectionPools.get_key("", "teams") == ""
+
+
+def test_adapter_reuse(pools):
+	first = pools.get_adapter("https://api.nhle.com/")
+	second = pools.get_adapter("https://api.nhle.com/")
+	other = pools.get_adapter("https://statsapi.mlb.com/")
+
+	assert first is second
+	assert first is not other
+	assert pools.hits == 1 and pools.misses == 2
+	assert pools.hit_rate == pytest.approx(1/3)
+
+
+def test_idle_adapters_expire(pools):
+	first = pools.get_adapter("https://api.nhle.com/")
+	first.last_used -= 120
+
+	assert pools.get_adapter("https://api.nhle.com/") is not first
+	assert pools.expired == 1
+
+
+def test_mount_unmount_keeps_pool_open(pools):
+	import requests
+
+	session = requests.session()
+	prefixes = pools.mount(session, "https://api.nhle.com/")
+	adapter = pools.adapters["https://api.nhle.com/"].adapter
+
+	assert session.get_adapter("https://api.nhle.com/v1") is adapter
+
+	pools.unmount(session, prefixes)
+	session.close()
+
+	assert "https://" not in session.adapters
+	assert pools.stats["pools"]["https://api.nhle.com/"]["uses"] == 1
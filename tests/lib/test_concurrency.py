@@ -13,6 +13,11 @@ def mtm():
 	return concurrency.multithread_map
 
 
+@pytest.fixture
+def am():
+	return concurrency.async_map
+
+
 def retval(val, plus = 0):
 	return val + plus
 
@@ -32,4 +37,85 @@ def test_multithread_map(mtm):
 	assert mtm(retval, range(1,6)) == [1,2,3,4,5]
 
 	assert mtm(retval, [1,2,3,4,5], 1) == [2,3,4,5,6]
-	assert mtm(retval, range(1,6), 1.5) == [2.5,3.5,4.5,5.5,6.5]
\ No newline at end of file
+	assert mtm(retval, range(1,6), 1.5) == [2.5,3.5,4.5,5.5,6.5]
+
+
+def test_async_map(am):
+	assert am(retval, [1,2,3,4,5]) == [1,2,3,4,5]
+	assert am(retval, [1,2,3,4,5], 1) == [2,3,4,5,6]
+	assert am(retval, ["d", "a", "g"], ".") == ["d.", "a.", "g."]
+	assert am(retval, [7]) == [7]
+	assert am(retval, []) == []
+
+
+def test_async_map_imports_asyncio_lazily():
+	import os, subprocess, sys
+	code = "import sys; from dag.lib import concurrency; print('asyncio' in sys.modules)"
+	env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+
+	assert subprocess.run([sys.executable, "-c", code], capture_output = True, text = True, env = env).stdout.strip() == "False"
+
+
+def test_async_map_preserves_order(am):
+	def sleepret(val):
+		time.sleep(0.01 * (5 - val))
+		return val
+
+	assert am(sleepret, [1,2,3,4,5], groupfn = lambda val: val % 2, group_limit = 2) == [1,2,3,4,5]
+
+
+@pytest.fixture(params = ["process", "thread"])
+def workerpool(request):
+	pool = concurrency.WorkerPool(request.param, size = 2)
+	yield pool
+	pool.close()
+
+
+def test_workerpool_is_reused(workerpool):
+	assert workerpool.map(retval, [1,2,3], 1) == [2,3,4]
+	pool = workerpool.pool
+
+	assert workerpool.map(retval, [1,2,3,4,5,6], 2, chunksize = 2) == [3,4,5,6,7,8]
+	assert workerpool.pool is pool
+
+
+def test_workerpool_survives_imports(workerpool):
+	workerpool.map(retval, [1,2])
+	pool = workerpool.pool
+
+	import dag.lib.asttools
+
+	assert workerpool.map(retval, [1,2]) == [1,2]
+	assert workerpool.pool is pool
+
+
+def test_workerpools_dont_share_pools():
+	first, second = concurrency.WorkerPool("process", size = 2), concurrency.WorkerPool("process", size = 2)
+	first.map(retval, [1,2])
+	second.map(retval, [1,2])
+
+	assert first.pool._serve() is not second.pool._serve() # PATHOS hands out the same underlying pool for the same id
+
+	first.close()
+	assert second.map(retval, [1,2,3], 1) == [2,3,4]
+	second.close()
+
+
+def test_workerpool_timeout():
+	pool = concurrency.WorkerPool("thread", size = 2)
+
+	with pytest.raises(TimeoutError):
+		pool.map(time.sleep, [0, 2], timeout = 0.2)
+
+	assert pool.pool is None
+	assert pool.map(retval, [1,2]) == [1,2]
+	pool.close()
+
+
+def test_workerpools_configure():
+	pools = concurrency.WorkerPools()
+	pools.thread.map(retval, [1,2])
+	pools.configure(process_size = 2, thread_size = 3)
+
+	assert pools.thread.pool is None and pools.thread.size == 3
+	pools.close()
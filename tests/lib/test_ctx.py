@@ -46,3 +46,27 @@ def test_ctx_manager_replacements(cx):
 			assert cx.testvar == testval2
 
 		assert cx.testvar == testval
+
+
+
+def test_use_snapshot_is_per_thread():
+	import threading
+
+	cx = ctxmanagers.Context()
+	seen = {}
+
+	with cx(shared = 1):
+		snapshot = cx.snapshot()
+
+		def work(i):
+			with cx.use_snapshot(snapshot), cx(own = i):
+				seen[i] = (cx.shared, cx.own)
+
+		threads = [threading.Thread(target = work, args = (i,)) for i in range(4)]
+		[thread.start() for thread in threads]
+		[thread.join() for thread in threads]
+
+		assert cx.own is None
+
+	assert seen == {i: (1, i) for i in range(4)}
+	assert cx.shared is None
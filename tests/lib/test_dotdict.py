@@ -86,3 +86,54 @@ def test_mapping_ror(dd):
 	assert dd3.hello == "goodbye"
 	assert dd3.NEWKEY == "NEWVAL"
 	assert dd3.float == 3.3
+
+def test_shared_copies_on_write():
+	di = {"hello": "goodbye"}
+	dd3 = dot.shared_dotdict(dot.DotDict, di)
+	dd3.hello = "hi"
+
+	assert dd3.hello == "hi"
+	assert di["hello"] == "goodbye"
+
+def test_shared_key_isnt_hidden():
+	dd3 = dot.DotDict({"shared": 1})
+	assert dd3.shared == 1
+
+def test_version_bumps_on_change(dd):
+	version = dd._dag_version
+	dd.TEST = "TESTVAL"
+	del dd["TEST"]
+
+	assert dd._dag_version == version + 2
+
+def test_merge_cache_matches_or(dd, dd2):
+	cache = dot.MergeCache()
+
+	assert dict(cache.get(dd, dd2)) == dict(dd | dd2)
+	assert type(cache.get(dd, dd2)) is type(dd | dd2)
+
+def test_merge_cache_reuses_merge(dd, dd2):
+	cache = dot.MergeCache()
+
+	assert cache.get(dd, dd2)._dict is cache.get(dd, dd2)._dict
+
+def test_merge_cache_remerges_on_change(dd, dd2):
+	cache = dot.MergeCache()
+	cache.get(dd, dd2)
+	dd2.hello = "hi"
+
+	assert cache.get(dd, dd2).hello == "hi"
+
+def test_merge_cache_remerges_on_new_layer(dd, dd2):
+	cache = dot.MergeCache()
+	cache.get(dd, dd2)
+
+	assert cache.get(dd, dot.DotDict({"hello": "hi"})).hello == "hi"
+
+def test_merge_cache_result_changes_stay_local(dd, dd2):
+	cache = dot.MergeCache()
+	merged = cache.get(dd, dd2)
+	merged.hello = "hi"
+
+	assert cache.get(dd, dd2).hello == "goodbye"
+	assert dd.hello == "goodbye"
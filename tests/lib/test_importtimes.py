@@ -0,0 +1,24 @@
+from dag.lib import importtimes
+
+
+OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       240 |        240 |   _io
+import time:      1500 |       1500 |     dag.lib.dot
+import time:      2000 |       5500 | dag
+"""
+
+
+def test_parse():
+	times = importtimes.parse(OUTPUT)
+
+	assert [t.module for t in times] == ["_io", "dag.lib.dot", "dag"]
+	assert times[1].self_ms == 1.5
+	assert times[1].depth == 2
+	assert importtimes.get_total_ms(times, "dag") == 5.5
+
+
+def test_report():
+	report = importtimes.report(importtimes.parse(OUTPUT), prefix = "dag")
+
+	assert report.splitlines()[1].endswith(" dag")
+	assert "_io" not in report
@@ -0,0 +1,60 @@
+import pytest
+from dag.lib.lrucache import LRUCache
+
+
+
+@pytest.fixture
+def cache():
+	return LRUCache(max_entries = 3, max_bytes = 100)
+
+
+
+def test_get_counts_hits_and_misses(cache):
+	cache.put("a", 1)
+
+	assert cache.get("a") == 1
+	assert cache.get("b") is None
+	assert cache.stats["hits"] == 1
+	assert cache.stats["misses"] == 1
+
+
+def test_evicts_least_recently_used_entry(cache):
+	cache.put("a", 1)
+	cache.put("b", 2)
+	cache.put("c", 3)
+	cache.get("a")
+	cache.put("d", 4)
+
+	assert "b" not in cache
+	assert "a" in cache
+	assert cache.stats["evictions"] == 1
+
+
+def test_evicts_by_bytes(cache):
+	cache.put("a", 1, size = 60)
+	cache.put("b", 2, size = 60)
+
+	assert "a" not in cache
+	assert cache.bytes == 60
+
+
+def test_oversized_values_arent_stored(cache):
+	cache.put("a", 1, size = 101)
+	assert "a" not in cache
+
+
+def test_replacing_a_key_updates_bytes(cache):
+	cache.put("a", 1, size = 40)
+	cache.put("a", 2, size = 10)
+
+	assert cache.get("a") == 2
+	assert cache.bytes == 10
+
+
+def test_invalidate(cache):
+	cache.put(("apps/one", "x"), 1, size = 5)
+	cache.put(("apps/two", "x"), 2, size = 5)
+
+	assert cache.invalidate(lambda key: key[0] == "apps/one") == 1
+	assert len(cache) == 1
+	assert cache.bytes == 5
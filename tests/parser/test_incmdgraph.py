@@ -0,0 +1,52 @@
+import pytest
+
+from dag.parser import Token, incmdgraph
+from dag.parser.commalists import CommaList
+from dag.parser.incmds import InputCommandBuilder
+
+
+def builders(*specs):
+	return [InputCommandBuilder(text.split(), terminus) for text, terminus in specs]
+
+
+def texts(unit):
+	return [" ".join(incmdbuilder.tokens) for incmdbuilder in unit]
+
+
+
+def test_split_units():
+	incmdbuilders = builders(("nhl games", Token.PIPE), ("grep sea", Token.SEMICOLON), ("weather", Token.AND_IF), ("mlb games", Token.OR_IF), ("echo no", None))
+	units = incmdgraph.split_units(incmdbuilders)
+
+	assert [texts(unit) for unit in units] == [["nhl games", "grep sea"], ["weather", "mlb games", "echo no"]]
+
+
+def test_split_units_double_semicolon():
+	units = incmdgraph.split_units(builders(("nhl games", Token.DOUBLE_SEMICOLON), ("mlb games", Token.SEMICOLON)))
+	assert [texts(unit) for unit in units] == [["nhl games"], ["mlb games"]]
+
+
+def test_yield_tokens_expands_commalists():
+	commalist = CommaList()
+	commalist.extend(["1", "2"])
+
+	assert [*incmdgraph.yield_tokens(InputCommandBuilder(["nhl", "boxscore", commalist]))] == ["nhl", "boxscore", "1", "2"]
+
+
+def test_is_subinstance_token():
+	assert incmdgraph.is_subinstance_token("(last)")
+	assert not incmdgraph.is_subinstance_token("last")
+	assert not incmdgraph.is_subinstance_token("(last")
+
+
+def test_schedule_gives_dependent_units_their_own_batch(monkeypatch):
+	monkeypatch.setattr(incmdgraph, "is_independent", lambda unit: texts(unit) != [">"])
+
+	units = incmdgraph.split_units(builders(("nhl games", None), ("mlb games", None), (">", None), ("weather", None), ("news", None)))
+	batches = incmdgraph.schedule(units)
+
+	assert [[texts(unit) for unit in batch] for batch in batches] == [[["nhl games"], ["mlb games"]], [[">"]], [["weather"], ["news"]]]
+
+
+def test_subinstance_units_are_dependent():
+	assert not incmdgraph.is_independent(builders(("echo (last)", None)))
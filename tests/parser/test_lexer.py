@@ -0,0 +1,51 @@
+import pytest
+
+from dag.parser.lexer import DagLexer, IncrementalDagLexer
+
+
+def as_values(tokens):
+	return [getattr(token, "value", token) for token in tokens]
+
+
+EDITS = [
+	"nhl",
+	"nhl ",
+	"nhl teams",
+	"nhl teams | grep",
+	"nhl teams | grep 'sea",
+	"nhl teams | grep 'seattle'",
+	"nhl teams | grep 'seattle' ; echo \\|done",
+	"nhl teams | grep 'seattle' ; echo \\|don",
+	"nhl teams | grep",
+	"nhl (a, b) >> out",
+	"",
+]
+
+
+def test_incremental_matches_full_lex():
+	lexer = IncrementalDagLexer()
+
+	for line in EDITS:
+		assert as_values(lexer.lex(line)) == as_values(DagLexer().lex(line)), line
+
+
+@pytest.mark.parametrize("line", EDITS)
+def test_typing_one_char_at_a_time(line):
+	lexer = IncrementalDagLexer()
+
+	for i in range(len(line) + 1):
+		assert as_values(lexer.lex(line[:i])) == as_values(DagLexer().lex(line[:i]))
+
+	for i in range(len(line), -1, -1):
+		assert as_values(lexer.lex(line[:i])) == as_values(DagLexer().lex(line[:i]))
+
+
+def test_returned_tokens_arent_changed_by_later_lexes():
+	lexer = IncrementalDagLexer()
+	tokens = lexer.lex("nhl teams |")
+	values = as_values(tokens)
+
+	lexer.lex("nhl teams | grep sea")
+	lexer.lex("nhl")
+
+	assert as_values(tokens) == values
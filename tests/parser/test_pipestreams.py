@@ -0,0 +1,98 @@
+import threading, time
+
+import pytest
+
+import dag
+from dag.parser.pipestreams import PipeStream, is_streamable
+
+
+class Producer:
+	def __init__(self, total = 100):
+		self.total = total
+		self.produced = []
+		self.closed = False
+
+	def generate(self):
+		try:
+			for i in range(self.total):
+				self.produced.append(i)
+				yield i
+		finally:
+			self.closed = True
+
+
+
+def test_is_streamable():
+	assert is_streamable(i for i in range(3))
+	assert is_streamable(PipeStream([1, 2]))
+	assert not is_streamable([1, 2])
+	assert not is_streamable("abc")
+
+
+def test_only_produces_on_request():
+	producer = Producer()
+	stream = PipeStream(producer.generate())
+
+	assert producer.produced == []
+	assert next(stream) == 0
+	assert next(stream) == 1
+	assert producer.produced == [0, 1]
+
+
+def test_take_stops_producer():
+	producer = Producer()
+	stream = PipeStream(producer.generate())
+
+	assert stream.take(3) == [0, 1, 2]
+	assert producer.produced == [0, 1, 2]
+	assert producer.closed
+	assert [*stream] == []
+
+
+def test_materialize():
+	producer = Producer(5)
+	assert PipeStream(producer.generate()).materialize() == [0, 1, 2, 3, 4]
+	assert producer.closed
+
+
+def test_steps_run_in_ctxvars():
+	def generate():
+		for i in range(2):
+			yield dag.ctx.pipestream_testvar
+
+	stream = PipeStream(generate(), {"pipestream_testvar": "upstream"})
+
+	assert stream.materialize() == ["upstream", "upstream"]
+	assert dag.ctx.pipestream_testvar is None
+
+
+def test_buffered_stream_applies_backpressure():
+	producer = Producer()
+	stream = PipeStream(producer.generate(), buffersize = 3)
+
+	assert next(stream) == 0
+	time.sleep(0.2)
+
+	# One item taken, three waiting in the buffer, and one being put
+	assert len(producer.produced) <= 5
+
+	stream.close()
+	assert producer.closed
+	assert not stream.producer.is_alive()
+
+
+def test_buffered_stream_yields_everything_in_order():
+	assert PipeStream(Producer(50).generate(), buffersize = 4).materialize() == [*range(50)]
+
+
+def test_buffered_stream_reraises_producer_errors():
+	def generate():
+		yield 1
+		raise ValueError("failed upstream")
+
+	stream = PipeStream(generate(), buffersize = 2)
+
+	assert next(stream) == 1
+
+	with pytest.raises(ValueError):
+		next(stream)
@@ -0,0 +1,113 @@
+import os
+import pytest
+
+import dag
+from dag import appmanager
+from dag.appmanager import AppManager, FILEPATH, LASTMODIFIED
+
+
+def touch(path, text):
+	mtime_ns = path.stat().st_mtime_ns if path.exists() else 0
+	path.write_text(text)
+	os.utime(path, ns = (mtime_ns + 10**9, mtime_ns + 10**9))
+
+
+@pytest.fixture
+def appdir(tmp_path, monkeypatch):
+	appdir = tmp_path / "apps"
+	appdir.mkdir()
+	touch(appdir / "nhl.py", "nhl = 1\n")
+
+	pathinfo = tmp_path / "pathinfo"
+	pathinfo.write_text(f"{appdir}\n")
+	monkeypatch.setattr(dag, "PATHINFO_PATH", pathinfo)
+
+	return appdir
+
+
+@pytest.fixture
+def manager(appdir, monkeypatch):
+	"""An AppManager over appdir that records whether it rescanned, instead of importing app files"""
+	manager = AppManager.__new__(AppManager)
+	manager.appinfo = {"nhl": {FILEPATH: str(appdir / "nhl.py"), LASTMODIFIED: os.path.getmtime(appdir / "nhl.py")}}
+	manager.regexcmds = []
+	manager.fingerprint = manager.get_fingerprint()
+	manager.rescans = 0
+	manager.written_fingerprints = []
+
+	def rescan():
+		manager.rescans += 1
+		manager.write_appinfo(manager.appinfo) # Like register() does
+
+	monkeypatch.setattr(manager, "check_pathinfo_for_new_files", rescan)
+	monkeypatch.setattr(manager, "remove_deleted_pathfiles", lambda: None)
+	monkeypatch.setattr(manager, "reregister_updated_pathfiles", lambda: None)
+	monkeypatch.setattr(manager, "write_appinfo", lambda appinfo: manager.written_fingerprints.append(manager.fingerprint))
+
+	return manager
+
+
+
+def test_unchanged_files_skip_rescan(manager):
+	manager.initialize_session()
+	assert manager.rescans == 0
+
+
+def test_file_edited_in_place_is_rescanned(manager, appdir):
+	touch(appdir / "nhl.py", "nhl = 1\nmlb = 2\n")
+
+	manager.initialize_session()
+	assert manager.rescans == 1
+
+	manager.initialize_session()
+	assert manager.rescans == 1
+
+
+def test_new_file_is_rescanned(manager, appdir):
+	touch(appdir / "mlb.py", "mlb = 1\n")
+
+	manager.initialize_session()
+	assert manager.rescans == 1
+
+
+def test_deleted_file_is_rescanned(manager, appdir):
+	(appdir / "nhl.py").unlink()
+
+	manager.initialize_session()
+	assert manager.rescans == 1
+
+
+def test_pathinfo_edit_is_rescanned(manager, tmp_path):
+	otherdir = tmp_path / "otherapps"
+	otherdir.mkdir()
+	dag.PATHINFO_PATH.write_text(dag.PATHINFO_PATH.read_text() + f"{otherdir}\n")
+
+	manager.initialize_session()
+	assert manager.rescans == 1
+
+
+def test_reading_pathinfo_doesnt_change_the_fingerprint(manager, appdir):
+	mtime_ns = dag.PATHINFO_PATH.stat().st_mtime_ns
+	fingerprint = manager.get_fingerprint()
+
+	assert appmanager.read_pathinfo() == [str(appdir)]
+	assert manager.get_fingerprint() == fingerprint
+	assert dag.PATHINFO_PATH.stat().st_mtime_ns == mtime_ns
+
+
+def test_rescan_writes_the_new_fingerprint(manager, appdir):
+	touch(appdir / "mlb.py", "mlb = 1\n")
+	fingerprint = manager.get_fingerprint()
+
+	manager.initialize_session()
+	assert manager.written_fingerprints == [fingerprint, fingerprint]
+
+
+def test_edited_file_is_reregistered(manager, appdir, monkeypatch):
+	registered = []
+	monkeypatch.setattr(manager, "register", lambda filepath, updating = False, add_to_sys = False: registered.append((filepath.name, updating)))
+
+	touch(appdir / "nhl.py", "nhl = 2\n")
+	AppManager.reregister_updated_pathfiles(manager)
+
+	assert registered == [("nhl.py", True)]
@@ -0,0 +1,47 @@
+import pytest
+
+from dag import cachefiles
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+	cache = cachefiles.DagCmdExCtxPersistenceFile(tmp_path)
+	monkeypatch.setattr(cache, "read_bytes", counted(cache.read_bytes))
+	return cache
+
+
+def counted(fn):
+	def wrapper(*args, **kwargs):
+		wrapper.total += 1
+		return fn(*args, **kwargs)
+
+	wrapper.total = 0
+	return wrapper
+
+
+
+def test_reads_come_from_memory(cache):
+	cache.write({"teams": ["Kraken"]}, "nhl", "teams")
+
+	assert cache.read("nhl", "teams") == {"teams": ["Kraken"]}
+	assert cache.read("nhl", "teams") == {"teams": ["Kraken"]}
+	assert cache.read_bytes.total == 1
+
+
+def test_mutating_a_read_doesnt_change_later_reads(cache):
+	cache.write({"teams": ["Kraken", "Bruins"]}, "nhl", "teams")
+
+	response = cache.read("nhl", "teams")
+	response["teams"].sort()
+	response["new"] = True
+
+	assert cache.read("nhl", "teams") == {"teams": ["Kraken", "Bruins"]}
+	assert cache.read("nhl", "teams") is not cache.read("nhl", "teams")
+
+
+def test_write_replaces_memory(cache):
+	cache.write([1], "nhl", "teams")
+	cache.read("nhl", "teams")
+	cache.write([2], "nhl", "teams")
+
+	assert cache.read("nhl", "teams") == [2]
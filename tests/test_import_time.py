@@ -0,0 +1,50 @@
+import os, statistics
+import pytest
+
+import dag
+from dag.lib import importtimes
+
+
+BASELINE_SRC = os.environ.get("DAG_IMPORT_BASELINE") # The src directory of a checkout to compare against (e.g.: a "git worktree" of main)
+RUNS = 7
+TOLERANCE = 1.1 # Cold imports vary by about this much between runs, even on an idle machine
+
+
+def get_total_ms(src) -> float:
+	return importtimes.get_total_ms(importtimes.measure("dag", paths = [str(src)]), "dag")
+
+
+
+@pytest.mark.skipif(not BASELINE_SRC, reason = "Slow and timing-dependent: Set DAG_IMPORT_BASELINE to a baseline checkout's src directory to run")
+def test_cold_start_import_time_is_no_slower_than_baseline():
+	current, baseline = [], []
+
+	for i in range(RUNS): # Interleaved, so that changes in machine load affect both alike
+		current.append(get_total_ms(dag.SRC_PATH))
+		baseline.append(get_total_ms(BASELINE_SRC))
+
+	current, baseline = statistics.median(current), statistics.median(baseline)
+	report = importtimes.report(importtimes.measure("dag", paths = [str(dag.SRC_PATH)]), prefix = "dag")
+
+	assert current <= baseline * TOLERANCE, f"import dag took {current:.1f} ms (baseline: {baseline:.1f} ms)\n" + report
+
+
+def test_lazy_attrs_arent_imported_until_accessed():
+	times = importtimes.measure("dag", paths = [str(dag.SRC_PATH)])
+	imported = {t.module for t in times}
+
+	assert "dag.util.dagbrowser" not in imported
+	assert "PIL" not in imported
+	assert "asyncio" not in imported # Only async_map needs it
+	assert "dag.io.images" not in imported # Registered as arg annotations by name, so dagargs doesn't import them
+	assert "dag.util.searchers" not in imported
+	assert dag.Browser is dag.util.dagbrowser.DagBrowser
+
+
+def test_caching_and_completion_internals_are_imported_on_use():
+	imported = {t.module for t in importtimes.measure("dag", paths = [str(dag.SRC_PATH)])}
+
+	assert "sqlite3" not in imported
+	assert "dag.util.cachecodecs" not in imported
+	assert "dag.io.httppools" not in imported
+	assert "dag.dagcli.completionindex" not in imported
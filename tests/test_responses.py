@@ -0,0 +1,30 @@
+import io, json
+import pytest
+
+import dag
+from dag.responses import DagResponse, JsonParser
+from dag.util import jsonstream
+
+
+DOCUMENT = {"dates": [{"games": [{"id": 1, "score": 1.5}]}], "teams": {"sea": "Kraken"}, "empty": None}
+
+
+def parse_both_ways(drill):
+	whole = dag.drill(JsonParser().parse(json.dumps(DOCUMENT)), drill)
+	streamed = JsonParser().parse_stream(io.BytesIO(json.dumps(DOCUMENT).encode()), jsonstream.get_stream_path(drill))
+	return whole, streamed
+
+
+
+@pytest.mark.parametrize("with_ijson", [True, False])
+@pytest.mark.parametrize("drill", ["dates[0].games[0].score", "dates[0].games[0].id", "teams.sea", "empty", "dates", "dates[0].games[0]", "teams"])
+def test_streamed_drill_matches_whole_document_drill(drill, with_ijson, monkeypatch):
+	if with_ijson:
+		pytest.importorskip("ijson")
+	else:
+		monkeypatch.setattr(jsonstream, "get_ijson", lambda: None)
+
+	whole, streamed = parse_both_ways(drill)
+
+	assert type(streamed) is type(whole)
+	assert (streamed._data if isinstance(streamed, DagResponse) else streamed) == (whole._data if isinstance(whole, DagResponse) else whole)
@@ -0,0 +1,65 @@
+import pytest
+
+from dag import settings
+
+
+@pytest.fixture
+def configfile(tmp_path, monkeypatch):
+	configfile = tmp_path / "dag.ini"
+	monkeypatch.setattr(settings, "CONFIGFILE", configfile)
+	return configfile
+
+
+def use_config(monkeypatch):
+	monkeypatch.setattr(settings, "conf_settings", settings.load_config())
+
+
+
+def test_to_bool():
+	assert settings.to_bool("False") is False
+	assert settings.to_bool("no") is False
+	assert settings.to_bool("1") is True
+	assert settings.to_bool(" TRUE ") is True
+	assert settings.to_bool(0) is False
+
+	with pytest.raises(ValueError):
+		settings.to_bool("sometimes")
+
+
+def test_bool_defaults_read_back_from_dag_ini(configfile, monkeypatch):
+	settings.reset_config()
+	assert "concurrent_expansions = False" in configfile.read_text()
+
+	use_config(monkeypatch)
+
+	assert settings.conf_settings.concurrent_expansions is False
+	assert settings.get("concurrent_expansions") is False
+	assert settings.get("incremental_reload") is True
+
+
+def test_concurrent_command_lists_are_opt_in(configfile, monkeypatch):
+	settings.reset_config()
+	use_config(monkeypatch)
+
+	assert settings.get("concurrent_command_lists") is False
+
+	configfile.write_text("[concurrency]\nconcurrent_command_lists = True\n")
+	use_config(monkeypatch)
+
+	assert settings.get("concurrent_command_lists") is True
+
+
+def test_dag_ini_bools_override_defaults(configfile, monkeypatch):
+	configfile.write_text("[dev]\nincremental_reload = False\n\n[concurrency]\nconcurrent_expansions = yes\n")
+	use_config(monkeypatch)
+
+	assert settings.get("incremental_reload") is False
+	assert settings.get("concurrent_expansions") is True
+
+
+def test_environment_bools_are_parsed(configfile, monkeypatch):
+	settings.reset_config()
+	use_config(monkeypatch)
+	monkeypatch.setenv("DAG_INCREMENTAL_RELOAD", "false")
+
+	assert settings.get("incremental_reload") is False
@@ -0,0 +1,71 @@
+import gzip, zlib
+import dill, pytest
+
+from dag.util import cachecodecs
+
+
+def codecname(data):
+	return data[len(cachecodecs.MAGIC):].split(cachecodecs.HEADER_END)[0].decode().split(":")[0]
+
+
+def test_is_jsonable():
+	assert cachecodecs.is_jsonable({"a": [1, 2.5, "b", None, True, {"c": []}]})
+	assert not cachecodecs.is_jsonable({1: "a"})
+	assert not cachecodecs.is_jsonable((1, 2))
+	assert not cachecodecs.is_jsonable({"a": {1, 2}})
+
+
+@pytest.mark.parametrize("item", [{"games": [{"id": 1, "teams": ["a", "b"]}]}, ["choice1", "choice2"], "text", 5, None])
+def test_json_roundtrip(item):
+	data = cachecodecs.dumps(item)
+
+	assert codecname(data) in ("msgpack", "pickle")
+	assert cachecodecs.loads(data) == item
+
+	data = cachecodecs.dumps(item, codec = "json")
+
+	assert codecname(data) == "json"
+	assert cachecodecs.loads(data) == item
+
+
+def test_dagresponse_roundtrip():
+	import dag
+	response = dag.Response({"teams": [{"name": "Hurricanes"}]})
+
+	for codec in ["json", None]:
+		data = cachecodecs.dumps(response, codec = codec)
+		loaded = cachecodecs.loads(data)
+
+		assert type(loaded) is type(response)
+		assert loaded._data == response._data
+
+
+def test_fallback_codecs():
+	assert codecname(cachecodecs.dumps((1, 2), codec = "json")) != "json"
+	assert cachecodecs.loads(cachecodecs.dumps((1, 2), codec = "json")) == (1, 2)
+
+	fn = lambda x: x + 1
+	data = cachecodecs.dumps(fn)
+
+	assert codecname(data) == "dill"
+	assert cachecodecs.loads(data)(1) == 2
+
+
+def test_compressors():
+	for compression in ["none", "zlib", "notacompressor"]:
+		data = cachecodecs.dumps({"a": "b" * 100}, compression = compression)
+		assert cachecodecs.loads(data) == {"a": "b" * 100}
+
+	assert cachecodecs.get_compressor("notacompressor").name == "zlib"
+
+
+def test_decompress():
+	codec, version, payload = cachecodecs.decompress(cachecodecs.dumps(("a", 1)))
+
+	assert codec is cachecodecs.registered_codecs["pickle"]
+	assert codec.decode(payload, version) == ("a", 1)
+
+
+def test_legacy_caches():
+	assert cachecodecs.loads(gzip.compress(dill.dumps({"old": 1}))) == {"old": 1}
+	assert cachecodecs.loads(zlib.compress(dill.dumps({"old": 2}))) == {"old": 2}
@@ -126,4 +126,27 @@ def test_drill():
 def test_drill_for_properties():
 	assert drill.drill_for_properties(tc2, "") == []
 	assert set(drill.drill_for_properties(tc2, "tc.te")) == set([f"tc.{k}" for k in (vars(tc) | vars(tc.__class__)).keys() if not k.startswith("_")])
-	assert set(drill.drill_for_properties(tc2, "tc.testlist.")) == set([f"tc.testlist.{k}" for k in vars(tc.testlist.__class__).keys()  if not k.startswith("_")])
\ No newline at end of file
+	assert set(drill.drill_for_properties(tc2, "tc.testlist.")) == set([f"tc.testlist.{k}" for k in vars(tc.testlist.__class__).keys()  if not k.startswith("_")])
+
+
+def test_compile_drill_is_cached():
+	compiled = drill.compile_drill("testdict[brown][beef]")
+
+	assert drill.compile_drill("testdict[brown][beef]") is compiled
+	assert compiled(tc) == tc.testdict["brown"]["beef"]
+	assert drill.compile_drill("testlist[0]", drill_until = -1)(tc) == tc.testlist
+
+
+def test_compile_drill_rejects_fn_args():
+	with pytest.raises(drill.DagDrillError):
+		drill.compile_drill("[2].__getitem__(1)")
+
+
+def test_drill_all():
+	items = [{"name": "a"}, {"name": "b"}, {}]
+
+	assert drill.drill_all(items, "[name]", default = None) == ["a", "b", None]
+	assert drill.drill_all([tc, tc2.tc], "testlist[1].lower()") == ["b", "b"]
+
+	with pytest.raises(drill.DagDrillError):
+		drill.drill_all([tc, tc2], "teststr")
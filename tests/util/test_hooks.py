@@ -0,0 +1,49 @@
+import pytest
+
+from dag.util import hooks
+from dag.util.hooks import HooksAPI
+
+
+@pytest.fixture
+def settings():
+	return {"name": "hooktest"} # Non-empty: HooksContainer falls back to the active dagcmd's settings if these are falsy
+
+
+@pytest.fixture
+def hooksapi(settings):
+	return HooksAPI(parentsettings = settings)
+
+
+
+def test_hook_without_listeners_is_skipped(hooksapi):
+	assert "test_unregistered" not in hooks.listener_counts
+	assert hooksapi.do("test_unregistered", 1) is None
+
+
+def test_listener_counts(hooksapi, settings):
+	hookid = hooksapi.add("test_counted", lambda x: x)
+	hookid2 = hooksapi.add("test_counted", lambda x: x)
+	assert hooks.listener_counts["test_counted"] == 2
+
+	hooksapi.hooks.remove_hook("test_counted", hookid)
+	hooksapi.hooks.remove_hook("test_counted", hookid)
+	assert hooks.listener_counts["test_counted"] == 1
+
+	hooksapi.hooks.remove_hook("test_counted", hookid2)
+	assert "test_counted" not in hooks.listener_counts
+
+
+def test_context_manager_unregisters(hooksapi):
+	with hooksapi(test_scoped = lambda: None):
+		assert "test_scoped" in hooks.listener_counts
+
+	assert "test_scoped" not in hooks.listener_counts
+
+
+def test_hook_signature():
+	def fn(a, b): pass
+	def method(self, a): pass
+
+	assert hooks.get_hook_signature(fn) == (2, False)
+	assert hooks.get_hook_signature(method) == (2, True)
+	assert fn in hooks.hook_signatures
@@ -0,0 +1,85 @@
+import io, json
+import pytest
+
+from dag.util import jsonstream
+from dag.util.drill import DagDrillError
+
+
+SCHEDULE = {"copyright": "NHL", "dates": [{"date": "2023-10-10", "games": [{"id": 1}, {"id": 2, "teams": {"home": "CAR"}}]}, {"date": "2023-10-11", "games": [{"id": 3}]}]}
+
+
+
+def iter_events(item):
+	"""Emits the same events as ijson.basic_parse, so the walker can be tested without ijson installed"""
+	if isinstance(item, dict):
+		yield "start_map", None
+
+		for key, value in item.items():
+			yield "map_key", key
+			yield from iter_events(value)
+
+		yield "end_map", None
+	elif isinstance(item, list):
+		yield "start_array", None
+
+		for value in item:
+			yield from iter_events(value)
+
+		yield "end_array", None
+	else:
+		yield "string" if isinstance(item, str) else "number", item
+
+
+
+def test_get_stream_path():
+	assert jsonstream.get_stream_path("dates[0].games") == ["dates", 0, "games"]
+	assert jsonstream.get_stream_path("dates['0']") == ["dates", "0"]
+	assert jsonstream.get_stream_path("dates[1:2]") is None
+	assert jsonstream.get_stream_path("dates.keys()") is None
+	assert jsonstream.get_stream_path(None) is None
+
+
+def test_iter_path_events_builds_only_the_path():
+	assert [*jsonstream.iter_path_events(iter_events(SCHEDULE), ["dates", 0, "games"])] == [SCHEDULE["dates"][0]["games"]]
+	assert [*jsonstream.iter_path_events(iter_events(SCHEDULE), ["dates", 1, "date"])] == ["2023-10-11"]
+	assert [*jsonstream.iter_path_events(iter_events(SCHEDULE), [])] == [SCHEDULE]
+
+
+def test_iter_path_events_lazy():
+	assert [*jsonstream.iter_path_events(iter_events(SCHEDULE), ["dates", 0, "games"], lazy = True)] == SCHEDULE["dates"][0]["games"]
+
+
+def test_iter_path_events_stops_reading_after_match():
+	events = iter_events(SCHEDULE)
+	[*jsonstream.iter_path_events(events, ["dates", 0, "date"])]
+
+	assert next(events) == ("map_key", "games")
+
+
+def test_iter_path_events_missing_path():
+	with pytest.raises(DagDrillError):
+		[*jsonstream.iter_path_events(iter_events(SCHEDULE), ["dates", 5])]
+
+
+def test_load_path():
+	stream = io.BytesIO(json.dumps(SCHEDULE).encode())
+	assert jsonstream.load_path(stream, ["dates", 0, "games", 1, "teams"]) == {"home": "CAR"}
+
+
+def test_load_path_without_ijson(monkeypatch):
+	monkeypatch.setattr(jsonstream, "get_ijson", lambda: None)
+	stream = io.BytesIO(json.dumps(SCHEDULE).encode())
+
+	assert jsonstream.load_path(stream, ["dates", 0, "games", 1, "teams"]) == {"home": "CAR"}
+
+
+def test_fake_events_match_ijson():
+	ijson = pytest.importorskip("ijson")
+	stream = io.BytesIO(json.dumps(SCHEDULE).encode())
+
+	assert [*ijson.basic_parse(stream, use_float = True)] == [*iter_events(SCHEDULE)]
+
+
+def test_iter_items():
+	stream = io.BytesIO(json.dumps(SCHEDULE).encode())
+	assert [game["id"] for game in jsonstream.iter_items(stream, ["dates", 0, "games"])] == [1, 2]
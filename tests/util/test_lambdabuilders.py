@@ -0,0 +1,99 @@
+import pytest
+
+import dag
+from dag.util import lambdabuilders
+from dag.util.attribute_processors import AttributeAccessRecord, get_stored_attrs
+from dag.util.lambdabuilders import LambdaBuilder
+
+
+class Team:
+	name = "Mets"
+	city = "new york"
+	wins = "101"
+	players = ["a", "b"]
+
+	def describe(self, prefix, suffix = ""):
+		return f"{prefix}{self.name}{suffix}"
+
+
+class Game:
+	team = Team()
+	empty = ""
+
+
+
+def make_records(*steps) -> list[AttributeAccessRecord]:
+	"""Each step is an attribute name, or (name, args, kwargs) for a call"""
+	lb = LambdaBuilder()
+	records = []
+
+	for step in steps:
+		name, args, kwargs = (step, None, None) if isinstance(step, str) else step
+		record = AttributeAccessRecord(name, lb)
+
+		if args is not None:
+			record.is_called, record.args, record.kwargs = True, args, kwargs or {}
+
+		records.append(record)
+
+	return records
+
+
+def compile_and_replay(records, root):
+	return lambdabuilders.get_compiled(records)(root), get_stored_attrs(root, records)
+
+
+
+
+def test_compiled_attributes_match_replay():
+	compiled, replayed = compile_and_replay(make_records("team", "name"), Game())
+	assert compiled == replayed == "Mets"
+
+
+def test_compiled_calls_match_replay():
+	records = make_records("team", ("describe", ("The ",), {"suffix": "!"}))
+	compiled, replayed = compile_and_replay(records, Game())
+	assert compiled == replayed == "The Mets!"
+
+	records = make_records("team", "city", ("title", (), {}))
+	assert lambdabuilders.get_compiled(records)(Game()) == "New York"
+
+
+def test_compiled_args_formatted_each_call():
+	records = make_records("team", ("describe", ("{prefix}",), {}))
+	compiled = lambdabuilders.get_compiled(records)
+
+	with dag.ctx(parsed = {"prefix": "Go "}):
+		assert compiled(Game()) == "Go Mets"
+
+	with dag.ctx(parsed = {"prefix": "The "}):
+		assert compiled(Game()) == "The Mets"
+
+
+def test_compiled_conversions():
+	assert lambdabuilders.get_compiled(make_records("team", "wins", "INT"))(Game()) == 101
+	assert lambdabuilders.get_compiled(make_records("team", "players", ("TYPE", (tuple,), {})))(Game()) == ("a", "b")
+	assert lambdabuilders.get_compiled(make_records("empty", ("__or__", ("none",), {})))(Game()) == "none"
+
+
+def test_compiled_falsy_root_returns_none():
+	assert lambdabuilders.get_compiled(make_records("team"))(None) is None
+
+
+def test_uncompilable_records():
+	assert lambdabuilders.get_compiled(make_records(("RSEARCH", ("abc",), {}))) is None
+
+
+def test_lambdabuilder_recompiles_when_records_added():
+	lb = LambdaBuilder()
+	lb._stored_attrs = make_records("team")
+
+	assert lb._do_call(Game()) is Game.team
+	compiled = lb._dag_compiled
+
+	lb._do_call(Game())
+	assert lb._dag_compiled is compiled
+
+	lb._stored_attrs.extend(make_records("name"))
+	assert lb._do_call(Game()) == "Mets"
+	assert "_dag_compiled" not in lb.__getstate__()
@@ -0,0 +1,141 @@
+import os, time
+import pytest
+
+from dag.util import persistencefile
+
+
+@pytest.fixture
+def pf(tmp_path):
+	return persistencefile.PersistenceFile(tmp_path)
+
+
+def test_write_read(pf):
+	pf.write({"wow": 1}, "app", "https://site.com/teams?x=1")
+
+	assert pf.exists("app", "https://site.com/teams?x=1")
+	assert pf.read("app", "https://site.com/teams?x=1") == {"wow": 1}
+
+
+def test_meta_and_ttl(pf):
+	pf.write("val", "app", "file", meta = {"etag": '"abc"', "last_modified": None})
+	meta = pf.read_meta("app", "file")
+
+	assert meta["etag"] == '"abc"'
+	assert "last_modified" not in meta
+	assert pf.is_fresh("app", "file")
+	assert pf.is_fresh("app", "file", ttl = 60)
+	assert not pf.is_fresh("app", "file", ttl = 0.000001)
+	assert not pf.is_fresh("app", "missing", ttl = 60)
+
+
+def test_refresh(pf):
+	pf.write("val", "app", "file", meta = {"etag": "e"})
+	pf.write_meta(pf.process_filepath("app", "file"), pf.read_meta("app", "file") | {"stored_at": time.time() - 100})
+	assert not pf.is_fresh("app", "file", ttl = 50)
+
+	pf.refresh("app", "file")
+	assert pf.is_fresh("app", "file", ttl = 50)
+	assert pf.read_meta("app", "file")["etag"] == "e"
+
+
+def test_lru_eviction(tmp_path):
+	pf = persistencefile.PersistenceFile(tmp_path, max_bytes = lambda: 10**9)
+
+	for i in range(5):
+		filepath = pf.write(os.urandom(2000), "app", f"file{i}")
+		os.utime(filepath, (i, i))
+
+	pf.read("app", "file0") # Reading marks file0 as most recently used
+	pf.evict(max_bytes = 3 * 2100)
+
+	assert pf.exists("app", "file0")
+	assert not pf.exists("app", "file1")
+	assert not os.path.exists(pf.get_metapath(pf.process_filepath("app", "file1")))
+	assert pf.exists("app", "file4")
+
+
+
+@pytest.fixture
+def spf(tmp_path):
+	spf = persistencefile.SqlitePersistenceFile(tmp_path / "cache.db")
+	yield spf
+	spf.close()
+
+
+def test_sqlite_write_read(spf):
+	assert not spf.exists("nhl/games", f"--date-2023-10-10.{persistencefile.ext}")
+
+	spf.write({"games": [1, 2]}, "nhl/games", f"--date-2023-10-10.{persistencefile.ext}", meta = {"etag": "e"})
+
+	assert spf.exists("nhl/games", f"--date-2023-10-10.{persistencefile.ext}")
+	assert spf.exists("nhl/games", "--date-2023-10-10")
+	assert spf.read("nhl/games", "--date-2023-10-10") == {"games": [1, 2]}
+	assert spf.read_meta("nhl/games", "--date-2023-10-10")["etag"] == "e"
+
+	spf.write({"games": [3]}, "nhl/games", "--date-2023-10-10")
+	assert spf.read("nhl/games", "--date-2023-10-10") == {"games": [3]}
+
+
+def test_sqlite_ttl_and_refresh(spf):
+	spf.write("val", "app", "file")
+	spf.conn.execute("UPDATE entries SET stored_at = stored_at - 100")
+
+	assert spf.is_fresh("app", "file")
+	assert not spf.is_fresh("app", "file", ttl = 50)
+
+	spf.refresh("app", "file")
+	assert spf.is_fresh("app", "file", ttl = 50)
+
+
+def test_sqlite_delete(spf):
+	for folder in ["nhl/games", "nhl/teams", "nhl_other", "mlb/games"]:
+		spf.write("val", folder, "file")
+
+	assert spf.delete("nhl/games", "file") == 1
+	assert spf.delete("nhl") == 1
+	assert spf.exists("nhl_other", "file")
+	assert spf.exists("mlb/games", "file")
+
+
+def test_sqlite_eviction(spf):
+	for i in range(5):
+		spf.write(os.urandom(2000), "app", f"file{i}")
+		spf.conn.execute("UPDATE entries SET accessed_at = ? WHERE filename = ?", (i, f"file{i}"))
+
+	spf.evict(max_bytes = 3 * 2100)
+
+	assert not spf.exists("app", "file0")
+	assert spf.exists("app", "file4")
+	assert spf.get_total_bytes() <= 3 * 2100
+
+
+def test_sqlite_writes_track_total_bytes(tmp_path):
+	spf = persistencefile.SqlitePersistenceFile(tmp_path / "cache.db", max_bytes = 10**6)
+	statements = []
+	spf.conn.set_trace_callback(statements.append)
+
+	spf.write(os.urandom(2000), "app", "file0")
+	spf.write(os.urandom(2000), "app", "file1")
+	spf.write(os.urandom(1000), "app", "file0")
+
+	assert len([sql for sql in statements if "SUM(size)" in sql]) == 1 # Only the first write sums the table
+	assert spf.total_bytes == spf.get_total_bytes()
+
+	spf.delete("app", "file1")
+	spf.write(os.urandom(100), "app", "file2")
+
+	assert spf.total_bytes == spf.get_total_bytes()
+	spf.close()
+
+
+def test_sqlite_write_evicts_over_max_bytes(tmp_path):
+	spf = persistencefile.SqlitePersistenceFile(tmp_path / "cache.db", max_bytes = 3 * 2100)
+
+	for i in range(5):
+		spf.write(os.urandom(2000), "app", f"file{i}")
+		spf.conn.execute("UPDATE entries SET accessed_at = ? WHERE filename = ?", (i, f"file{i}"))
+
+	assert not spf.exists("app", "file0")
+	assert spf.exists("app", "file4")
+	assert spf.total_bytes == spf.get_total_bytes() <= 3 * 2100
+	spf.close()
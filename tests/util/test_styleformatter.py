@@ -0,0 +1,60 @@
+import pytest
+
+from dag.util import styleformatter
+from dag.util.styleformatter import DagStyleFormatter, Column
+
+
+@pytest.fixture
+def formatter(monkeypatch):
+	monkeypatch.setenv("COLUMNS", "80")
+	return DagStyleFormatter()
+
+
+
+def test_strip_ctags():
+	assert styleformatter.strip_ctags("<c red>Seattle</c red> Kraken") == "Seattle Kraken"
+	assert styleformatter.get_ctag_length("<c red>Sea</c>") == len("<c red></c>")
+
+
+def test_emoji_length():
+	assert styleformatter.get_emoji_length("Seattle") == 0
+	assert styleformatter.get_emoji_length("⚽ goal ⚽") == 2
+	assert styleformatter.get_emoji_length("█") == 0
+
+
+def test_column_settings_override_defaults():
+	col = Column(margin = 5)
+
+	assert col.margin == 5
+	assert col.after == Column.default_style["after"]
+	assert col.nonexistent is None
+
+
+def test_cells_are_renumbered(formatter):
+	row = formatter.generate_row("a", "b")
+	row.insert(0, "z")
+
+	assert [cell.idx for cell in row.cells] == [0, 1, 2]
+
+	del row[1]
+	assert [(cell.idx, cell.content) for cell in row.cells] == [(0, "z"), (1, "b")]
+
+
+def test_render_aligns_columns(formatter):
+	formatter.add_row("Seattle", "1").add_row("Boston", "22")
+	lines = formatter.print_response().splitlines()
+
+	assert lines[0].index("1") == lines[1].index("22")
+
+
+def test_render_overflows_long_cells(formatter):
+	formatter.col(0, max_width = 12).add_row("one two three four five six")
+	rendered = formatter.print_response()
+
+	assert "five" in rendered
+	assert all(len(line.rstrip()) <= 12 for line in rendered.splitlines())
+
+
+def test_cstyle_colors_matches(formatter):
+	formatter.cstyle("Sea", "green").add_row("Seattle")
+	assert "<c green>Sea</c green>ttle" in formatter.print_response()